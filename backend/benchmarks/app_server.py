@@ -0,0 +1,22 @@
+import asyncio
+from typing import Dict
+import aiohttp
+import uvicorn
+
+async def start_app(port: int) -> uvicorn.Server:
+    from main import app
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server
+
+async def fetch_metrics(session: aiohttp.ClientSession, base_url: str) -> Dict[str, float]:
+    async with session.get(f"{base_url}/metrics") as response:
+        text = await response.text()
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
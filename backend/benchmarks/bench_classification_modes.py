@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import statistics
+import time
+from config import settings
+from models.schemas import ClassificationMode
+from benchmarks.corpus import short_emails
+from benchmarks.fake_llm_server import FakeLLMServer
+
+async def run(count: int, latency: float) -> None:
+    fake = await FakeLLMServer(latency=latency).start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_api_key = "sk-fake"
+    settings.cache_enabled = False
+    
+    from services.classification_service import ClassificationService
+    service = ClassificationService()
+    emails = short_emails(count)
+    
+    print(f"{'modo':<12} {'p50 (s)':>8} {'p95 (s)':>8} {'chamadas':>9} {'prompt tokens/email':>20}")
+    for mode in (ClassificationMode.TWO_CALL, ClassificationMode.SINGLE_CALL):
+        requests_before = fake.request_count
+        tokens_before = fake.prompt_tokens_total
+        latencies = []
+        for email in emails:
+            start = time.perf_counter()
+            await service.classify_email(email, mode)
+            latencies.append(time.perf_counter() - start)
+        
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        calls = (fake.request_count - requests_before) / count
+        prompt_tokens = (fake.prompt_tokens_total - tokens_before) / count
+        print(f"{mode.value:<12} {p50:>8.3f} {p95:>8.3f} {calls:>9.1f} {prompt_tokens:>20.0f}")
+    
+    await service.openai_service.close()
+    await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara latência e tokens de prompt entre os modos de classificação")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.latency))
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import time
+from typing import Dict
+import aiohttp
+from config import settings
+from benchmarks.app_server import fetch_metrics, start_app
+from benchmarks.fake_llm_server import FakeLLMServer
+
+EMAIL = "Urgente: o sistema parou de funcionar e não consigo acessar a plataforma. Comunicado geral {}"
+
+async def over_http(port: int, copies: int, coalesce: bool, latency: float) -> Dict[str, float]:
+    fake = await FakeLLMServer(latency=latency).start()
+    settings.openai_api_base = fake.api_base
+    settings.coalesce_requests = coalesce
+    app_server = await start_app(port)
+    url = f"http://127.0.0.1:{port}/classify-text"
+    payload = {"text": EMAIL.format(port), "mode": "single_call"}
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        async def post(index: int) -> int:
+            text = payload["text"] if index % 2 else f"  {payload['text'].upper()}\n"
+            async with session.post(url, json={**payload, "text": text}) as response:
+                await response.read()
+                return response.status
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(post(index) for index in range(copies)))
+        elapsed = time.perf_counter() - start
+        metrics = await fetch_metrics(session, f"http://127.0.0.1:{port}")
+    app_server.should_exit = True
+    await asyncio.sleep(0.3)
+    await fake.stop()
+    return {
+        "elapsed": elapsed,
+        "upstream": fake.request_count,
+        "ok": sum(status == 200 for status in statuses),
+        "coalesced": int(metrics["sparkmail_coalesced_total"])
+    }
+
+async def cancellation(copies: int, latency: float) -> None:
+    from services.classification_service import ClassificationService
+    fake = await FakeLLMServer(latency=latency).start()
+    settings.openai_api_base = fake.api_base
+    settings.coalesce_requests = True
+    service = ClassificationService()
+    text = EMAIL.format("cancelamento")
+    leader = asyncio.create_task(service.classify_email(text, "single_call"))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(service.classify_email(text, "single_call")) for _ in range(copies - 1)]
+    await asyncio.sleep(latency / 3)
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+    await service.openai_service.close()
+    await fake.stop()
+
+    print(f"[cancelamento] líder cancelado, {len(results)} seguidores concluídos, chamadas upstream {fake.request_count}")
+    if fake.request_count != 1 or any(result.reasoning != results[0].reasoning for result in results):
+        raise SystemExit("Cancelar o líder não deveria derrubar a chamada compartilhada")
+
+async def failure(copies: int, latency: float) -> None:
+    from services.classification_service import ClassificationService
+    fake = await FakeLLMServer(latency=latency, failure_rate=1.0).start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_max_retries = 0
+    settings.coalesce_requests = True
+    service = ClassificationService()
+    text = EMAIL.format("falha")
+    results = await asyncio.gather(*(service.classify_email(text, "single_call") for _ in range(copies)))
+    stats = service.coalescing_stats()
+    await service.openai_service.close()
+    await fake.stop()
+
+    print(f"[erro] upstream falhando: {len(results)} respostas de fallback, chamadas upstream {fake.request_count}, "
+          f"em andamento depois {stats['in_flight']}")
+    if fake.request_count != 1 or stats["in_flight"]:
+        raise SystemExit("O erro deveria ser compartilhado e a chave liberada")
+
+async def run(args: argparse.Namespace) -> None:
+    settings.openai_api_key = "sk-fake"
+    settings.cache_enabled = False
+    settings.near_duplicate_enabled = False
+    settings.local_model_path = ""
+    settings.rate_limit_enabled = False
+
+    print(f"{args.copies} cópias simultâneas do mesmo email em /classify-text (single_call, cache desligado, "
+          f"LLM falso com {args.latency}s)")
+    print(f"{'coalescência':<14} {'chamadas upstream':>18} {'coalescidas':>12} {'respostas 200':>14} {'tempo':>8}")
+    for index, coalesce in enumerate((False, True)):
+        result = await over_http(args.port + index, args.copies, coalesce, args.latency)
+        print(f"{'sim' if coalesce else 'não':<14} {result['upstream']:>18} {result['coalesced']:>12} "
+              f"{result['ok']:>14} {result['elapsed']:>6.2f} s")
+        if coalesce and (result["upstream"] != 1 or result["ok"] != args.copies):
+            raise SystemExit(f"Esperava 1 chamada upstream, houve {result['upstream']}")
+
+    await cancellation(args.copies, args.latency)
+    await failure(args.copies, args.latency)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coalescência de requisições idênticas simultâneas")
+    parser.add_argument("--port", type=int, default=8021)
+    parser.add_argument("--copies", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+import aiohttp
+from benchmarks.bench_workers import BACKEND_DIR
+from benchmarks.fake_llm_server import FakeLLMServer
+
+def import_profile() -> Tuple[float, List[Tuple[str, float]]]:
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, env=dict(os.environ, LOG_DIR="")
+    ).stderr
+    total = 0.0
+    top_level: Dict[str, float] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        seconds = int(cumulative) / 1e6
+        if name.strip() == "main":
+            total = seconds
+        elif depth <= 1:
+            package = name.strip().split(".")[0]
+            top_level[package] = top_level.get(package, 0.0) + seconds
+    return total, sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+
+async def _poll(session: aiohttp.ClientSession, request: Dict, process: subprocess.Popen, start: float, check=None) -> float:
+    while time.perf_counter() - start < 60:
+        if process.poll() is not None:
+            raise SystemExit(f"Servidor encerrou durante a inicialização (código {process.returncode})")
+        try:
+            async with session.request(**request) as response:
+                if response.status == 200 and (check is None or check(await response.json())):
+                    return time.perf_counter() - start
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.01)
+    raise SystemExit(f"Servidor não respondeu {request['url']} a tempo")
+
+async def cold_start(port: int, api_base: str, warm_up: bool) -> Dict[str, float]:
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        WEB_CONCURRENCY="1",
+        WARM_UP_ON_STARTUP="true" if warm_up else "false",
+        OPENAI_API_BASE=api_base,
+        OPENAI_API_KEY="sk-fake",
+        CACHE_ENABLED="false",
+        LOG_DIR=""
+    )
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        async with aiohttp.ClientSession() as session:
+            health = await _poll(session, {"method": "GET", "url": f"{base}/health"}, process, start)
+            ready = await _poll(
+                session, {"method": "GET", "url": f"{base}/health"}, process, start, check=lambda body: body["ready"]
+            )
+            if warm_up:
+                await asyncio.sleep(1.0)
+            request_start = time.perf_counter()
+            await _poll(
+                session,
+                {"method": "POST", "url": f"{base}/classify-text", "json": {"text": "Preciso de ajuda com o sistema"}},
+                process, request_start
+            )
+            first_request = time.perf_counter() - request_start
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {"health": health, "ready": ready, "first_request": first_request}
+
+async def run(runs: int, port: int) -> None:
+    imports = [import_profile() for _ in range(runs)]
+    print(f"import main: mediana {statistics.median(total for total, _ in imports) * 1000:.0f} ms em {runs} execuções")
+    for package, seconds in imports[-1][1][:8]:
+        print(f"  {package:<28} {seconds * 1000:>7.0f} ms")
+
+    fake = await FakeLLMServer(latency=0.05).start()
+    print(f"\n{'aquecimento':<12} {'/health 200':>12} {'serviços prontos':>17} {'1ª classificação':>17}")
+    for warm_up in (False, True):
+        results = [await cold_start(port, fake.api_base, warm_up) for _ in range(runs)]
+        median = {key: statistics.median(result[key] for result in results) * 1000 for key in results[0]}
+        print(f"{'sim' if warm_up else 'não':<12} {median['health']:>9.0f} ms {median['ready']:>14.0f} ms "
+              f"{median['first_request']:>14.0f} ms")
+    await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de import e de cold start até a primeira resposta saudável")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8017)
+    args = parser.parse_args()
+    asyncio.run(run(args.runs, args.port))
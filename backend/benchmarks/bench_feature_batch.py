@@ -0,0 +1,59 @@
+import argparse
+import random
+import time
+from typing import List
+from benchmarks.corpus import long_email, newsletter_email, short_emails
+from services.feature_extraction_service import FeatureExtractionService
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "?",
+    "Isso foi rápido, a API caiu",
+    "NÃO FUNCIONA!!! Por que?",
+    "banco\nde\tdados; banco-de-dados; bancode dados",
+    "ano novo ano novo",
+    "nao consigo / não consigo / naoconsigo",
+    "İstanbul, oi, tchau",
+    "Prezado senhor, atenciosamente, abraço",
+    "e-mail: sistema/servidor; ajuda,ajuda",
+    "Olá 😀 parabéns!! obrigado",
+]
+
+def build_corpus(size: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    base = short_emails(200, seed) + [long_email(rng.randint(2, 8), seed + i) for i in range(50)]
+    base += [newsletter_email(rng.randint(1, 5), seed + i) for i in range(50)] + EDGE_CASES
+    return [rng.choice(base) for _ in range(size)]
+
+def check_parity(service: FeatureExtractionService, texts: List[str]) -> None:
+    batch = service.extract_features_batch(texts)
+    for index, text in enumerate(texts):
+        expected = service.extract_features(text)
+        if batch[index] != expected:
+            raise SystemExit(f"Divergência no email {index}: {text!r}\nlote:   {batch[index]}\nescalar: {expected}")
+    print(f"paridade ok em {len(texts)} emails")
+
+def run(sizes: List[int]) -> None:
+    service = FeatureExtractionService()
+    check_parity(service, EDGE_CASES + build_corpus(5_000))
+    
+    print(f"{'emails':>8} {'escalar (emails/s)':>19} {'lote (emails/s)':>16} {'ganho':>7}")
+    for size in sizes:
+        texts = build_corpus(size)
+        
+        start = time.perf_counter()
+        for text in texts:
+            service.extract_features(text)
+        scalar = size / (time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        service.extract_features_batch(texts)
+        batch = size / (time.perf_counter() - start)
+        print(f"{size:>8} {scalar:>19.0f} {batch:>16.0f} {batch / scalar:>6.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paridade e vazão da extração de features em lote")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    run(args.sizes)
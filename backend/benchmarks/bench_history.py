@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+from config import settings
+from benchmarks.corpus import short_emails
+from benchmarks.fake_llm_server import FakeLLMServer
+from services.history_store import HistoryRecord, HistoryStore
+
+async def request_latency(path: str, texts: List[str], concurrency: int) -> Dict[str, float]:
+    from services.classification_service import ClassificationService
+    settings.history_enabled = bool(path)
+    settings.history_sqlite_path = path
+    service = ClassificationService()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def classify(text: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await service.classify_email(text, "single_call")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(classify(text) for text in texts))
+    elapsed = time.perf_counter() - start
+    stats = {}
+    if service.history is not None:
+        await service.history.close()
+        stats = service.history.stats()
+    await service.openai_service.close()
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "rate": len(texts) / elapsed,
+        "written": stats.get("written", 0),
+        "batches": stats.get("batches", 0)
+    }
+
+def synthetic_records(count: int, days: int) -> List[HistoryRecord]:
+    rng = random.Random(7)
+    now = time.time()
+    return [
+        HistoryRecord(
+            created_at=now - rng.random() * days * 86400,
+            text_hash=f"{rng.getrandbits(128):032x}",
+            category=rng.choice(("Produtivo", "Improdutivo")),
+            confidence=rng.uniform(0.5, 1.0),
+            is_urgent=rng.random() < 0.15,
+            latency_ms=rng.uniform(5, 900),
+            model="gpt-3.5-turbo",
+            path=rng.choice(("llm", "llm", "cache", "fallback", "coalesced")),
+            feature_flags=rng.getrandbits(6),
+            word_count=rng.randint(5, 400),
+            formality_score=rng.random(),
+            sentiment_score=rng.uniform(-1, 1)
+        )
+        for _ in range(count)
+    ]
+
+async def write_and_query(path: str, rows: int, days: int, repeats: int) -> None:
+    store = HistoryStore(path, batch_size=settings.history_batch_size, max_pending=rows)
+    records = synthetic_records(rows, days)
+    start = time.perf_counter()
+    for record in records:
+        store.record(record)
+    enqueue = time.perf_counter() - start
+    await store._flush()
+    elapsed = time.perf_counter() - start
+    print(f"\n{rows} registros: enfileirar {enqueue / rows * 1e6:.2f} µs/registro, "
+          f"gravação total {rows / elapsed:,.0f} registros/s")
+
+    now = time.time()
+    queries = {
+        "últimas 100 (sem filtro)": lambda: store.query(limit=100),
+        "Produtivo nas últimas 24h": lambda: store.query(start=now - 86400, category="Produtivo", limit=100),
+        "urgentes na última semana": lambda: store.query(start=now - 7 * 86400, is_urgent=True, limit=100),
+        "página seguinte (before_id)": lambda: store.query(before_id=rows // 2, limit=100),
+        "contadores por hora (7 dias)": lambda: store.counters(start=now - 7 * 86400),
+        "contadores por dia (tudo)": lambda: store.counters(granularity="day"),
+    }
+    print(f"{'consulta':<32} {'mediana (ms)':>13} {'linhas':>7}")
+    for name, query in queries.items():
+        timings = []
+        for _ in range(repeats):
+            query_start = time.perf_counter()
+            result = await query()
+            timings.append(time.perf_counter() - query_start)
+        print(f"{name:<32} {statistics.median(timings) * 1000:>13.2f} {len(result):>7}")
+
+    total = sum(counter["count"] for counter in await store.counters(granularity="day"))
+    await store.close()
+    if total != rows:
+        raise SystemExit(f"Os contadores somam {total}, deveriam somar {rows}")
+
+async def run(args: argparse.Namespace) -> None:
+    settings.openai_api_key = "sk-fake"
+    settings.cache_enabled = False
+    settings.coalesce_requests = False
+    fake = await FakeLLMServer(latency=args.latency).start()
+    settings.openai_api_base = fake.api_base
+    texts = short_emails(args.requests, seed=11)
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"LLM falso com {args.latency}s por chamada, {args.requests} classificações, "
+              f"concorrência {args.concurrency}, mediana de {args.rounds} rodadas")
+        print(f"{'histórico':<10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8} {'gravados':>9} {'lotes':>6}")
+        await request_latency("", texts[:50], args.concurrency)
+        runs: Dict[str, List[Dict[str, float]]] = {"desligado": [], "ligado": []}
+        for round_index in range(args.rounds):
+            runs["desligado"].append(await request_latency("", texts, args.concurrency))
+            path = os.path.join(workdir, f"latencia-{round_index}.db")
+            runs["ligado"].append(await request_latency(path, texts, args.concurrency))
+        for label, results in runs.items():
+            median = {key: statistics.median(result[key] for result in results) for key in results[0]}
+            print(f"{label:<10} {median['p50']:>9.1f} {median['p99']:>9.1f} {median['rate']:>8.0f} "
+                  f"{median['written']:>9.0f} {median['batches']:>6.0f}")
+        await fake.stop()
+        await write_and_query(os.path.join(workdir, "consultas.db"), args.rows, args.days, args.repeats)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Custo do histórico de classificações na requisição e nas consultas")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import aiohttp
+from aiohttp import web
+from config import settings
+from benchmarks.app_server import fetch_metrics, start_app
+from benchmarks.bench_pdf_extraction import build_pdf
+from benchmarks.fake_llm_server import FakeLLMServer
+
+async def _start_webhook_receiver(received: list) -> web.AppRunner:
+    async def handle(request: web.Request) -> web.Response:
+        received.append((time.perf_counter(), await request.json()))
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/hook", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8097).start()
+    return runner
+
+async def _read_events(session: aiohttp.ClientSession, url: str) -> list:
+    events = []
+    async with session.get(url) as response:
+        event = None
+        async for raw_line in response.content:
+            line = raw_line.decode("utf-8").strip()
+            if line.startswith("event:"):
+                event = line.split(":", 1)[1].strip()
+            elif line.startswith("data:"):
+                events.append((event, json.loads(line.split(":", 1)[1])))
+                if event == "done":
+                    break
+    return events
+
+async def run(jobs: int, latency: float, port: int, store: str) -> None:
+    fake = await FakeLLMServer(latency=latency).start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_api_key = "sk-fake"
+    settings.cache_enabled = False
+    settings.job_workers = 4
+    settings.job_max_queue_depth = jobs // 2
+    settings.job_store = store
+    settings.webhook_allowed_hosts = "127.0.0.1"
+    settings.job_sqlite_path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    received: list = []
+    receiver = await _start_webhook_receiver(received)
+    app_server = await start_app(port)
+    base = f"http://127.0.0.1:{port}"
+
+    async with aiohttp.ClientSession() as session:
+        start = time.perf_counter()
+        accepted, rejected, submit_latencies = [], 0, []
+        for index in range(jobs):
+            submit_start = time.perf_counter()
+            async with session.post(f"{base}/jobs/classify-text", json={
+                "text": f"Preciso de ajuda com o sistema, chamado {index}",
+                "webhook_url": "http://127.0.0.1:8097/hook"
+            }) as response:
+                submit_latencies.append(time.perf_counter() - submit_start)
+                if response.status == 202:
+                    accepted.append(await response.json())
+                elif response.status == 429:
+                    rejected += 1
+                else:
+                    raise SystemExit(f"Status inesperado na submissão: {response.status}")
+
+        events = await _read_events(session, accepted[-1]["events_url"])
+        results = []
+        for submitted in accepted:
+            async with session.get(submitted["status_url"], params={"wait": "30"}) as response:
+                results.append(await response.json())
+        elapsed = time.perf_counter() - start
+
+        data = aiohttp.FormData()
+        data.add_field("file", build_pdf(3), filename="email.pdf", content_type="application/pdf")
+        async with session.post(f"{base}/jobs/classify-file", data=data) as response:
+            pdf_job = await response.json()
+        async with session.get(pdf_job["status_url"], params={"wait": "30"}) as response:
+            pdf_result = await response.json()
+
+        await asyncio.sleep(0.2)
+        metrics = await fetch_metrics(session, base)
+
+    app_server.should_exit = True
+    await asyncio.sleep(0.3)
+    await receiver.cleanup()
+    await fake.stop()
+
+    succeeded = sum(1 for result in results if result["status"] == "succeeded")
+    print(f"backend: {store}, {settings.job_workers} workers, fila máxima {settings.job_max_queue_depth}")
+    print(f"submissões: {jobs} (aceitas {len(accepted)}, recusadas com 429: {rejected})")
+    print(f"latência da submissão: máx {max(submit_latencies) * 1000:.0f} ms (LLM falso leva {2 * latency:.1f}s por email)")
+    print(f"jobs concluídos: {succeeded}/{len(accepted)} em {elapsed:.2f}s")
+    print(f"eventos SSE do último job: {[event for event, _ in events]}")
+    print(f"webhooks recebidos: {len(received)}")
+    print(f"job de PDF: {pdf_result['status']} ({pdf_result['source']})")
+    finished = {status: metrics[f'sparkmail_jobs_finished_total{{status="{status}"}}'] for status in ("succeeded", "failed")}
+    print(f"métricas: submetidos {metrics['sparkmail_jobs_submitted_total']:.0f}, "
+          f"recusados {metrics['sparkmail_jobs_rejected_total']:.0f}, concluídos {finished['succeeded']:.0f}, "
+          f"falhos {finished['failed']:.0f}, webhooks falhos {metrics['sparkmail_webhooks_failed_total']:.0f}")
+
+    if rejected == 0 or succeeded != len(accepted) or pdf_result["status"] != "succeeded":
+        raise SystemExit("Fila de jobs não se comportou como esperado")
+    if max(submit_latencies) > latency:
+        raise SystemExit("Submissão esperou pelo processamento")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fila de jobs assíncronos: backpressure, polling, SSE e webhook")
+    parser.add_argument("--jobs", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--port", type=int, default=8013)
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+    asyncio.run(run(args.jobs, args.latency, args.port, args.store))
@@ -0,0 +1,61 @@
+import argparse
+import re
+import time
+from typing import Callable
+from benchmarks.corpus import long_email, newsletter_email
+from models.schemas import EmailFeatures, SentimentIndicators
+from services.feature_extraction_service import FeatureExtractionService
+
+QUESTION_PATTERNS = [r'\?', r'como\s+', r'quando\s+', r'onde\s+', r'por\s*que', r'qual\s+']
+
+def legacy_extract_features(service: FeatureExtractionService, text: str) -> EmailFeatures:
+    text_lower = text.lower()
+    formal_count = sum(1 for indicator in service.formal_indicators if indicator in text_lower)
+    informal_count = sum(1 for indicator in service.informal_indicators if indicator in text_lower)
+    negative_count = sum(1 for word in service.negative_words if word in text_lower)
+    positive_count = sum(1 for word in service.positive_words if word in text_lower)
+    return EmailFeatures(
+        has_questions=any(re.search(pattern, text_lower) for pattern in QUESTION_PATTERNS),
+        has_urgency_indicators=any(keyword in text_lower for keyword in service.urgency_keywords),
+        has_request_indicators=any(keyword in text_lower for keyword in service.request_keywords),
+        has_problem_indicators=any(keyword in text_lower for keyword in service.problem_keywords),
+        has_technical_indicators=any(keyword in text_lower for keyword in service.technical_keywords),
+        has_social_indicators=any(keyword in text_lower for keyword in service.social_keywords),
+        formality_score=0.5 if formal_count + informal_count == 0 else formal_count / (formal_count + informal_count),
+        sentiment_indicators=SentimentIndicators(
+            has_negative=negative_count > 0,
+            has_positive=positive_count > 0,
+            sentiment_score=(positive_count - negative_count) / max(positive_count + negative_count, 1)
+        ),
+        word_count=len(text.split()),
+        char_count=len(text)
+    )
+
+def _time(func: Callable[[], object], min_seconds: float = 0.3) -> float:
+    best = float("inf")
+    deadline = time.perf_counter() + min_seconds
+    while time.perf_counter() < deadline or best == float("inf"):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run() -> None:
+    service = FeatureExtractionService()
+    corpora = {
+        "denso": long_email(40),
+        "esparso": newsletter_email(40),
+    }
+    
+    print(f"{'corpus':<8} {'tamanho':>8} {'legado (ms)':>12} {'matcher (ms)':>13} {'ganho':>7}")
+    for name, base in corpora.items():
+        for size in (1_000, 10_000, 100_000, 1_000_000):
+            text = (base * (size // len(base) + 1))[:size]
+            legacy = _time(lambda: legacy_extract_features(service, text))
+            compiled = _time(lambda: service.extract_features(text))
+            print(f"{name:<8} {size:>8} {legacy * 1000:>12.3f} {compiled * 1000:>13.3f} {legacy / compiled:>6.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara a extração de features legada com o matcher compilado")
+    parser.parse_args()
+    run()
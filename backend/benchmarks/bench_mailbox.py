@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from email.message import EmailMessage
+from email.policy import SMTP
+from typing import Dict, List
+from benchmarks.bench_pdf_extraction import build_pdf
+from benchmarks.bench_workers import BACKEND_DIR
+from benchmarks.corpus import SHORT_EMAILS, long_email
+from benchmarks.fake_llm_server import FakeLLMServer
+
+def write_mbox(path: str, messages: int, pdf_every: int) -> None:
+    pdf = build_pdf(2, reference="Anexo")
+    with open(path, "wb") as mbox_file:
+        for index in range(messages):
+            message = EmailMessage()
+            message["From"] = f"cliente{index % 50}@exemplo.com"
+            message["Subject"] = f"Chamado {index}"
+            message["Message-ID"] = f"<{index}@exemplo.com>"
+            body = SHORT_EMAILS[index % len(SHORT_EMAILS)] if index % 3 else long_email(3, seed=index)
+            message.set_content(f"{body}\nFrom the desk of ops\nRef {index}")
+            if pdf_every and index % pdf_every == 0:
+                message.add_attachment(pdf, maintype="application", subtype="pdf", filename="anexo.pdf")
+            mbox_file.write(b"From MAILER-DAEMON Thu Jan  1 00:00:00 2026\n")
+            mbox_file.write(message.as_bytes(policy=SMTP).replace(b"\r\n", b"\n").replace(b"\nFrom ", b"\n>From "))
+            mbox_file.write(b"\n")
+
+def run_cli(archive: str, output: str, env: Dict[str, str], *extra: str) -> Dict[str, float]:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "scripts.classify_mailbox", archive, "--output", output, "--progress-seconds", "60", *extra],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise SystemExit(f"CLI falhou:\n{stderr.decode('utf-8', 'replace')[-2000:]}")
+    return {"elapsed": time.perf_counter() - start, "peak_rss_mb": usage.ru_maxrss / 1024}
+
+def read_indexes(path: str) -> List[int]:
+    with open(path, encoding="utf-8") as output_file:
+        return [json.loads(line)["index"] for line in output_file]
+
+async def run(args: argparse.Namespace) -> None:
+    fake = await FakeLLMServer(latency=args.latency).start()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "sk-fake",
+        "OPENAI_API_BASE": fake.api_base,
+        "CACHE_ENABLED": "false",
+        "PDF_WORKERS": "0",
+        "LOG_DIR": tempfile.gettempdir()
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"LLM falso com {args.latency}s por chamada, concorrência {args.concurrency}, "
+              f"1 PDF a cada {args.pdf_every} mensagens")
+        print(f"{'mensagens':>10} {'tamanho':>9} {'tempo':>8} {'msg/s':>7} {'pico RSS':>10}")
+        for messages in args.sizes:
+            archive = os.path.join(workdir, f"arquivo-{messages}.mbox")
+            output = os.path.join(workdir, f"resultado-{messages}.jsonl")
+            write_mbox(archive, messages, args.pdf_every)
+            result = await asyncio.to_thread(
+                run_cli, archive, output, env, "--concurrency", str(args.concurrency)
+            )
+            indexes = read_indexes(output)
+            if indexes != list(range(messages)):
+                raise SystemExit(f"Saída incompleta: {len(indexes)} de {messages} mensagens")
+            print(f"{messages:>10} {os.path.getsize(archive) / 2 ** 20:>6.1f} MB {result['elapsed']:>6.1f} s "
+                  f"{messages / result['elapsed']:>7.0f} {result['peak_rss_mb']:>7.0f} MB")
+
+        messages = args.sizes[0]
+        archive = os.path.join(workdir, f"arquivo-{messages}.mbox")
+        output = os.path.join(workdir, "retomada.jsonl")
+        first = messages // 3
+        await asyncio.to_thread(
+            run_cli, archive, output, env, "--concurrency", str(args.concurrency),
+            "--limit", str(first), "--checkpoint-every", "7"
+        )
+        with open(output, "ab") as output_file:
+            output_file.write(b'{"index": -1, "linha": "parcial de uma execu')
+        await asyncio.to_thread(
+            run_cli, archive, output, env, "--concurrency", str(args.concurrency), "--resume"
+        )
+        indexes = read_indexes(output)
+        print(f"\nretomada: {first} mensagens na 1a execução (+ linha parcial simulando queda), "
+              f"{len(indexes)} linhas após --resume, duplicadas {len(indexes) - len(set(indexes))}")
+        if indexes != list(range(messages)):
+            raise SystemExit("A retomada deveria produzir cada mensagem exatamente uma vez, em ordem")
+    await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vazão, memória e retomada do CLI de classificação de mbox")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--pdf-every", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args))
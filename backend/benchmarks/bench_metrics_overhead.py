@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlencode
+from config import settings
+
+settings.metrics_enabled = False
+settings.cache_enabled = False
+
+from benchmarks.corpus import short_emails
+from utils.metrics import Counter, Histogram, MetricsMiddleware, StageTimer, registry
+
+def _per_call(function, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations
+
+def micro(iterations: int) -> None:
+    counter = Counter("bench_total", "bench", ("path",))
+    histogram = Histogram("bench_seconds", "bench", ("stage",))
+    timer = StageTimer("bench")
+
+    def empty_stage():
+        with timer:
+            pass
+
+    print(f"\n{'operação':<32} {'custo (µs)':>11}")
+    print(f"{'Counter.inc':<32} {_per_call(lambda: counter.inc('bench'), iterations) * 1e6:>11.2f}")
+    print(f"{'Histogram.observe':<32} {_per_call(lambda: histogram.observe(0.01, 'bench'), iterations) * 1e6:>11.2f}")
+    print(f"{'observe_stage (bloco vazio)':<32} {_per_call(empty_stage, iterations) * 1e6:>11.2f}")
+
+async def _call(app, path: str, query: str, headers=()) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"bench"), *headers], "client": ("127.0.0.1", 1), "server": ("bench", 80)
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+async def end_to_end(requests: int, rounds: int) -> None:
+    from main import app
+    instrumented = MetricsMiddleware(app)
+    queries = [urlencode({"text": text}) for text in short_emails(requests, seed=5)]
+
+    async def timed(target) -> float:
+        start = time.perf_counter()
+        for query in queries:
+            await _call(target, "/features-test", query)
+        return (time.perf_counter() - start) / len(queries)
+
+    async with app.router.lifespan_context(app):
+        await timed(app)
+        await timed(instrumented)
+        plain, measured = [], []
+        for _ in range(rounds):
+            plain.append(await timed(app))
+            measured.append(await timed(instrumented))
+
+    base = statistics.median(plain)
+    extra = statistics.median(measured) - base
+    print(f"\n/features-test via ASGI ({requests} requisições x {rounds} rodadas)")
+    print(f"sem middleware: {base * 1e6:.1f} µs/req")
+    print(f"com middleware: {(base + extra) * 1e6:.1f} µs/req ({extra / base * 100:+.1f}%)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Custo da instrumentação de métricas")
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--show", action="store_true", help="imprime a saída de /metrics ao final")
+    args = parser.parse_args()
+    asyncio.run(end_to_end(args.requests, args.rounds))
+    if args.show:
+        print()
+        print(registry.render())
+    micro(args.iterations)
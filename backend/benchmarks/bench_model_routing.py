@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+from config import settings
+from benchmarks.bench_near_duplicates import build_corpus
+from benchmarks.corpus import long_email, newsletter_email, thread_email
+from benchmarks.fake_llm_server import FakeLLMServer
+from utils.metrics import MODEL_TIER_COST, MODEL_TIER_TOKENS
+
+TIERS = ("simple", "standard", "complex")
+
+def labelled_corpus(size: int, seed: int = 5) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = build_corpus(size * 7 // 10, unique_fraction=0.3, seed=seed)
+    for index in range(size - len(corpus)):
+        kind = rng.random()
+        if kind < 0.4:
+            corpus.append((long_email(rng.randint(6, 30), seed=seed + index), "Produtivo"))
+        elif kind < 0.7:
+            corpus.append((thread_email(rng.randint(1, 4), seed=seed + index), "Produtivo"))
+        else:
+            corpus.append((newsletter_email(rng.randint(2, 5), seed=seed + index), "Improdutivo"))
+    rng.shuffle(corpus)
+    return corpus
+
+def _tier_usage() -> Dict[str, Tuple[float, float]]:
+    return {
+        tier: (
+            MODEL_TIER_TOKENS.value(tier, "prompt") + MODEL_TIER_TOKENS.value(tier, "completion"),
+            MODEL_TIER_COST.value(tier)
+        )
+        for tier in TIERS
+    }
+
+async def evaluate(corpus: List[Tuple[str, str]], routed: bool, concurrency: int) -> Dict[str, object]:
+    from services.classification_service import ClassificationService
+    settings.model_routing_enabled = routed
+    service = ClassificationService()
+    usage_before = _tier_usage()
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[Tuple[str, bool, int, float, str]] = [None] * len(corpus)
+
+    async def classify(index: int, email_text: str) -> None:
+        async with semaphore:
+            tier = service.model_router.select(service.feature_service.extract_features(email_text)).name
+            start = time.perf_counter()
+            classification = await service.classify_email(email_text)
+            results[index] = (
+                classification.category, classification.is_urgent, len(classification.suggested_response),
+                time.perf_counter() - start, tier
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(classify(index, email_text) for index, (email_text, _) in enumerate(corpus)))
+    elapsed = time.perf_counter() - start
+    await service.openai_service.close()
+
+    usage_after = _tier_usage()
+    tokens = sum(usage_after[tier][0] - usage_before[tier][0] for tier in TIERS)
+    cost = sum(usage_after[tier][1] - usage_before[tier][1] for tier in TIERS)
+    latencies = sorted(result[3] for result in results)
+    return {
+        "results": results,
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "tokens": tokens,
+        "cost": cost,
+        "accuracy": sum(result[0] == label for result, (_, label) in zip(results, corpus)) / len(corpus),
+        "tier_latency": {
+            tier: statistics.mean([result[3] for result in results if result[4] == tier] or [0.0]) for tier in TIERS
+        },
+        "tier_counts": {tier: sum(1 for result in results if result[4] == tier) for tier in TIERS}
+    }
+
+async def run(args: argparse.Namespace) -> None:
+    fake = None
+    if args.api_base:
+        settings.openai_api_base = args.api_base
+        settings.openai_api_key = args.api_key
+    else:
+        fake = await FakeLLMServer(latency=args.latency, model_latency={args.simple_model: args.latency / 3}).start()
+        settings.openai_api_base = fake.api_base
+        settings.openai_api_key = "sk-fake"
+    settings.openai_model = args.standard_model
+    settings.simple_model = args.simple_model
+    settings.complex_model = args.complex_model
+    settings.simple_cost_per_1k_tokens = args.simple_cost
+    settings.standard_cost_per_1k_tokens = args.standard_cost
+    settings.complex_cost_per_1k_tokens = args.complex_cost
+    settings.cache_enabled = False
+    settings.near_duplicate_enabled = False
+    settings.local_model_path = ""
+
+    corpus = labelled_corpus(args.emails)
+    single = await evaluate(corpus, routed=False, concurrency=args.concurrency)
+    routed = await evaluate(corpus, routed=True, concurrency=args.concurrency)
+    if fake is not None:
+        await fake.stop()
+
+    print(f"{len(corpus)} emails rotulados, {args.concurrency} simultâneos, "
+          f"{'LLM falso' if fake else settings.openai_api_base}")
+    print(f"faixas: simple={args.simple_model}, standard={args.standard_model}, complex={args.complex_model}")
+    print(f"\n{'faixa':<10} {'emails':>7} {'latência média roteada':>23}")
+    for tier in TIERS:
+        print(f"{tier:<10} {routed['tier_counts'][tier]:>7} {routed['tier_latency'][tier] * 1000:>20.0f} ms")
+
+    print(f"\n{'configuração':<14} {'p50':>8} {'p95':>8} {'total':>8} {'tokens':>8} {'custo US$':>10} {'acurácia':>9}")
+    for name, result in (("modelo único", single), ("roteado", routed)):
+        print(f"{name:<14} {result['p50'] * 1000:>5.0f} ms {result['p95'] * 1000:>5.0f} ms {result['elapsed']:>6.1f} s "
+              f"{result['tokens']:>8.0f} {result['cost']:>10.4f} {result['accuracy']:>9.1%}")
+
+    pairs = list(zip(single["results"], routed["results"]))
+    category_agreement = sum(a[0] == b[0] for a, b in pairs) / len(pairs)
+    urgency_agreement = sum(a[1] == b[1] for a, b in pairs) / len(pairs)
+    length_ratio = statistics.mean(b[2] / a[2] for a, b in pairs if a[2])
+    print(f"\nconcordância roteado x modelo único: categoria {category_agreement:.1%}, urgência {urgency_agreement:.1%}, "
+          f"tamanho da resposta {length_ratio:.2f}x")
+    if fake is not None:
+        print("com o LLM falso as respostas não dependem do modelo: a concordância só valida o pipeline; "
+              "use --api-base/--api-key para medir a qualidade real")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Avaliação offline do roteamento de modelos por complexidade do email")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="latência do modelo padrão no LLM falso")
+    parser.add_argument("--simple-model", default="gpt-4o-mini")
+    parser.add_argument("--standard-model", default="gpt-4o")
+    parser.add_argument("--complex-model", default="gpt-4o")
+    parser.add_argument("--simple-cost", type=float, default=0.0004, help="US$ por 1 mil tokens")
+    parser.add_argument("--standard-cost", type=float, default=0.006)
+    parser.add_argument("--complex-cost", type=float, default=0.006)
+    parser.add_argument("--api-base", help="endpoint real compatível com a OpenAI (padrão: LLM falso local)")
+    parser.add_argument("--api-key", default="")
+    args = parser.parse_args()
+    asyncio.run(run(args))
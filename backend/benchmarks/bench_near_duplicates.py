@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List, Tuple
+from benchmarks.corpus import LONG_PARAGRAPHS, NEWSLETTER_PARAGRAPHS, SHORT_EMAILS
+from models.schemas import EmailClassification, EmailFeatures, SentimentIndicators
+from services.cache_service import ClassificationCache
+from services.near_duplicate_service import NearDuplicateIndex
+
+TEMPLATES = [
+    ("ALERTA: o servidor {host} está com uso de CPU acima de 95% desde {date} às {hour}. "
+     "Chamado {ticket} aberto automaticamente. Verifique o serviço imediatamente.", "Produtivo"),
+    ("Olá {name}, seu chamado {ticket} foi encerrado em {date}. Obrigado por utilizar nosso suporte, "
+     "não é necessário responder este email.", "Improdutivo"),
+    ("Olá {name}, seu chamado {ticket} foi reaberto em {date} porque precisamos de informações adicionais. "
+     "Poderia enviar os logs do erro para continuarmos a análise?", "Produtivo"),
+    ("Prezado(a) {name}, a fatura {ticket} com vencimento em {date} ainda não foi paga. "
+     "Solicitamos a regularização ou o envio do comprovante de pagamento.", "Produtivo"),
+    ("Oi {name}! Feliz aniversário! Que o dia {date} seja cheio de alegrias. Um abraço de toda a equipe.", "Improdutivo"),
+    ("Backup noturno do banco {host} concluído com sucesso em {date} às {hour}. Nenhuma ação necessária. "
+     "Relatório {ticket} disponível no portal.", "Improdutivo"),
+    ("Falha no backup noturno do banco {host} em {date} às {hour}. O job {ticket} terminou com erro, "
+     "favor verificar com urgência.", "Produtivo"),
+    ("{name}, sua senha do portal expira em {date}. Para trocar, acesse as configurações da conta. "
+     "Este é um aviso automático, referência {ticket}.", "Improdutivo"),
+]
+NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Íris", "João"]
+UNIQUE_LABELS = {
+    SHORT_EMAILS[0]: "Improdutivo", SHORT_EMAILS[1]: "Improdutivo", SHORT_EMAILS[2]: "Improdutivo",
+    SHORT_EMAILS[3]: "Improdutivo", SHORT_EMAILS[4]: "Produtivo", SHORT_EMAILS[5]: "Produtivo",
+    SHORT_EMAILS[6]: "Produtivo", SHORT_EMAILS[7]: "Produtivo",
+}
+
+def build_corpus(size: int, unique_fraction: float, seed: int = 3) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        if rng.random() < unique_fraction:
+            paragraphs = rng.sample(LONG_PARAGRAPHS + NEWSLETTER_PARAGRAPHS, 2)
+            opener = rng.choice(list(UNIQUE_LABELS))
+            label = UNIQUE_LABELS[opener]
+            corpus.append((f"{opener}\n\n" + "\n\n".join(paragraphs) + f"\nRef {rng.randint(1, 10**6)}", label))
+            continue
+        template, label = rng.choice(TEMPLATES)
+        corpus.append((template.format(
+            name=rng.choice(NAMES),
+            ticket=f"#{rng.randint(10000, 99999)}",
+            date=f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+            hour=f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            host=f"srv-{rng.choice(['db', 'app', 'web'])}-{rng.randint(1, 40):02d}"
+        ), label))
+    return corpus
+
+def _oracle_classification(email_text: str, label: str) -> EmailClassification:
+    return EmailClassification(
+        category=label,
+        confidence=0.95,
+        suggested_response="Olá! Recebemos sua mensagem e retornaremos em breve.",
+        reasoning="Classificação de referência",
+        is_urgent=False,
+        features_detected=EmailFeatures(
+            has_questions=False, has_urgency_indicators=False, has_request_indicators=False,
+            has_problem_indicators=False, has_technical_indicators=False, has_social_indicators=False,
+            formality_score=0.5, sentiment_indicators=SentimentIndicators(has_negative=False, has_positive=False, sentiment_score=0.0),
+            word_count=0, char_count=0
+        )
+    )
+
+async def evaluate(corpus: List[Tuple[str, str]], threshold: float, shingle_size: int) -> None:
+    index = NearDuplicateIndex(threshold=threshold, shingle_size=shingle_size)
+    exact_seen = set()
+    exact_hits = reused = correct = 0
+    lookup_times = []
+    for email_text, label in corpus:
+        normalized = ClassificationCache.normalize_text(email_text)
+        exact_hits += normalized in exact_seen
+        exact_seen.add(normalized)
+
+        start = time.perf_counter()
+        match = index.lookup(email_text)
+        lookup_times.append(time.perf_counter() - start)
+        if match is not None:
+            reused += 1
+            correct += match.classification.category == label
+            continue
+        await index.add(email_text, _oracle_classification(email_text, label))
+
+    total = len(corpus)
+    print(f"{threshold:>9.2f} {exact_hits / total:>11.1%} {reused / total:>14.1%} {index.refused:>9} "
+          f"{correct / reused if reused else 0:>10.1%} {reused - correct:>11} "
+          f"{statistics.median(lookup_times) * 1e6:>9.0f} µs {len(index._entries):>9}")
+
+def show_reuse_check() -> None:
+    previous = TEMPLATES[2][0].format(name="Ana", ticket="#12345", date="01/02/2024", hour="", host="")
+    current = TEMPLATES[2][0].format(name="Bruno", ticket="#67890", date="15/03/2024", hour="", host="")
+    print("\nreaproveitamento para outro remetente (Ana -> Bruno):")
+    for response in (
+        "Olá Ana, recebemos a solicitação sobre o chamado #12345 e enviaremos os logs até 01/02/2024.",
+        "Olá! Recebemos a solicitação e enviaremos os logs do erro em breve."
+    ):
+        leaks = NearDuplicateIndex.leaks_previous_email(response, previous, current)
+        print(f"  {'recusada' if leaks else 'reaproveitada'}: {response}")
+
+async def run(size: int, unique_fraction: float, thresholds: List[float], shingle_size: int) -> None:
+    corpus = build_corpus(size, unique_fraction)
+    print(f"{size} emails ({unique_fraction:.0%} únicos, {len(TEMPLATES)} modelos com nomes, datas e chamados variando), "
+          f"shingles de {shingle_size} palavras")
+    print(f"{'limiar':>9} {'cache exato':>11} {'reaproveitados':>14} {'recusados':>9} {'acurácia':>10} {'reusos err.':>11} "
+          f"{'lookup p50':>12} {'entradas':>9}")
+    for threshold in thresholds:
+        await evaluate(corpus, threshold, shingle_size)
+    show_reuse_check()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Taxa de reaproveitamento e acurácia do índice de quase-duplicatas")
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--unique-fraction", type=float, default=0.3)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.85, 0.9])
+    parser.add_argument("--shingle-size", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(run(args.emails, args.unique_fraction, args.thresholds, args.shingle_size))
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import io
+import resource
+import time
+import tracemalloc
+from typing import List
+import PyPDF2
+from config import settings
+from benchmarks.corpus import long_email
+from utils.file_utils import FileProcessor, shutdown_pdf_executor
+
+def build_pdf(pages: int, reference: str = "") -> bytes:
+    paragraph = f"{reference} {long_email(1, seed=3)}".strip().replace("\n", " ")
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for index in range(pages):
+        lines = [f"Pagina {index + 1}: {paragraph[start:start + 90]}" for start in range(0, min(len(paragraph), 2700), 90)]
+        commands = ["BT /F1 10 Tf 50 780 Td 12 TL"]
+        for line in lines:
+            escaped = line.encode("latin-1", "replace").decode("latin-1").replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            commands.append(f"({escaped}) '")
+        commands.append("ET")
+        stream = "\n".join(commands).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+def legacy_extract(content: bytes) -> str:
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    return text.strip()
+
+class _Upload:
+    def __init__(self, filename: str, content: bytes):
+        self.filename = filename
+        self.file = io.BytesIO(content)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+async def _measure(label: str, work) -> None:
+    lag = 0.0
+    running = True
+
+    async def ticker() -> None:
+        nonlocal lag
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lag = max(lag, time.perf_counter() - start - 0.005)
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    text = await work()
+    elapsed = time.perf_counter() - start
+    running = False
+    await tick_task
+
+    tracemalloc.start()
+    await work()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:>9.0f} ms {peak / 1024 / 1024:>9.1f} MB {lag * 1000:>10.0f} ms {len(text):>9}")
+
+async def run(page_counts: List[int]) -> None:
+    await FileProcessor.process_upload_file(_Upload("aquecimento.pdf", build_pdf(1)))
+    print(f"{'cenário':<28} {'tempo':>12} {'pico heap':>12} {'loop travado':>13} {'chars':>9}")
+    for pages in page_counts:
+        content = build_pdf(pages)
+        print(f"-- {pages} páginas ({len(content) / 1024:.0f} KB)")
+
+        async def legacy():
+            return legacy_extract(content)
+
+        async def bounded():
+            return await FileProcessor.process_upload_file(_Upload("email.pdf", content))
+
+        async def unbounded():
+            settings.pdf_max_pages, settings.pdf_max_chars = 0, 0
+            try:
+                return await FileProcessor.process_upload_file(_Upload("email.pdf", content))
+            finally:
+                settings.pdf_max_pages, settings.pdf_max_chars = limits
+
+        limits = (settings.pdf_max_pages, settings.pdf_max_chars)
+        await _measure("antigo (memória, +=)", legacy)
+        await _measure("novo sem limites", unbounded)
+        await _measure("novo com limites", bounded)
+
+    print(f"RSS máximo do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    shutdown_pdf_executor()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extração de PDF: caminho antigo vs. spool em disco com limites")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 50, 500])
+    args = parser.parse_args()
+    asyncio.run(run(args.pages))
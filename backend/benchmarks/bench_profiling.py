@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from urllib.parse import urlencode
+from config import settings
+from benchmarks.bench_metrics_overhead import _call
+from benchmarks.corpus import long_emails, short_emails
+from utils.profiling import ProfilingMiddleware, SamplingProfiler
+
+TOKEN = "bench-token"
+
+async def _timed(target, queries, headers=()) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        await _call(target, "/features-test", query, headers)
+    return (time.perf_counter() - start) / len(queries)
+
+async def overhead(app, queries, rounds: int) -> None:
+    middleware = ProfilingMiddleware(app)
+    results = {"desligado (sem middleware)": [], "ligado, sem amostragem": [], "ligado, 1% amostrado": []}
+    for _ in range(rounds):
+        settings.profiling_sample_rate = 0.0
+        results["desligado (sem middleware)"].append(await _timed(app, queries))
+        results["ligado, sem amostragem"].append(await _timed(middleware, queries))
+        settings.profiling_sample_rate = 0.01
+        results["ligado, 1% amostrado"].append(await _timed(middleware, queries))
+    settings.profiling_sample_rate = 0.0
+
+    base = statistics.median(results["desligado (sem middleware)"])
+    print(f"/features-test via ASGI ({len(queries)} requisições x {rounds} rodadas)")
+    for name, samples in results.items():
+        value = statistics.median(samples)
+        print(f"  {name:<28} {value * 1e6:>8.1f} µs/req ({(value - base) / base * 100:+.1f}%)")
+    print(f"  perfis gravados na amostragem: {middleware.profiled}")
+
+async def header_profile(app) -> None:
+    middleware = ProfilingMiddleware(app)
+    query = urlencode({"text": long_emails(1, paragraphs=40)[0]})
+    await _call(middleware, "/features-test", query, [(b"x-profile-token", TOKEN.encode())])
+    summaries = sorted(name for name in os.listdir(settings.profiling_dir) if name.endswith(".txt"))
+    with open(os.path.join(settings.profiling_dir, summaries[-1]), encoding="utf-8") as summary_file:
+        lines = [line for line in summary_file.read().splitlines() if line.strip()]
+    print(f"\nperfil por cabeçalho gravado em {summaries[-1]} (+ .prof); primeiras linhas:")
+    for line in lines[:12]:
+        print(f"  {line[:140]}")
+
+async def sampling(app, queries, seconds: float) -> None:
+    sampler = SamplingProfiler(settings.profiling_sample_interval_seconds)
+    done = asyncio.Event()
+
+    async def load() -> int:
+        served = 0
+        while not done.is_set():
+            for query in queries[:50]:
+                await _call(app, "/features-test", query)
+                served += 1
+            await asyncio.sleep(0)
+        return served
+
+    load_task = asyncio.create_task(load())
+    profile = await asyncio.to_thread(sampler.run, seconds)
+    done.set()
+    served = await load_task
+    summary = profile.summary(8)
+    print(f"\nperfil amostrado de {summary['seconds']:.1f}s ({summary['samples']} amostras, {served} requisições atendidas)")
+    print("  funções mais frequentes no topo da pilha:")
+    for entry in summary["functions"]:
+        print(f"  {entry['fraction']:>6.1%}  {entry['stack']}")
+    print(f"  pilhas completas em {profile.save_folded(settings.profiling_dir)}")
+
+async def run(args: argparse.Namespace) -> None:
+    settings.profiling_admin_token = TOKEN
+    settings.profiling_dir = tempfile.mkdtemp(prefix="perfis-")
+    from main import app
+    queries = [urlencode({"text": text}) for text in short_emails(args.requests, seed=5)]
+    async with app.router.lifespan_context(app):
+        await _timed(app, queries)
+        await overhead(app, queries, args.rounds)
+        await header_profile(app)
+        await sampling(app, queries, args.seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Custo e saída dos ganchos de profiling")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
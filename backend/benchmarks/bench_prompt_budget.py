@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+from config import settings
+from benchmarks.corpus import long_email, thread_email
+from benchmarks.fake_llm_server import FakeLLMServer
+
+def build_corpus(count: int) -> List[str]:
+    emails = []
+    for index in range(count):
+        if index % 2:
+            emails.append(thread_email(2 + index % 7, paragraphs=4, seed=index))
+        else:
+            emails.append(long_email(20 + index % 30, seed=index))
+    return [f"{email}\nRef {index}" for index, email in enumerate(emails)]
+
+async def run_scenario(label: str, emails: List[str], fake: FakeLLMServer, budget: int, strip: bool) -> None:
+    from services.classification_service import ClassificationService
+    settings.prompt_token_budget = budget
+    settings.strip_quoted_history = strip
+    service = ClassificationService()
+    requests_before, tokens_before = fake.request_count, fake.prompt_tokens_total
+
+    preprocess = []
+    for email in emails:
+        start = time.perf_counter()
+        service.preprocessor.prepare(email)
+        preprocess.append(time.perf_counter() - start)
+
+    latencies = []
+    for email in emails:
+        start = time.perf_counter()
+        await service.classify_email(email)
+        latencies.append(time.perf_counter() - start)
+    await service.openai_service.close()
+
+    calls = fake.request_count - requests_before
+    tokens = (fake.prompt_tokens_total - tokens_before) / calls
+    print(f"{label:<26} {tokens:>14.0f} {statistics.median(latencies) * 1000:>10.0f} ms "
+          f"{max(latencies) * 1000:>10.0f} ms {statistics.mean(preprocess) * 1000:>12.2f} ms")
+
+async def run(count: int, latency: float, per_1k: float) -> None:
+    fake = await FakeLLMServer(latency=latency, latency_per_1k_tokens=per_1k).start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_api_key = "bench"
+    settings.cache_enabled = False
+    emails = build_corpus(count)
+
+    print(f"{count} emails longos/threads, upstream {latency}s + {per_1k}s por 1k tokens de prompt")
+    print(f"{'cenário':<26} {'tokens/chamada':>14} {'p50':>13} {'máx':>13} {'pré-proc.':>15}")
+    await run_scenario("texto integral", emails, fake, 0, False)
+    await run_scenario("sem histórico/assinatura", emails, fake, 0, True)
+    for budget in (1500, 500):
+        await run_scenario(f"orçamento {budget} tokens", emails, fake, budget, True)
+    await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tamanho de prompt e latência com orçamento de tokens")
+    parser.add_argument("--emails", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--per-1k-tokens", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(run(args.emails, args.latency, args.per_1k_tokens))
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+import aiohttp
+from config import settings
+from utils.metrics import FALLBACKS
+from benchmarks.app_server import fetch_metrics, start_app
+from benchmarks.fake_llm_server import FakeLLMServer
+
+TEXT = "Preciso de ajuda com o sistema, poderiam verificar o erro? Chamado {}"
+
+async def _post(session: aiohttp.ClientSession, url: str, client: str, index: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    async with session.post(url, json={"text": TEXT.format(f"{client}-{index}")}, headers={"X-API-Key": client}) as response:
+        await response.read()
+        return {"status": response.status, "latency": time.perf_counter() - start}
+
+async def _serve(port: int, **overrides) -> object:
+    settings.cache_enabled = False
+    settings.rate_limit_enabled = False
+    settings.llm_max_concurrency = 0
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    return await start_app(port)
+
+async def _stop(app_server) -> None:
+    app_server.should_exit = True
+    await asyncio.sleep(0.3)
+
+async def client_buckets(port: int) -> None:
+    fake = await FakeLLMServer(latency=0.02).start()
+    settings.openai_api_base = fake.api_base
+    app_server = await _serve(port, rate_limit_enabled=True, rate_limit_per_minute=60, rate_limit_burst=10)
+    url = f"http://127.0.0.1:{port}/classify-text"
+    async with aiohttp.ClientSession() as session:
+        noisy = await asyncio.gather(*(_post(session, url, "barulhento", index) for index in range(50)))
+        quiet = await asyncio.gather(*(_post(session, url, "tranquilo", index) for index in range(5)))
+        metrics = await fetch_metrics(session, f"http://127.0.0.1:{port}")
+    await _stop(app_server)
+    await fake.stop()
+
+    print("limite por cliente (60/min, rajada de 10)")
+    print(f"  cliente barulhento: {sum(r['status'] == 200 for r in noisy)} aceitas, "
+          f"{sum(r['status'] == 429 for r in noisy)} recusadas com 429")
+    print(f"  cliente tranquilo: {sum(r['status'] == 200 for r in quiet)}/{len(quiet)} aceitas")
+    print(f"  métricas: aceitas {metrics['sparkmail_rate_limit_allowed_total']:.0f}, "
+          f"recusadas {metrics['sparkmail_rate_limit_rejected_total']:.0f}")
+    if any(r["status"] != 200 for r in quiet) or not any(r["status"] == 429 for r in noisy):
+        raise SystemExit("Limite por cliente não isolou os clientes")
+
+async def fairness(port: int, capacity: int, noisy_clients: int, fair: bool) -> List[float]:
+    fake = await FakeLLMServer(latency=0.05, capacity=capacity).start()
+    settings.openai_api_base = fake.api_base
+    app_server = await _serve(port, llm_max_concurrency=capacity if fair else 0)
+    url = f"http://127.0.0.1:{port}/classify-text"
+    done = asyncio.Event()
+
+    async def noisy_client(worker: int) -> None:
+        index = 0
+        while not done.is_set():
+            await _post(session, url, "barulhento", worker * 100000 + index)
+            index += 1
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        noisy = [asyncio.create_task(noisy_client(worker)) for worker in range(noisy_clients)]
+        await asyncio.sleep(1.0)
+        quiet = []
+        for index in range(10):
+            quiet.append((await _post(session, url, "tranquilo", index))["latency"])
+        done.set()
+        await asyncio.gather(*noisy)
+    await _stop(app_server)
+    await fake.stop()
+    return quiet
+
+async def adaptation(port: int, per_window: int, requests: int, scheduler: bool) -> Dict[str, object]:
+    fake = await FakeLLMServer(latency=0.05, requests_per_window=per_window, window_seconds=1.0).start()
+    settings.openai_api_base = fake.api_base
+    app_server = await _serve(port, llm_max_concurrency=64 if scheduler else 0, openai_max_retries=6)
+    url = f"http://127.0.0.1:{port}/classify-text"
+    fallbacks_before = FALLBACKS.value("llm_error")
+    start = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        results = await asyncio.gather(*(_post(session, url, "lote", index) for index in range(requests)))
+        metrics = await fetch_metrics(session, f"http://127.0.0.1:{port}")
+    elapsed = time.perf_counter() - start
+    await _stop(app_server)
+    await fake.stop()
+    return {
+        "elapsed": elapsed,
+        "upstream_429": fake.rate_limited_count,
+        "fallbacks": int(FALLBACKS.value("llm_error") - fallbacks_before),
+        "limit": metrics.get("sparkmail_llm_concurrency_limit"),
+        "ok": sum(r["status"] == 200 for r in results)
+    }
+
+async def run(port: int, capacity: int, noisy_clients: int) -> None:
+    settings.openai_api_key = "sk-fake"
+    settings.api_keys = "barulhento,tranquilo,lote"
+    await client_buckets(port)
+
+    print(f"\nfila justa: upstream com {capacity} vagas, cliente barulhento com {noisy_clients} conexões em laço "
+          f"e 10 requisições sequenciais do tranquilo")
+    print(f"  {'fila':<22} {'p50 tranquilo':>14} {'máx tranquilo':>14}")
+    for fair in (False, True):
+        quiet = await fairness(port + 1, capacity, noisy_clients, fair)
+        label = f"justa ({capacity} vagas)" if fair else "sem controle (FIFO)"
+        print(f"  {label:<22} {statistics.median(quiet) * 1000:>11.0f} ms {max(quiet) * 1000:>11.0f} ms")
+
+    print("\nadaptação ao limite da OpenAI (20 requisições por segundo, 120 emails = 240 chamadas)")
+    print(f"  {'agendador':<12} {'429 recebidos':>14} {'fallbacks':>10} {'teto final':>11} {'tempo':>7}")
+    for scheduler in (False, True):
+        result = await adaptation(port + 2, 20, 120, scheduler)
+        limit = f"{result['limit']:.1f}" if result["limit"] is not None else "-"
+        print(f"  {'sim' if scheduler else 'não':<12} {result['upstream_429']:>14} {result['fallbacks']:>10} "
+              f"{limit:>11} {result['elapsed']:>6.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Limite por cliente, fila justa e adaptação ao rate limit da OpenAI")
+    parser.add_argument("--port", type=int, default=8019)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--noisy-clients", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.port, args.capacity, args.noisy_clients))
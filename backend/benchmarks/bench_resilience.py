@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+from config import settings
+from benchmarks.fake_llm_server import FakeLLMServer
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+async def _classify_many(service, count: int, prefix: str) -> List[float]:
+    latencies = []
+    for index in range(count):
+        start = time.perf_counter()
+        await service.classify_email(f"{prefix} Preciso de ajuda com o sistema, chamado {index}")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+async def scenario_deadline(fake: FakeLLMServer) -> None:
+    from services.classification_service import ClassificationService
+    fake.latency, fake.jitter, fake.failure_rate = 2.0, 0.0, 0.0
+    settings.openai_timeout_seconds = 0.3
+    settings.openai_max_retries = 0
+    service = ClassificationService()
+    latencies = await _classify_many(service, 3, "prazo")
+    print(f"[prazo] upstream de 2s com prazo de 0.3s: p50 {statistics.median(latencies):.2f}s, "
+          f"estatísticas {service.openai_service.resilience_stats()}")
+    await service.openai_service.close()
+
+async def scenario_breaker(fake: FakeLLMServer) -> None:
+    from services.classification_service import ClassificationService
+    fake.latency, fake.jitter, fake.failure_rate = 0.2, 0.0, 1.0
+    settings.openai_timeout_seconds = 5
+    settings.openai_max_retries = 1
+    settings.openai_retry_base_delay = 0.05
+    settings.circuit_failure_threshold = 3
+    settings.circuit_recovery_seconds = 1.0
+    service = ClassificationService()
+    
+    latencies = await _classify_many(service, 10, "falha")
+    breaker = service.openai_service.resilience_stats()["circuit_breaker"]
+    print(f"[disjuntor] upstream falhando: primeiras {latencies[0]:.2f}s, últimas {latencies[-1]:.3f}s, "
+          f"estado {breaker['state']}, curto-circuitos {breaker['short_circuited']}")
+    
+    fake.failure_rate = 0.0
+    await asyncio.sleep(settings.circuit_recovery_seconds)
+    await _classify_many(service, 2, "recuperado")
+    print(f"[disjuntor] após recuperação: {service.openai_service.resilience_stats()}")
+    await service.openai_service.close()
+
+async def scenario_hedging(fake: FakeLLMServer, count: int) -> None:
+    from services.classification_service import ClassificationService
+    fake.latency, fake.jitter, fake.failure_rate = 0.05, 0.15, 0.0
+    settings.openai_timeout_seconds = 10
+    settings.openai_max_retries = 0
+    
+    for hedge_delay in (0.0, 0.15):
+        settings.openai_hedge_delay_seconds = hedge_delay
+        service = ClassificationService()
+        latencies = await asyncio.gather(*(
+            _classify_many(service, count // 10, f"hedge{hedge_delay}-{worker}") for worker in range(10)
+        ))
+        latencies = [latency for worker in latencies for latency in worker]
+        stats = service.openai_service.resilience_stats()
+        print(f"[hedge {hedge_delay:.2f}s] p50 {_percentile(latencies, 0.5):.3f}s "
+              f"p95 {_percentile(latencies, 0.95):.3f}s p99 {_percentile(latencies, 0.99):.3f}s "
+              f"hedges {stats['hedges']}")
+        await service.openai_service.close()
+    settings.openai_hedge_delay_seconds = 0.0
+
+async def run(count: int) -> None:
+    fake = await FakeLLMServer().start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_api_key = "sk-fake"
+    settings.cache_enabled = False
+    
+    await scenario_deadline(fake)
+    await scenario_breaker(fake)
+    await scenario_hedging(fake, count)
+    await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prazo, retentativas, disjuntor e hedge contra um LLM falso que injeta latência e erros")
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.count))
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List
+from config import settings
+from benchmarks.corpus import SHORT_EMAILS
+from benchmarks.fake_llm_server import FakeLLMServer
+
+UNPRODUCTIVE_EMAILS = SHORT_EMAILS[:4] + [
+    "Feliz natal e um próspero ano novo a todos!\n\nAbraços,\nMariana Costa",
+    "Reunião confirmada para 15/03 às 10h.\n\nAtt, Roberto",
+    "Parabéns pela conquista do prêmio, muito sucesso para a equipe!",
+]
+
+def corpus(size: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(SHORT_EMAILS + UNPRODUCTIVE_EMAILS)}\nRef {index}" for index in range(size)]
+
+def category_for(prompt: str) -> str:
+    return "Improdutivo" if any(email.split("\n")[0] in prompt for email in UNPRODUCTIVE_EMAILS) else "Produtivo"
+
+async def evaluate(emails: List[str], templates: bool, concurrency: int, fake: FakeLLMServer) -> Dict[str, object]:
+    from services.classification_service import ClassificationService
+    settings.response_templates_enabled = templates
+    service = ClassificationService()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    calls_before = fake.request_count
+
+    async def classify(email_text: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await service.classify_email(email_text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(classify(email_text) for email_text in emails))
+    elapsed = time.perf_counter() - start
+    await service.openai_service.close()
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "llm_calls": fake.request_count - calls_before,
+        "stats": service.template_stats()
+    }
+
+async def run(args: argparse.Namespace) -> None:
+    fake = await FakeLLMServer(latency=args.latency, category_for=category_for).start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_api_key = "sk-fake"
+    settings.cache_enabled = False
+    settings.near_duplicate_enabled = False
+    settings.local_model_path = ""
+    settings.classification_mode = "two_call"
+
+    emails = corpus(args.emails)
+    baseline = await evaluate(emails, False, args.concurrency, fake)
+    templated = await evaluate(emails, True, args.concurrency, fake)
+    await fake.stop()
+
+    print(f"{len(emails)} emails curtos, {args.concurrency} simultâneos, LLM falso com {args.latency}s por chamada")
+    print(f"{'configuração':<14} {'chamadas LLM':>13} {'p50':>8} {'p95':>8} {'total':>8}")
+    for name, result in (("só LLM", baseline), ("com templates", templated)):
+        print(f"{name:<14} {result['llm_calls']:>13} {result['p50'] * 1000:>5.0f} ms {result['p95'] * 1000:>5.0f} ms "
+              f"{result['elapsed']:>6.1f} s")
+
+    stats = templated["stats"]
+    print(f"\nsegunda chamada evitada em {stats['skip_rate']:.1%} dos emails "
+          f"({stats['template_responses']} de {stats['template_responses'] + stats['generated_responses']})")
+    print(f"tempo de geração economizado (estimado): {stats['estimated_seconds_saved']:.1f} s "
+          f"({stats['average_generation_seconds'] * 1000:.0f} ms por resposta gerada)")
+    print(f"uso por template: {stats['used']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantas gerações de resposta os templates substituem")
+    parser.add_argument("--emails", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+from config import settings
+
+settings.metrics_enabled = False
+settings.openai_api_key = "sk-fake"
+settings.cache_enabled = True
+settings.cache_sqlite_path = ""
+
+from benchmarks.corpus import long_emails, short_emails
+from benchmarks.fake_llm_server import FakeLLMServer
+
+async def _call(app, method: str, path: str, query: str = "", body: bytes = b"") -> Tuple[int, bytes]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    }
+    response = {"status": 0, "body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["body"]
+
+def _requests(texts: List[str]) -> Dict[str, List[Tuple[str, str, str, bytes]]]:
+    bodies = [json.dumps({"text": text}).encode() for text in texts]
+    return {
+        "/features-test": [("GET", "/features-test", urlencode({"text": text}), b"") for text in texts],
+        "/classify-text": [("POST", "/classify-text", "", body) for body in bodies],
+        "/classify-text?compact=true": [("POST", "/classify-text", "compact=true", body) for body in bodies],
+    }
+
+async def cpu_per_request(app, requests, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.process_time()
+        for request in requests:
+            await _call(app, *request)
+        samples.append((time.process_time() - start) / len(requests))
+    return statistics.median(samples)
+
+async def memory_per_request(app, requests) -> Tuple[float, float]:
+    peaks = []
+    sizes = []
+    tracemalloc.start()
+    for request in requests:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        status, body = await _call(app, *request)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        sizes.append(len(body))
+        if status != 200:
+            raise SystemExit(f"{request[1]} respondeu {status}: {body[:200]!r}")
+    tracemalloc.stop()
+    return statistics.median(peaks), statistics.median(sizes)
+
+async def serialization_step(app, iterations: int, batch_size: int) -> None:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from models.schemas import BatchClassificationResponse, BatchItemResult, EmailClassification
+    from services.feature_extraction_service import FeatureExtractionService
+    from utils.responses import ModelResponse
+
+    fields = {route.path: route.response_field for route in app.routes if getattr(route, "response_field", None)}
+    feature_service = FeatureExtractionService()
+    texts = long_emails(batch_size, paragraphs=6, seed=3)
+    classifications = [
+        EmailClassification(
+            category="Produtivo", confidence=0.93, suggested_response=text, reasoning=text[:400], is_urgent=True,
+            features_detected=feature_service.extract_features(text)
+        )
+        for text in texts
+    ]
+    batch = BatchClassificationResponse(
+        total=batch_size, succeeded=batch_size, failed=0, unique_texts=batch_size,
+        results=[BatchItemResult(index=index, classification=item) for index, item in enumerate(classifications)]
+    )
+
+    def cases(content, path):
+        async def generic():
+            return JSONResponse(await serialize_response(field=fields[path], response_content=content))
+
+        async def fast():
+            return ModelResponse(content)
+
+        async def compact():
+            return ModelResponse(content, exclude={"features_detected"})
+
+        yield "response_model + JSONResponse", generic
+        yield "ModelResponse", fast
+        if path == "/classify-text":
+            yield "ModelResponse compacto", compact
+
+    print(f"\nsó a serialização (resposta sugerida de {len(texts[0])} caracteres por email)")
+    print(f"{'conteúdo':<16} {'caminho':<32} {'CPU (µs)':>10} {'pico alocado (KB)':>18} {'bytes':>9}")
+    for label, content, path, repeats in (
+        ("1 classificação", classifications[0], "/classify-text", iterations),
+        (f"lote de {batch_size}", batch, "/classify-batch", max(iterations // batch_size, 5))
+    ):
+        for name, build in cases(content, path):
+            start = time.process_time()
+            for _ in range(repeats):
+                await build()
+            cpu = (time.process_time() - start) / repeats
+            tracemalloc.start()
+            response = await build()
+            response = None
+            tracemalloc.reset_peak()
+            response = await build()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:<16} {name:<32} {cpu * 1e6:>10.1f} {peak / 1024:>18.1f} {len(response.body):>9}")
+
+async def run(args: argparse.Namespace) -> None:
+    fake = await FakeLLMServer(latency=0.0).start()
+    settings.openai_api_base = fake.api_base
+    from main import app
+    texts = short_emails(args.requests // 2, seed=13) + long_emails(args.requests // 2, paragraphs=6, seed=13)
+    async with app.router.lifespan_context(app):
+        for request in _requests(texts)["/classify-text"]:
+            await _call(app, *request)
+        print(f"{args.requests} emails (metade longos), /classify-text servido do cache; "
+              f"CPU = mediana de {args.rounds} rodadas")
+        print(f"{'rota':<30} {'CPU (µs/req)':>13} {'pico alocado (KB)':>18} {'resposta (B)':>13}")
+        for name, requests in _requests(texts).items():
+            cpu = await cpu_per_request(app, requests, args.rounds)
+            peak, size = await memory_per_request(app, requests)
+            print(f"{name:<30} {cpu * 1e6:>13.1f} {peak / 1024:>18.1f} {size:>13.0f}")
+        await serialization_step(app, args.iterations, args.batch_size)
+    await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU e memória por requisição na serialização das respostas")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import statistics
+import time
+import aiohttp
+from config import settings
+from benchmarks.app_server import start_app
+from benchmarks.fake_llm_server import FakeLLMServer
+
+async def _measure_blocking(session: aiohttp.ClientSession, url: str, text: str) -> float:
+    start = time.perf_counter()
+    async with session.post(url, json={"text": text}) as response:
+        await response.read()
+    return time.perf_counter() - start
+
+async def _measure_stream(session: aiohttp.ClientSession, url: str, text: str):
+    start = time.perf_counter()
+    first_event = first_token = None
+    async with session.post(url, json={"text": text}) as response:
+        async for line in response.content:
+            if line.startswith(b"event: classification") and first_event is None:
+                first_event = time.perf_counter() - start
+            elif line.startswith(b"event: token") and first_token is None:
+                first_token = time.perf_counter() - start
+    return first_event, first_token, time.perf_counter() - start
+
+async def run(count: int, latency: float, port: int) -> None:
+    fake = await FakeLLMServer(latency=latency).start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_api_key = "sk-fake"
+    settings.cache_enabled = False
+    app_server = await start_app(port)
+    base = f"http://127.0.0.1:{port}"
+    text = "Bom dia, preciso de suporte na configuração da integração com a API. Email {}"
+    
+    blocking, classification_ttfb, token_ttfb, streamed_total = [], [], [], []
+    async with aiohttp.ClientSession() as session:
+        for index in range(count):
+            blocking.append(await _measure_blocking(session, f"{base}/classify-text", text.format(index)))
+            first_event, first_token, total = await _measure_stream(
+                session, f"{base}/classify-text/stream", text.format(f"s{index}")
+            )
+            classification_ttfb.append(first_event)
+            token_ttfb.append(first_token)
+            streamed_total.append(total)
+    
+    app_server.should_exit = True
+    await asyncio.sleep(0.2)
+    await fake.stop()
+    
+    total = statistics.median(blocking)
+    print(f"/classify-text (sem streaming), p50 total: {total:.3f}s")
+    print(f"/classify-text/stream, p50 até a classificação: {statistics.median(classification_ttfb):.3f}s")
+    print(f"/classify-text/stream, p50 até o primeiro token: {statistics.median(token_ttfb):.3f}s "
+          f"({statistics.median(token_ttfb) / total:.0%} do total sem streaming)")
+    print(f"/classify-text/stream, p50 total: {statistics.median(streamed_total):.3f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo até o primeiro byte do endpoint com streaming")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8012)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.latency, args.port))
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+from urllib.parse import urlencode
+import aiohttp
+from benchmarks.corpus import short_emails
+from benchmarks.fake_llm_server import FakeLLMServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def _wait_ready(session: aiohttp.ClientSession, base: str, process: subprocess.Popen, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise SystemExit(f"Servidor encerrou durante a inicialização (código {process.returncode})")
+        try:
+            async with session.get(f"{base}/health") as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.02)
+    raise SystemExit("Servidor não respondeu /health a tempo")
+
+async def _throughput(session: aiohttp.ClientSession, requests: List[Dict], concurrency: int) -> float:
+    pending = list(requests)
+
+    async def client() -> None:
+        while pending:
+            request = pending.pop()
+            async with session.request(**request) as response:
+                await response.read()
+                if response.status != 200:
+                    raise SystemExit(f"Status inesperado em {request['url']}: {response.status}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return len(requests) / (time.perf_counter() - start)
+
+BASELINE_COMMAND = ["-m", "uvicorn", "main:app", "--loop", "asyncio", "--http", "h11", "--log-level", "warning"]
+
+async def measure(
+    workers: int, port: int, api_base: str, requests: int, concurrency: int, baseline: bool = False
+) -> Dict[str, float]:
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(workers),
+        OPENAI_API_BASE=api_base,
+        OPENAI_API_KEY="sk-fake",
+        CACHE_ENABLED="false",
+        LOG_DIR=""
+    )
+    process = subprocess.Popen(
+        [sys.executable] + (BASELINE_COMMAND + ["--port", str(port)] if baseline else ["main.py"]),
+        cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    texts = short_emails(requests, seed=11)
+    try:
+        async with aiohttp.ClientSession() as session:
+            cold_start = await _wait_ready(session, base, process, timeout=60)
+            features = [
+                {"method": "GET", "url": f"{base}/features-test?{urlencode({'text': text})}"} for text in texts
+            ]
+            classify = [
+                {"method": "POST", "url": f"{base}/classify-text", "json": {"text": f"{text} (#{index})"}}
+                for index, text in enumerate(texts)
+            ]
+            await _throughput(session, features[:50], concurrency)
+            return {
+                "cold_start": cold_start,
+                "features": await _throughput(session, features, concurrency),
+                "classify": await _throughput(session, classify, concurrency)
+            }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+async def run(worker_counts: List[int], requests: int, concurrency: int, latency: float, port: int) -> None:
+    fake = await FakeLLMServer(latency=latency).start()
+    results = {"asyncio/h11": await measure(1, port, fake.api_base, requests, concurrency, baseline=True)}
+    for workers in worker_counts:
+        results[f"{workers}"] = await measure(workers, port, fake.api_base, requests, concurrency)
+    await fake.stop()
+
+    print(f"CPUs disponíveis: {os.cpu_count()}, {requests} requisições por rota, {concurrency} clientes simultâneos, "
+          f"LLM falso com {latency:.2f}s por chamada")
+    print(f"{'workers':>12} {'cold start':>11} {'/features-test':>15} {'/classify-text':>15}")
+    for workers, result in results.items():
+        print(f"{workers:>12} {result['cold_start'] * 1000:>8.0f} ms {result['features']:>11.0f} r/s "
+              f"{result['classify']:>11.0f} r/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start e vazão do perfil de produção com N workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8015)
+    args = parser.parse_args()
+    asyncio.run(run(args.workers, args.requests, args.concurrency, args.latency, args.port))
@@ -0,0 +1,71 @@
+import random
+from typing import List
+
+SHORT_EMAILS = [
+    "Feliz natal para toda a equipe! Obrigado pela parceria neste ano.",
+    "Parabéns pelo aniversário! Muito sucesso.",
+    "Oi, tudo bem? Valeu pelo café de ontem, abraço!",
+    "Obrigado pelo retorno rápido, ficou excelente.",
+    "Prezado, poderia me enviar o relatório de vendas de março?",
+    "Urgente: o sistema parou de funcionar e não consigo acessar a plataforma.",
+    "Qual o telefone para ligar em caso de emergência?",
+    "Bom dia, preciso de suporte na configuração da integração com a API.",
+]
+
+LONG_PARAGRAPHS = [
+    "Prezado(a) senhor(a), gostaria de relatar um problema recorrente no servidor de produção. "
+    "Desde a atualização de ontem, o aplicativo apresenta erro ao gravar no banco de dados e os usuários não conseguem concluir pedidos.",
+    "Já tentamos reiniciar o serviço e revisar a configuração, mas a falha persiste. "
+    "Os logs indicam timeout na integração com o sistema de pagamentos, o que está impactando o faturamento.",
+    "Solicito, por favor, prioridade na análise, pois o cliente final está insatisfeito e ameaçou cancelar o contrato. "
+    "Fico à disposição para uma chamada hoje mesmo, se necessário.",
+    "Além disso, precisamos entender o prazo estimado para a correção definitiva e se existe algum procedimento de contorno. "
+    "Poderia nos informar quais dados adicionais devemos coletar para acelerar o diagnóstico?",
+]
+
+NEWSLETTER_PARAGRAPHS = [
+    "Confira as novidades da semana na nossa loja online. Temos descontos em roupas, calçados e acessórios para toda a família.",
+    "Nesta edição, trazemos dicas de leitura, receitas rápidas para o dia a dia e uma seleção de viagens com preços especiais.",
+    "Os cupons são válidos até domingo e podem ser usados em compras acima de cem reais, exceto em itens já promocionais.",
+    "Você está recebendo esta mensagem porque se cadastrou em nosso site. Para deixar de receber, acesse suas preferências.",
+]
+
+def short_emails(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(SHORT_EMAILS)} Ref {index}" for index in range(count)]
+
+def long_email(paragraphs: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    body = "\n\n".join(rng.choice(LONG_PARAGRAPHS) for _ in range(paragraphs))
+    return f"{body}\n\nAtenciosamente,\nCarlos Souza"
+
+def long_emails(count: int, paragraphs: int = 12, seed: int = 7) -> List[str]:
+    return [f"{long_email(paragraphs, seed + index)} Ref {index}" for index in range(count)]
+
+
+def newsletter_email(paragraphs: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    return "\n\n".join(rng.choice(NEWSLETTER_PARAGRAPHS) for _ in range(paragraphs))
+
+SIGNATURE = (
+    "--\nCarlos Souza\nAnalista de Operações | Empresa Exemplo Ltda.\nTel.: (11) 4002-8922\n\n"
+    "AVISO DE CONFIDENCIALIDADE: esta mensagem e seus anexos são destinados exclusivamente ao destinatário "
+    "e podem conter informações confidenciais. Se você a recebeu por engano, apague-a e avise o remetente."
+)
+
+def thread_email(replies: int, paragraphs: int = 3, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    message = f"{long_email(paragraphs, seed)}\n\n{SIGNATURE}"
+    for index in range(replies):
+        quoted = "\n".join(f"> {line}" for line in message.split("\n"))
+        if rng.random() < 0.5:
+            header = f"Em seg., {index + 1} de mar. de 2024 às 10:{index % 60:02d}, Suporte <suporte@exemplo.com> escreveu:"
+            message = f"{long_email(rng.randint(1, paragraphs), seed + index + 1)}\n\n{SIGNATURE}\n\n{header}\n{quoted}"
+        else:
+            header = (
+                "________________________________\nDe: Suporte <suporte@exemplo.com>\n"
+                f"Enviado: segunda-feira, {index + 1} de março de 2024 10:00\nPara: Carlos Souza\nAssunto: RE: Falha no servidor"
+            )
+            message = f"{long_email(rng.randint(1, paragraphs), seed + index + 1)}\n\n{SIGNATURE}\n\n{header}\n\n{message}"
+    return message
+
@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+from aiohttp import web
+
+CLASSIFICATION_MARKER = "Responda APENAS em formato JSON"
+
+class FakeLLMServer:
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        error_status: int = 500,
+        latency_per_1k_tokens: float = 0.0,
+        model_latency: Optional[Dict[str, float]] = None,
+        capacity: int = 0,
+        requests_per_window: int = 0,
+        window_seconds: float = 1.0,
+        category_for: Optional[Callable[[str], str]] = None
+    ):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.model_latency = model_latency or {}
+        self.model_counts: Dict[str, int] = {}
+        self._capacity = asyncio.Semaphore(capacity) if capacity > 0 else None
+        self.requests_per_window = requests_per_window
+        self.window_seconds = window_seconds
+        self._window_start = 0.0
+        self._window_count = 0
+        self.rate_limited_count = 0
+        self.category_for = category_for
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.error_status = error_status
+        self.failure_count = 0
+        self.request_count = 0
+        self.prompt_tokens_total = 0
+        self.completion_tokens_total = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+    
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+    
+    async def start(self, port: int = 0) -> "FakeLLMServer":
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+    
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+    
+    async def _chat_completions(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self.request_count += 1
+        model = payload.get("model", "fake")
+        self.model_counts[model] = self.model_counts.get(model, 0) + 1
+        headers = self._rate_limit_headers()
+        if headers.get("x-ratelimit-remaining-requests") == "-1":
+            self.rate_limited_count += 1
+            headers["x-ratelimit-remaining-requests"] = "0"
+            headers["retry-after"] = headers["x-ratelimit-reset-requests"].rstrip("s")
+            return web.json_response(
+                {"error": {"message": "Rate limit simulado", "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429,
+                headers=headers
+            )
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self._capacity is not None:
+                async with self._capacity:
+                    await asyncio.sleep(self._sample_latency(model) + self._prefill_latency(payload))
+                return web.json_response(self._build_completion(payload), headers=headers)
+            if random.random() < self.failure_rate:
+                self.failure_count += 1
+                await asyncio.sleep(self._sample_latency(model))
+                return web.json_response(
+                    {"error": {"message": "Falha simulada", "type": "server_error", "code": None}},
+                    status=self.error_status
+                )
+            if payload.get("stream"):
+                return await self._stream_completion(request, payload)
+            await asyncio.sleep(self._sample_latency(model) + self._prefill_latency(payload))
+        finally:
+            self.in_flight -= 1
+        
+        return web.json_response(self._build_completion(payload), headers=headers)
+    
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        if not self.requests_per_window:
+            return {}
+        now = time.monotonic()
+        if now - self._window_start >= self.window_seconds:
+            self._window_start = now
+            self._window_count = 0
+        self._window_count += 1
+        reset = self.window_seconds - (now - self._window_start)
+        return {
+            "x-ratelimit-limit-requests": str(self.requests_per_window),
+            "x-ratelimit-remaining-requests": str(max(self.requests_per_window - self._window_count, -1)),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s"
+        }
+    
+    def _sample_latency(self, model: str = "") -> float:
+        latency = self.model_latency.get(model, self.latency)
+        if not self.jitter:
+            return latency
+        return max(0.0, latency + random.expovariate(1 / self.jitter))
+    
+    def _prefill_latency(self, payload: Dict[str, Any]) -> float:
+        if not self.latency_per_1k_tokens:
+            return 0.0
+        prompt_chars = sum(len(message.get("content", "")) for message in payload.get("messages", []))
+        return prompt_chars / 4 / 1000 * self.latency_per_1k_tokens
+    
+    async def _stream_completion(self, request: web.Request, payload: Dict[str, Any]) -> web.StreamResponse:
+        content = self._build_completion(payload)["choices"][0]["message"]["content"]
+        tokens = [token + " " for token in content.split(" ")]
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        
+        for token in tokens:
+            await asyncio.sleep(self.latency / len(tokens))
+            chunk = {
+                "id": f"chatcmpl-fake-{self.request_count}",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": payload.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+    
+    def _build_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        messages = payload.get("messages", [])
+        prompt = "\n".join(message.get("content", "") for message in messages)
+        
+        reply = "Prezado(a),\nRecebemos sua mensagem e retornaremos em breve.\nAtenciosamente,\nEquipe"
+        if CLASSIFICATION_MARKER in prompt:
+            result = {
+                "category": self.category_for(prompt) if self.category_for else "Produtivo",
+                "confidence": 0.9,
+                "reasoning": "Resposta simulada pelo servidor de teste",
+                "is_urgent": False,
+                "key_indicators": ["simulado"],
+                "special_type": "standard"
+            }
+            if '"suggested_response"' in prompt:
+                result["suggested_response"] = reply
+            content = json.dumps(result)
+        else:
+            content = reply
+        
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        self.prompt_tokens_total += prompt_tokens
+        self.completion_tokens_total += completion_tokens
+        return {
+            "id": f"chatcmpl-fake-{self.request_count}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": payload.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+async def _serve(port: int, latency: float, jitter: float, failure_rate: float) -> None:
+    server = await FakeLLMServer(latency=latency, jitter=jitter, failure_rate=failure_rate).start(port)
+    print(f"Servidor LLM falso em {server.api_base} (latência {latency}s, jitter {jitter}s, falhas {failure_rate:.0%})")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API de chat completions da OpenAI")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.0, help="média da cauda exponencial somada à latência")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(_serve(args.port, args.latency, args.jitter, args.failure_rate))
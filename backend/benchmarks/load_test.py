@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import time
+import aiohttp
+from config import settings
+from benchmarks.app_server import start_app
+from benchmarks.fake_llm_server import FakeLLMServer
+
+async def run(concurrency: int, latency: float, port: int) -> None:
+    fake = await FakeLLMServer(latency=latency).start()
+    settings.openai_api_base = fake.api_base
+    settings.openai_api_key = "sk-fake"
+    app_server = await start_app(port)
+    
+    url = f"http://127.0.0.1:{port}/classify-text"
+    text = "Preciso de ajuda urgente, o sistema parou de funcionar. Como resolver? Chamado {}"
+    
+    async with aiohttp.ClientSession() as session:
+        async def call(index: int) -> float:
+            start = time.perf_counter()
+            async with session.post(url, json={"text": text.format(index)}) as response:
+                await response.json()
+                assert response.status == 200, response.status
+            return time.perf_counter() - start
+        
+        await call(-1)
+        fake.max_in_flight = 0
+        
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(call(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    
+    app_server.should_exit = True
+    await asyncio.sleep(0.2)
+    await fake.stop()
+    
+    serial_estimate = concurrency * 2 * latency
+    print(f"requisições simultâneas: {concurrency}")
+    print(f"latência do LLM falso: {latency:.2f}s (2 chamadas por email)")
+    print(f"tempo total: {elapsed:.2f}s (serial seria ~{serial_estimate:.2f}s)")
+    print(f"latência média por requisição: {sum(latencies) / len(latencies):.2f}s")
+    print(f"máximo de chamadas simultâneas no upstream: {fake.max_in_flight}")
+    
+    if elapsed >= serial_estimate / 2:
+        raise SystemExit("Requisições foram enfileiradas em vez de sobrepostas")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga de /classify-text contra um LLM falso local")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.latency, args.port))
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+import aiohttp
+from benchmarks.bench_pdf_extraction import build_pdf
+from benchmarks.bench_workers import BACKEND_DIR, _wait_ready
+from benchmarks.corpus import long_emails, short_emails, thread_email
+from benchmarks.fake_llm_server import FakeLLMServer
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def process_memory(pid: int) -> Dict[str, Optional[float]]:
+    memory = {"rss_mb": None, "peak_rss_mb": None}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    memory["rss_mb"] = int(line.split()[1]) / 1024
+                elif line.startswith("VmHWM:"):
+                    memory["peak_rss_mb"] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return memory
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def build_scenarios(base: str, requests: int) -> Dict[str, List[Dict[str, Any]]]:
+    short = short_emails(requests, seed=21)
+    duplicates = short_emails(max(requests // 20, 1), seed=22)
+    pdf_count = max(requests // 10, 1)
+
+    def pdf_upload(index: int) -> aiohttp.FormData:
+        data = aiohttp.FormData()
+        data.add_field("file", build_pdf(3, reference=f"Ref {index}"), filename=f"email-{index}.pdf", content_type="application/pdf")
+        return data
+
+    return {
+        "features_test": [
+            {"method": "GET", "url": f"{base}/features-test?{urlencode({'text': text})}"} for text in short
+        ],
+        "classify_text_short": [
+            {"method": "POST", "url": f"{base}/classify-text", "json": {"text": text}} for text in short
+        ],
+        "classify_text_long": [
+            {"method": "POST", "url": f"{base}/classify-text", "json": {"text": text}}
+            for text in long_emails(requests, paragraphs=8, seed=23)[:requests // 2]
+            + [thread_email(4, seed=index) + f" Ref {index}" for index in range(requests - requests // 2)]
+        ],
+        "classify_text_duplicates": [
+            {"method": "POST", "url": f"{base}/classify-text", "json": {"text": duplicates[index % len(duplicates)]}}
+            for index in range(requests)
+        ],
+        "classify_file_pdf": [
+            {"method": "POST", "url": f"{base}/classify-file", "data": pdf_upload} for _ in range(pdf_count)
+        ],
+    }
+
+async def run_scenario(
+    session: aiohttp.ClientSession, requests: List[Dict[str, Any]], concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    position = 0
+
+    async def client() -> None:
+        nonlocal position
+        while position < len(requests):
+            index = position
+            position += 1
+            request = dict(requests[index])
+            if callable(request.get("data")):
+                request["data"] = request["data"](index)
+            start = time.perf_counter()
+            async with session.request(**request) as response:
+                await response.read()
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status)] = statuses.get(str(response.status), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(min(concurrency, len(requests)))))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(requests),
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(requests) / elapsed,
+        "latency_ms": {
+            "mean": statistics.mean(latencies) * 1000,
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": max(latencies) * 1000
+        },
+        "statuses": statuses,
+        "error_rate": sum(count for status, count in statuses.items() if status != "200") / len(requests)
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    fake = await FakeLLMServer(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate).start()
+    env = dict(
+        os.environ,
+        PORT=str(args.port),
+        WEB_CONCURRENCY="1",
+        OPENAI_API_BASE=fake.api_base,
+        OPENAI_API_KEY="sk-fake",
+        CACHE_ENABLED="true" if args.cache else "false",
+        LOG_DIR=""
+    )
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{args.port}"
+    report: Dict[str, Any] = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "requests": args.requests, "concurrency": args.concurrency, "latency": args.latency,
+            "jitter": args.jitter, "failure_rate": args.failure_rate, "cache": args.cache
+        },
+        "scenarios": {}
+    }
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120)) as session:
+            report["cold_start_ms"] = await _wait_ready(session, base, process, timeout=60) * 1000
+            report["memory_idle"] = process_memory(process.pid)
+            for name, requests in build_scenarios(base, args.requests).items():
+                if args.only and name not in args.only:
+                    continue
+                result = await run_scenario(session, requests, args.concurrency)
+                result["memory"] = process_memory(process.pid)
+                report["scenarios"][name] = result
+        report["upstream"] = {"requests": fake.request_count, "failures": fake.failure_count}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        await fake.stop()
+    return report
+
+def _delta(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return ""
+    return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = (baseline or {}).get("scenarios", {})
+    print(f"commit {report['commit']}, {report['cpu_count']} CPU(s), cold start {report['cold_start_ms']:.0f} ms, "
+          f"RSS ocioso {report['memory_idle']['rss_mb'] or 0:.0f} MB")
+    if baseline:
+        print(f"comparando com {baseline.get('commit')} ({baseline.get('created_at')})")
+    print(f"{'cenário':<26} {'req/s':>16} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'erros':>6} {'RSS MB':>7}")
+    for name, result in report["scenarios"].items():
+        before = previous.get(name, {})
+        latency = result["latency_ms"]
+        throughput = f"{result['throughput_rps']:.0f}{_delta(result['throughput_rps'], before.get('throughput_rps'))}"
+        print(f"{name:<26} {throughput:>16} {latency['p50']:>10.1f} {latency['p95']:>10.1f} {latency['p99']:>10.1f} "
+              f"{result['error_rate']:>6.1%} {result['memory']['rss_mb'] or 0:>7.0f}")
+        if before:
+            print(f"{'':<26} {'':>16} {_delta(latency['p50'], before['latency_ms']['p50']):>10} "
+                  f"{_delta(latency['p95'], before['latency_ms']['p95']):>10} {_delta(latency['p99'], before['latency_ms']['p99']):>10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks offline da API contra um LLM falso local")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-cache", dest="cache", action="store_false")
+    parser.add_argument("--only", nargs="+", help="executa apenas os cenários indicados")
+    parser.add_argument("--port", type=int, default=8016)
+    parser.add_argument("--output", help="grava o relatório JSON neste arquivo")
+    parser.add_argument("--compare", help="relatório JSON anterior para comparar")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"\nrelatório salvo em {args.output}")
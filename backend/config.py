@@ -11,10 +11,93 @@ class Settings(BaseModel):
     app_description: str = os.getenv("APP_DESCRIPTION", "Classificação automática de emails")
     app_version: str = os.getenv("APP_VERSION", "1.0.0")
     openai_model: str = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    openai_api_base: str = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+    openai_pool_size: int = int(os.getenv("OPENAI_POOL_SIZE", "100"))
+    openai_timeout_seconds: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "20"))
+    openai_max_retries: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    openai_retry_base_delay: float = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5"))
+    openai_retry_max_delay: float = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "4"))
+    openai_hedge_delay_seconds: float = float(os.getenv("OPENAI_HEDGE_DELAY_SECONDS", "0"))
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+    rate_limit_per_minute: float = float(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+    rate_limit_burst: int = int(os.getenv("RATE_LIMIT_BURST", "30"))
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    rate_limit_sqlite_path: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "rate_limits.db")
+    client_weights: str = os.getenv("CLIENT_WEIGHTS", "")
+    api_keys: str = os.getenv("API_KEYS", "")
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "0"))
+    llm_min_concurrency: int = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+    circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    circuit_recovery_seconds: float = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
     classification_temperature: float = float(os.getenv("CLASSIFICATION_TEMPERATURE", "0.3"))
     classification_max_tokens: int = int(os.getenv("CLASSIFICATION_MAX_TOKENS", "400"))
     response_generation_temperature: float = float(os.getenv("RESPONSE_GENERATION_TEMPERATURE", "0.7"))
     response_max_tokens: int = int(os.getenv("RESPONSE_MAX_TOKENS", "300"))
+    prompt_token_budget: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+    strip_quoted_history: bool = os.getenv("STRIP_QUOTED_HISTORY", "true").lower() == "true"
+    model_routing_enabled: bool = os.getenv("MODEL_ROUTING_ENABLED", "false").lower() == "true"
+    simple_model: str = os.getenv("SIMPLE_MODEL", "")
+    complex_model: str = os.getenv("COMPLEX_MODEL", "")
+    simple_max_words: int = int(os.getenv("SIMPLE_MAX_WORDS", "60"))
+    complex_min_words: int = int(os.getenv("COMPLEX_MIN_WORDS", "300"))
+    simple_classification_max_tokens: int = int(os.getenv("SIMPLE_CLASSIFICATION_MAX_TOKENS", "150"))
+    simple_response_max_tokens: int = int(os.getenv("SIMPLE_RESPONSE_MAX_TOKENS", "120"))
+    complex_classification_max_tokens: int = int(os.getenv("COMPLEX_CLASSIFICATION_MAX_TOKENS", "400"))
+    complex_response_max_tokens: int = int(os.getenv("COMPLEX_RESPONSE_MAX_TOKENS", "500"))
+    simple_cost_per_1k_tokens: float = float(os.getenv("SIMPLE_COST_PER_1K_TOKENS", "0.0005"))
+    standard_cost_per_1k_tokens: float = float(os.getenv("STANDARD_COST_PER_1K_TOKENS", "0.0015"))
+    complex_cost_per_1k_tokens: float = float(os.getenv("COMPLEX_COST_PER_1K_TOKENS", "0.01"))
+    response_templates_enabled: bool = os.getenv("RESPONSE_TEMPLATES_ENABLED", "false").lower() == "true"
+    response_templates_path: str = os.getenv("RESPONSE_TEMPLATES_PATH", "")
+    template_min_confidence: float = float(os.getenv("TEMPLATE_MIN_CONFIDENCE", "0.85"))
+    classification_mode: str = os.getenv("CLASSIFICATION_MODE", "two_call")
+    combined_temperature: float = float(os.getenv("COMBINED_TEMPERATURE", "0.5"))
+    max_upload_bytes: int = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+    max_archive_total_bytes: int = int(os.getenv("MAX_ARCHIVE_TOTAL_BYTES", str(100 * 1024 * 1024)))
+    pdf_max_pages: int = int(os.getenv("PDF_MAX_PAGES", "50"))
+    pdf_max_chars: int = int(os.getenv("PDF_MAX_CHARS", "20000"))
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", "2"))
+    batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    batch_item_timeout_seconds: float = float(os.getenv("BATCH_ITEM_TIMEOUT_SECONDS", "30"))
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    job_workers: int = int(os.getenv("JOB_WORKERS", "4"))
+    job_max_queue_depth: int = int(os.getenv("JOB_MAX_QUEUE_DEPTH", "100"))
+    job_timeout_seconds: float = float(os.getenv("JOB_TIMEOUT_SECONDS", "120"))
+    job_result_ttl_seconds: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+    job_store: str = os.getenv("JOB_STORE", "memory")
+    job_sqlite_path: str = os.getenv("JOB_SQLITE_PATH", "jobs.db")
+    webhook_timeout_seconds: float = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+    webhook_max_retries: int = int(os.getenv("WEBHOOK_MAX_RETRIES", "3"))
+    webhook_allowed_hosts: str = os.getenv("WEBHOOK_ALLOWED_HOSTS", "")
+    cache_enabled: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "86400"))
+    cache_sqlite_path: str = os.getenv("CACHE_SQLITE_PATH", "")
+    coalesce_requests: bool = os.getenv("COALESCE_REQUESTS", "true").lower() == "true"
+    near_duplicate_enabled: bool = os.getenv("NEAR_DUPLICATE_ENABLED", "false").lower() == "true"
+    near_duplicate_threshold: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+    near_duplicate_max_entries: int = int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "50000"))
+    near_duplicate_sqlite_path: str = os.getenv("NEAR_DUPLICATE_SQLITE_PATH", "")
+    decision_log_path: str = os.getenv("DECISION_LOG_PATH", "")
+    decision_log_excerpt_chars: int = int(os.getenv("DECISION_LOG_EXCERPT_CHARS", "2000"))
+    decision_log_max_bytes: int = int(os.getenv("DECISION_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+    history_enabled: bool = os.getenv("HISTORY_ENABLED", "false").lower() == "true"
+    history_sqlite_path: str = os.getenv("HISTORY_SQLITE_PATH", "history.db")
+    history_batch_size: int = int(os.getenv("HISTORY_BATCH_SIZE", "200"))
+    history_flush_interval_seconds: float = float(os.getenv("HISTORY_FLUSH_INTERVAL_SECONDS", "1.0"))
+    history_max_pending: int = int(os.getenv("HISTORY_MAX_PENDING", "10000"))
+    local_model_path: str = os.getenv("LOCAL_MODEL_PATH", "")
+    local_model_threshold: float = float(os.getenv("LOCAL_MODEL_THRESHOLD", "0.9"))
+    log_dir: str = os.getenv("LOG_DIR", "logs")
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    profiling_admin_token: str = os.getenv("PROFILING_ADMIN_TOKEN", "")
+    profiling_dir: str = os.getenv("PROFILING_DIR", "profiles")
+    profiling_max_seconds: float = float(os.getenv("PROFILING_MAX_SECONDS", "60"))
+    profiling_sample_interval_seconds: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL_SECONDS", "0.005"))
+    warm_up_on_startup: bool = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
+    web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "0"))
     debug: bool = os.getenv("DEBUG", "false").lower() == "true"
     environment: str = os.getenv("ENVIRONMENT", "development")
     
@@ -1,13 +1,42 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
-from routes import classification, health
+from routes import classification, health, history, jobs, metrics, profiling
+from services.container import ServiceContainer, build_services
+from utils.logger import setup_logger
+from utils.metrics import MetricsMiddleware, registry
+from utils.profiling import ProfilingMiddleware
+
+logger = setup_logger()
+
+async def start_services() -> ServiceContainer:
+    services = await build_services(warm_up=settings.warm_up_on_startup)
+    registry.add_collector(services.collect_metrics)
+    return services
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.services_task = asyncio.create_task(start_services())
+    try:
+        yield
+    finally:
+        task = app.state.services_task
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        if not task.cancelled() and task.exception() is None:
+            services = task.result()
+            registry.remove_collector(services.collect_metrics)
+            await services.close()
 
 app = FastAPI(
     title=settings.app_title,
     description=settings.app_description,
-    version=settings.app_version
+    version=settings.app_version,
+    lifespan=lifespan
 )
 
 origins = [
@@ -26,7 +55,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.include_router(classification.router, tags=["Classification"])
+app.include_router(jobs.router, tags=["Jobs"])
+app.include_router(history.router, tags=["History"])
 app.include_router(health.router, tags=["Health"])
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router, tags=["Metrics"])
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(profiling.router, tags=["Profiling"])
+
+def available_cpus() -> int:
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    # os.cpu_count() enxerga os núcleos do host; em contêiner vale a cota do cgroup.
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            limit, period = cpu_max.read().split()[:2]
+            if limit != "max":
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as quota_file, \
+                    open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as period_file:
+                limit = int(quota_file.read())
+                if limit > 0:
+                    quota = limit / int(period_file.read())
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        cpus = min(cpus, max(int(quota), 1))
+    return max(cpus, 1)
+
+def worker_count() -> int:
+    if settings.web_concurrency > 0:
+        return settings.web_concurrency
+    # Fila de jobs em memória é por processo: sem um armazenamento compartilhado, um worker só.
+    if settings.job_store != "sqlite":
+        return 1
+    return available_cpus()
 
 if __name__ == "__main__":
     import uvicorn
@@ -35,5 +102,9 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=port,
+        workers=worker_count(),
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,
         reload=False
-    )
\ No newline at end of file
+    )
@@ -6,6 +6,20 @@ class EmailCategory(str, Enum):
     PRODUCTIVE = "Produtivo"
     UNPRODUCTIVE = "Improdutivo"
 
+class ClassificationMode(str, Enum):
+    TWO_CALL = "two_call"
+    SINGLE_CALL = "single_call"
+
+class HistoryGranularity(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
 class SentimentIndicators(BaseModel):
     has_negative: bool
     has_positive: bool
@@ -23,21 +37,113 @@ class EmailFeatures(BaseModel):
     word_count: int
     char_count: int
 
-class EmailClassification(BaseModel):
+class CompactEmailClassification(BaseModel):
     category: str
     confidence: float
     suggested_response: str
     reasoning: str
     is_urgent: bool
+
+class EmailClassification(CompactEmailClassification):
     features_detected: EmailFeatures
 
 class TextInput(BaseModel):
     text: str
+    mode: Optional[ClassificationMode] = None
+
+class JobTextInput(TextInput):
+    webhook_url: Optional[str] = None
+
+class BatchTextInput(BaseModel):
+    items: List[TextInput]
+    mode: Optional[ClassificationMode] = None
+
+class BatchItemResult(BaseModel):
+    index: int
+    source: Optional[str] = None
+    classification: Optional[EmailClassification] = None
+    error: Optional[str] = None
+
+class BatchClassificationResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    unique_texts: int
+    results: List[BatchItemResult]
 
 class HealthResponse(BaseModel):
     status: str
     message: str
+    ready: bool = True
 
 class FeaturesTestResponse(BaseModel):
     text: str
-    features: EmailFeatures
\ No newline at end of file
+    features: EmailFeatures
+
+class ProfileStackEntry(BaseModel):
+    stack: str
+    count: int
+    fraction: float
+
+class SamplingProfileResponse(BaseModel):
+    seconds: float
+    interval: float
+    samples: int
+    saved_to: Optional[str] = None
+    stacks: List[ProfileStackEntry]
+    functions: List[ProfileStackEntry]
+
+class HistoryEntry(BaseModel):
+    id: int
+    created_at: float
+    text_hash: str
+    category: str
+    confidence: float
+    is_urgent: bool
+    latency_ms: float
+    model: str
+    path: str
+    features: Dict[str, bool]
+    word_count: int
+    formality_score: float
+    sentiment_score: float
+
+class HistoryResponse(BaseModel):
+    entries: List[HistoryEntry]
+    next_before_id: Optional[int] = None
+
+class HistoryCounter(BaseModel):
+    period_start: int
+    category: str
+    path: str
+    is_urgent: bool
+    count: int
+    average_latency_ms: float
+
+class HistoryCountersResponse(BaseModel):
+    granularity: HistoryGranularity
+    total: int
+    counters: List[HistoryCounter]
+
+class JobPayload(BaseModel):
+    text: Optional[str] = None
+    file_path: Optional[str] = None
+    mode: Optional[ClassificationMode] = None
+    webhook_url: Optional[str] = None
+    client_id: Optional[str] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    source: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    classification: Optional[EmailClassification] = None
+    error: Optional[str] = None
+
+class JobSubmittedResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    status_url: str
+    events_url: str
@@ -1,28 +1,122 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from models.schemas import EmailClassification, TextInput, FeaturesTestResponse
-from services.classification_service import ClassificationService
-from services.feature_extraction_service import FeatureExtractionService
+import json
+from typing import AsyncIterator, Optional, Union
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from models.schemas import (
+    EmailClassification, CompactEmailClassification, TextInput, FeaturesTestResponse, ClassificationMode,
+    BatchTextInput, BatchClassificationResponse
+)
+from config import settings
+from routes.dependencies import enforce_rate_limit, get_services
+from services.container import ServiceContainer
+from services.rate_limiter import SchedulerSaturatedError
 from utils.file_utils import FileProcessor
+from utils.metrics import observe_stage
+from utils.responses import ModelResponse
 
 router = APIRouter()
-classification_service = ClassificationService()
-feature_service = FeatureExtractionService()
 
-@router.post("/classify-text", response_model=EmailClassification)
-async def classify_text(text_input: TextInput):
+COMPACT_EXCLUDE = {"features_detected"}
+
+async def _classify(
+    services: ServiceContainer, email_text: str, mode: Optional[ClassificationMode]
+) -> EmailClassification:
+    try:
+        return await services.classification_service.classify_email(email_text, mode)
+    except SchedulerSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+@router.post(
+    "/classify-text",
+    response_model=Union[EmailClassification, CompactEmailClassification],
+    dependencies=[Depends(enforce_rate_limit)]
+)
+async def classify_text(
+    text_input: TextInput,
+    response: Response,
+    compact: bool = Query(False, description="omite features_detected da resposta"),
+    services: ServiceContainer = Depends(get_services)
+):
+    if not text_input.text.strip():
+        raise HTTPException(status_code=400, detail="Texto não pode estar vazio")
+    
+    classification = await _classify(services, text_input.text, text_input.mode)
+    return ModelResponse(classification, exclude=COMPACT_EXCLUDE if compact else None, headers=dict(response.headers))
+
+@router.post("/classify-text/stream", dependencies=[Depends(enforce_rate_limit)])
+async def classify_text_stream(text_input: TextInput, services: ServiceContainer = Depends(get_services)):
     if not text_input.text.strip():
         raise HTTPException(status_code=400, detail="Texto não pode estar vazio")
     
-    classification = classification_service.classify_email(text_input.text)
-    return classification
+    return StreamingResponse(
+        _format_sse(services.classification_service.classify_email_stream(text_input.text)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-@router.post("/classify-file", response_model=EmailClassification)
-async def classify_file(file: UploadFile = File(...)):
+async def _format_sse(events: AsyncIterator) -> AsyncIterator[str]:
+    async for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post(
+    "/classify-file",
+    response_model=Union[EmailClassification, CompactEmailClassification],
+    dependencies=[Depends(enforce_rate_limit)]
+)
+async def classify_file(
+    response: Response,
+    file: UploadFile = File(...),
+    mode: Optional[ClassificationMode] = None,
+    compact: bool = Query(False, description="omite features_detected da resposta"),
+    services: ServiceContainer = Depends(get_services)
+):
     email_text = await FileProcessor.process_upload_file(file)
-    classification = classification_service.classify_email(email_text)
-    return classification
+    classification = await _classify(services, email_text, mode)
+    return ModelResponse(classification, exclude=COMPACT_EXCLUDE if compact else None, headers=dict(response.headers))
+
+@router.post("/classify-batch", response_model=BatchClassificationResponse, dependencies=[Depends(enforce_rate_limit)])
+async def classify_batch(
+    batch_input: BatchTextInput,
+    response: Response,
+    services: ServiceContainer = Depends(get_services)
+):
+    if not batch_input.items:
+        raise HTTPException(status_code=400, detail="Lote não pode estar vazio")
+    if len(batch_input.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Lote excede o limite de {settings.batch_max_items} emails"
+        )
+    
+    batch = await services.batch_service.classify_batch(batch_input.items, batch_input.mode)
+    return ModelResponse(batch, headers=dict(response.headers))
+
+@router.post(
+    "/classify-batch-file", response_model=BatchClassificationResponse, dependencies=[Depends(enforce_rate_limit)]
+)
+async def classify_batch_file(
+    response: Response,
+    file: UploadFile = File(...),
+    mode: Optional[ClassificationMode] = None,
+    services: ServiceContainer = Depends(get_services)
+):
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Nenhum arquivo enviado")
+    
+    content = await FileProcessor.read_batch_upload(file)
+    with observe_stage("batch_extract"):
+        extracted = await run_in_threadpool(
+            FileProcessor.extract_batch_items, file.filename, content, settings.batch_max_items
+        )
+    items = [TextInput(text=text) for _, text, _ in extracted]
+    sources = [source for source, _, _ in extracted]
+    errors = {index: error for index, (_, _, error) in enumerate(extracted) if error is not None}
+    batch = await services.batch_service.classify_batch(items, mode, sources=sources, extraction_errors=errors)
+    return ModelResponse(batch, headers=dict(response.headers))
 
 @router.get("/features-test", response_model=FeaturesTestResponse)
-async def test_features(text: str = "Exemplo de texto para testar features"):
-    features = feature_service.extract_features(text)
-    return FeaturesTestResponse(text=text, features=features)
\ No newline at end of file
+async def test_features(text: str = "Exemplo de texto para testar features", services: ServiceContainer = Depends(get_services)):
+    with observe_stage("extract_features"):
+        features = services.feature_service.extract_features(text)
+    return ModelResponse(FeaturesTestResponse(text=text, features=features))
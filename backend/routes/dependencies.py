@@ -0,0 +1,44 @@
+import asyncio
+import math
+from fastapi import Depends, HTTPException, Request, Response
+from services.container import ServiceContainer
+from config import settings
+from services.rate_limiter import ANONYMOUS_CLIENT, current_client, known_api_keys
+
+def services_ready(request: Request) -> bool:
+    task = getattr(request.app.state, "services_task", None)
+    return task is not None and task.done() and not task.cancelled() and task.exception() is None
+
+async def get_services(request: Request) -> ServiceContainer:
+    try:
+        return await asyncio.shield(request.app.state.services_task)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Serviços indisponíveis: {str(e)}")
+
+def client_identity(request: Request) -> str:
+    # Só chaves conhecidas ganham balde próprio; uma chave inventada por requisição
+    # daria rajada nova a cada troca.
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in known_api_keys(settings.api_keys, settings.client_weights):
+        return api_key
+    return f"ip:{request.client.host}" if request.client else ANONYMOUS_CLIENT
+
+async def enforce_rate_limit(
+    request: Request,
+    response: Response,
+    services: ServiceContainer = Depends(get_services)
+) -> str:
+    client_id = client_identity(request)
+    current_client.set(client_id)
+    if services.rate_limiter is None:
+        return client_id
+
+    decision = await services.rate_limiter.check(client_id)
+    headers = {"X-RateLimit-Limit": str(decision.limit), "X-RateLimit-Remaining": str(decision.remaining)}
+    if not decision.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+        raise HTTPException(
+            status_code=429, detail="Limite de requisições excedido, tente novamente em instantes", headers=headers
+        )
+    response.headers.update(headers)
+    return client_id
@@ -1,11 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from models.schemas import HealthResponse
+from routes.dependencies import services_ready
 
 router = APIRouter()
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     return HealthResponse(
         status="ok", 
-        message="SparkMail está funcionando!"
-    )
\ No newline at end of file
+        message="SparkMail está funcionando!",
+        ready=services_ready(request)
+    )
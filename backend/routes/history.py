@@ -0,0 +1,48 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models.schemas import EmailCategory, HistoryCountersResponse, HistoryGranularity, HistoryResponse
+from routes.dependencies import get_services
+from services.container import ServiceContainer
+from services.history_store import HistoryStore
+
+router = APIRouter()
+
+def get_history(services: ServiceContainer = Depends(get_services)) -> HistoryStore:
+    history = services.classification_service.history
+    if history is None:
+        raise HTTPException(status_code=404, detail="Histórico de classificações desabilitado")
+    return history
+
+@router.get("/history", response_model=HistoryResponse)
+async def list_history(
+    start: Optional[float] = Query(None, description="timestamp Unix inicial (inclusivo)"),
+    end: Optional[float] = Query(None, description="timestamp Unix final (exclusivo)"),
+    category: Optional[EmailCategory] = None,
+    is_urgent: Optional[bool] = None,
+    path: Optional[str] = None,
+    before_id: Optional[int] = Query(None, description="continua a partir de next_before_id"),
+    limit: int = Query(100, ge=1, le=1000),
+    history: HistoryStore = Depends(get_history)
+):
+    entries = await history.query(
+        start, end, category.value if category else None, is_urgent, path, before_id, limit
+    )
+    next_before_id = entries[-1]["id"] if len(entries) == limit else None
+    return HistoryResponse(entries=entries, next_before_id=next_before_id)
+
+@router.get("/history/counters", response_model=HistoryCountersResponse)
+async def history_counters(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    category: Optional[EmailCategory] = None,
+    is_urgent: Optional[bool] = None,
+    path: Optional[str] = None,
+    granularity: HistoryGranularity = HistoryGranularity.HOUR,
+    history: HistoryStore = Depends(get_history)
+):
+    counters = await history.counters(
+        start, end, category.value if category else None, is_urgent, path, granularity.value
+    )
+    return HistoryCountersResponse(
+        granularity=granularity, total=sum(counter["count"] for counter in counters), counters=counters
+    )
@@ -0,0 +1,112 @@
+import json
+import os
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from models.schemas import (
+    ClassificationMode, JobPayload, JobResponse, JobStatus, JobSubmittedResponse, JobTextInput
+)
+from routes.dependencies import enforce_rate_limit, get_services
+from services.container import ServiceContainer
+from services.job_queue import FINISHED_STATUSES, JobQueue, JobQueueFullError
+from utils.file_utils import FileProcessor
+from utils.webhooks import WebhookURLError, validate_webhook_url
+
+router = APIRouter()
+
+def get_job_queue(services: ServiceContainer = Depends(get_services)) -> JobQueue:
+    return services.job_queue
+
+async def _validate_webhook_url(webhook_url: Optional[str]) -> None:
+    if not webhook_url:
+        return
+    try:
+        await validate_webhook_url(webhook_url)
+    except WebhookURLError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _submit(request: Request, job_queue: JobQueue, payload: JobPayload, source: Optional[str] = None):
+    try:
+        job = await job_queue.submit(payload, source)
+    except JobQueueFullError as e:
+        if payload.file_path and os.path.exists(payload.file_path):
+            os.unlink(payload.file_path)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    submitted = JobSubmittedResponse(
+        job_id=job.job_id,
+        status=job.status,
+        status_url=str(request.url_for("get_job", job_id=job.job_id)),
+        events_url=str(request.url_for("job_events", job_id=job.job_id))
+    )
+    return JSONResponse(status_code=202, content=submitted.model_dump(mode="json"))
+
+@router.post("/jobs/classify-text", response_model=JobSubmittedResponse, status_code=202)
+async def submit_text_job(
+    request: Request,
+    job_input: JobTextInput,
+    job_queue: JobQueue = Depends(get_job_queue),
+    client_id: str = Depends(enforce_rate_limit)
+):
+    if not job_input.text.strip():
+        raise HTTPException(status_code=400, detail="Texto não pode estar vazio")
+    await _validate_webhook_url(job_input.webhook_url)
+
+    payload = JobPayload(
+        text=job_input.text, mode=job_input.mode, webhook_url=job_input.webhook_url, client_id=client_id
+    )
+    return await _submit(request, job_queue, payload)
+
+@router.post("/jobs/classify-file", response_model=JobSubmittedResponse, status_code=202)
+async def submit_file_job(
+    request: Request,
+    file: UploadFile = File(...),
+    mode: Optional[ClassificationMode] = None,
+    webhook_url: Optional[str] = None,
+    job_queue: JobQueue = Depends(get_job_queue),
+    client_id: str = Depends(enforce_rate_limit)
+):
+    await _validate_webhook_url(webhook_url)
+    if file.filename and file.filename.lower().endswith(".pdf"):
+        payload = JobPayload(
+            file_path=await FileProcessor.save_upload_to_disk(file), mode=mode, webhook_url=webhook_url, client_id=client_id
+        )
+    else:
+        payload = JobPayload(
+            text=await FileProcessor.process_upload_file(file), mode=mode, webhook_url=webhook_url, client_id=client_id
+        )
+    return await _submit(request, job_queue, payload, file.filename)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, name="get_job")
+async def get_job(job_id: str, wait: float = 0, job_queue: JobQueue = Depends(get_job_queue)):
+    job = await job_queue.wait(job_id, min(max(wait, 0), 30))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+@router.get("/jobs/{job_id}/events", name="job_events")
+async def job_events(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+
+    return StreamingResponse(
+        _job_event_stream(job_queue, job_id, job.status),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _job_event_stream(job_queue: JobQueue, job_id: str, status: JobStatus) -> AsyncIterator[str]:
+    yield f"event: status\ndata: {json.dumps({'job_id': job_id, 'status': status.value})}\n\n"
+    while True:
+        job = await job_queue.wait(job_id, 15, until_finished=False)
+        if job is None:
+            return
+        if job.status in FINISHED_STATUSES:
+            yield f"event: done\ndata: {job.model_dump_json()}\n\n"
+            return
+        if job.status != status:
+            status = job.status
+            yield f"event: status\ndata: {json.dumps({'job_id': job_id, 'status': status.value})}\n\n"
+        else:
+            yield ": keep-alive\n\n"
@@ -0,0 +1,32 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from config import settings
+from models.schemas import SamplingProfileResponse
+from utils.profiling import SAMPLING_ENDPOINT, SamplingProfiler, token_matches
+
+router = APIRouter()
+sampler = SamplingProfiler(settings.profiling_sample_interval_seconds)
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Token de profiling inválido ou não configurado")
+
+@router.post(SAMPLING_ENDPOINT, response_model=SamplingProfileResponse, dependencies=[Depends(require_profiling_token)])
+async def sample_profile(seconds: float = Query(10.0, gt=0), top: int = Query(30, ge=1, le=500)):
+    if seconds > settings.profiling_max_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Duração máxima do perfil é de {settings.profiling_max_seconds:g} segundos"
+        )
+    
+    try:
+        profile = await asyncio.to_thread(sampler.run, seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    try:
+        saved_to = await asyncio.to_thread(profile.save_folded, settings.profiling_dir)
+    except OSError:
+        saved_to = None
+    return SamplingProfileResponse(saved_to=saved_to, **profile.summary(top))
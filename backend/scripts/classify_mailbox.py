@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from email import message_from_bytes, policy
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+from fastapi import HTTPException
+from config import settings
+from models.schemas import ClassificationMode
+from services.classification_service import ClassificationService
+from services.feature_extraction_service import FeatureExtractionService
+from utils.file_utils import FileProcessor, shutdown_pdf_executor
+
+class MailboxMessage(NamedTuple):
+    index: int
+    source: str
+    raw: Optional[bytes]
+    position: int
+
+class Checkpoint(NamedTuple):
+    archive: str
+    completed: int
+    position: int
+    output_bytes: int
+
+def detect_format(path: str) -> str:
+    if os.path.isdir(path):
+        if not any(os.path.isdir(os.path.join(path, folder)) for folder in ("cur", "new")):
+            raise SystemExit(f"{path} não parece um Maildir (faltam as pastas cur/ e new/)")
+        return "maildir"
+    return "mbox"
+
+def iter_messages(path: str, archive_format: str, checkpoint: Optional[Checkpoint]) -> Iterator[MailboxMessage]:
+    index = checkpoint.completed if checkpoint else 0
+    if archive_format == "maildir":
+        for name, raw in FileProcessor.iter_maildir(path, skip=index, max_bytes=settings.max_upload_bytes):
+            yield MailboxMessage(index, name, raw, index + 1)
+            index += 1
+    else:
+        start_offset = checkpoint.position if checkpoint else 0
+        for end_offset, raw in FileProcessor.iter_mbox_file(path, start_offset, settings.max_upload_bytes):
+            yield MailboxMessage(index, f"mensagem {index + 1}", raw, end_offset)
+            index += 1
+
+def load_checkpoint(path: str, archive: str) -> Optional[Checkpoint]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as checkpoint_file:
+        checkpoint = Checkpoint(**json.load(checkpoint_file))
+    if os.path.abspath(checkpoint.archive) != os.path.abspath(archive):
+        raise SystemExit(f"O checkpoint {path} pertence a outro arquivo: {checkpoint.archive}")
+    return checkpoint
+
+def save_checkpoint(path: str, checkpoint: Checkpoint) -> None:
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as checkpoint_file:
+        json.dump(checkpoint._asdict(), checkpoint_file)
+    os.replace(temporary, path)
+
+def parse_message(raw: bytes) -> Tuple[Dict[str, str], str]:
+    message = message_from_bytes(raw, policy=policy.default)
+    headers = {
+        "message_id": str(message.get("Message-ID", "") or "").strip(),
+        "from": str(message.get("From", "") or "").strip(),
+        "date": str(message.get("Date", "") or "").strip()
+    }
+    return headers, FileProcessor.extract_text_from_email_message(message)
+
+async def classify_message(
+    service: ClassificationService, message: MailboxMessage, mode: Optional[ClassificationMode]
+) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"index": message.index, "source": message.source}
+    if message.raw is None:
+        record["error"] = "Mensagem excede o tamanho máximo permitido"
+        return record
+
+    try:
+        headers, email_text = await asyncio.to_thread(parse_message, message.raw)
+    except HTTPException as e:
+        record["error"] = e.detail
+        return record
+    except Exception as e:
+        record["error"] = f"Erro ao processar mensagem: {str(e)}"
+        return record
+
+    record.update(headers)
+    if not email_text.strip():
+        record["error"] = "Mensagem sem texto para classificar"
+        return record
+
+    try:
+        classification = await asyncio.wait_for(
+            service.classify_email(email_text, mode), timeout=settings.batch_item_timeout_seconds
+        )
+        record["classification"] = classification.model_dump()
+    except asyncio.TimeoutError:
+        record["error"] = "Tempo limite excedido na classificação"
+    except Exception as e:
+        record["error"] = f"Erro na classificação: {str(e)}"
+    return record
+
+class ProgressReporter:
+    def __init__(self, already_completed: int):
+        self.start = time.perf_counter()
+        self.already_completed = already_completed
+        self.completed = 0
+        self.errors = 0
+        self.categories: Counter = Counter()
+
+    def record(self, record: Dict[str, Any]) -> None:
+        self.completed += 1
+        if "error" in record:
+            self.errors += 1
+        else:
+            self.categories[record["classification"]["category"]] += 1
+
+    def line(self, in_flight: int) -> str:
+        elapsed = time.perf_counter() - self.start
+        rate = self.completed / elapsed if elapsed else 0.0
+        return (
+            f"processadas {self.already_completed + self.completed} ({self.completed} nesta execução), "
+            f"{rate:.1f} msg/s, erros {self.errors}, em andamento {in_flight}"
+        )
+
+async def classify_archive(args: argparse.Namespace) -> ProgressReporter:
+    archive_format = args.format or detect_format(args.archive)
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    checkpoint = load_checkpoint(checkpoint_path, args.archive) if args.resume else None
+    if checkpoint is not None:
+        os.truncate(args.output, checkpoint.output_bytes)
+        print(f"retomando após {checkpoint.completed} mensagens", file=sys.stderr)
+    elif os.path.exists(args.output) and os.path.getsize(args.output):
+        raise SystemExit(f"{args.output} já existe; use --resume para continuar ou escolha outro arquivo")
+
+    service = ClassificationService(FeatureExtractionService())
+    mode = ClassificationMode(args.mode) if args.mode else None
+    progress = ProgressReporter(checkpoint.completed if checkpoint else 0)
+    window = asyncio.Semaphore(max(args.concurrency, 1))
+    finished: Dict[int, Tuple[bytes, int, Dict[str, Any]]] = {}
+    state = {
+        "next_index": checkpoint.completed if checkpoint else 0,
+        "position": checkpoint.position if checkpoint else 0,
+        "since_checkpoint": 0
+    }
+
+    output = open(args.output, "ab")
+
+    def write_ready() -> None:
+        while state["next_index"] in finished:
+            line, position, record = finished.pop(state["next_index"])
+            output.write(line)
+            progress.record(record)
+            state["next_index"] += 1
+            state["position"] = position
+            state["since_checkpoint"] += 1
+            window.release()
+        if state["since_checkpoint"] >= args.checkpoint_every:
+            flush_checkpoint()
+
+    def flush_checkpoint() -> None:
+        output.flush()
+        save_checkpoint(checkpoint_path, Checkpoint(
+            archive=args.archive,
+            completed=state["next_index"],
+            position=state["position"],
+            output_bytes=output.tell()
+        ))
+        state["since_checkpoint"] = 0
+
+    async def handle(message: MailboxMessage) -> None:
+        record = await classify_message(service, message, mode)
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        finished[message.index] = (line, message.position, record)
+        write_ready()
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(args.progress_seconds)
+            print(progress.line(len(tasks)), file=sys.stderr)
+
+    tasks: set = set()
+    submitted = 0
+    reporter = asyncio.create_task(report())
+    try:
+        for message in iter_messages(args.archive, archive_format, checkpoint):
+            if args.limit and submitted >= args.limit:
+                break
+            await window.acquire()
+            submitted += 1
+            task = asyncio.create_task(handle(message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    finally:
+        reporter.cancel()
+        flush_checkpoint()
+        output.close()
+        await service.openai_service.close()
+        if service.cache is not None:
+            service.cache.close()
+        if service.near_duplicates is not None:
+            service.near_duplicates.close()
+        if service.history is not None:
+            await service.history.close()
+        shutdown_pdf_executor()
+    return progress
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Classifica um arquivo mbox ou Maildir inteiro, gravando JSONL incremental")
+    parser.add_argument("archive", help="arquivo mbox ou diretório Maildir")
+    parser.add_argument("--output", required=True, help="arquivo JSONL de resultados")
+    parser.add_argument("--format", choices=("mbox", "maildir"), help="detectado automaticamente se omitido")
+    parser.add_argument("--mode", choices=[mode.value for mode in ClassificationMode])
+    parser.add_argument("--concurrency", type=int, default=settings.batch_concurrency)
+    parser.add_argument("--checkpoint", help="arquivo de checkpoint (padrão: <output>.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="mensagens entre checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continua do último checkpoint")
+    parser.add_argument("--progress-seconds", type=float, default=5.0)
+    parser.add_argument("--limit", type=int, default=0, help="processa no máximo N mensagens nesta execução")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        raise SystemExit(f"Arquivo não encontrado: {args.archive}")
+
+    progress = asyncio.run(classify_archive(args))
+    elapsed = time.perf_counter() - progress.start
+    print(f"concluído: {progress.completed} mensagens em {elapsed:.1f}s "
+          f"({progress.completed / elapsed if elapsed else 0.0:.1f} msg/s), erros {progress.errors}", file=sys.stderr)
+    for category, count in progress.categories.most_common():
+        print(f"  {category}: {count}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
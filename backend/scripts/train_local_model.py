@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import random
+from typing import List, Tuple
+from config import settings
+from models.schemas import EmailFeatures
+from services.feature_extraction_service import FeatureExtractionService
+from services.local_classifier_service import CLASSES, LocalClassifier
+
+def load_samples(path: str) -> List[Tuple[str, EmailFeatures, str]]:
+    texts, categories = [], []
+    # O arquivo rotacionado (.1) também entra; registros antigos trazem o texto bruto em "text".
+    for log_path in (path + ".1", path):
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, encoding="utf-8") as log_file:
+            for line in log_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                text = record.get("excerpt") or record.get("text", "")
+                if record.get("category") in CLASSES and text.strip():
+                    texts.append(text)
+                    categories.append(record["category"])
+    
+    features = FeatureExtractionService().extract_features_batch(texts)
+    return list(zip(texts, features, categories))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Treina o classificador local a partir das decisões registradas do LLM")
+    parser.add_argument("--log", default=settings.decision_log_path, help="arquivo JSONL de decisões (DECISION_LOG_PATH)")
+    parser.add_argument("--output", default=settings.local_model_path or "local_model.npz")
+    parser.add_argument("--threshold", type=float, default=settings.local_model_threshold)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    if not args.log:
+        raise SystemExit("Informe o arquivo de decisões com --log ou DECISION_LOG_PATH")
+    
+    samples = load_samples(args.log)
+    random.Random(args.seed).shuffle(samples)
+    split = int(len(samples) * (1 - args.holdout))
+    train, holdout = samples[:split], samples[split:]
+    
+    report = LocalClassifier.train(train).evaluate(holdout, args.threshold)
+    print(f"amostras: {len(samples)} (treino {len(train)}, validação {len(holdout)})")
+    print(f"concordância com o LLM (todas): {report['agreement']:.1%}")
+    print(f"fração roteada localmente (confiança >= {args.threshold}): {report['routed_fraction']:.1%}")
+    print(f"concordância com o LLM (roteadas): {report['routed_agreement']:.1%}")
+    
+    LocalClassifier.train(samples).save(args.output)
+    print(f"modelo salvo em {args.output}")
+
+if __name__ == "__main__":
+    main()
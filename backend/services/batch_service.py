@@ -0,0 +1,75 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from config import settings
+from models.schemas import (
+    BatchClassificationResponse, BatchItemResult, ClassificationMode, EmailClassification, TextInput
+)
+from services.cache_service import ClassificationCache
+from services.classification_service import ClassificationService
+
+class BatchClassificationService:
+    def __init__(self, classification_service: ClassificationService):
+        self.classification_service = classification_service
+
+    async def classify_batch(
+        self,
+        items: List[TextInput],
+        mode: Optional[ClassificationMode] = None,
+        sources: Optional[List[str]] = None,
+        extraction_errors: Optional[Dict[int, str]] = None
+    ) -> BatchClassificationResponse:
+        semaphore = asyncio.Semaphore(max(settings.batch_concurrency, 1))
+        unique: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        results: List[Optional[BatchItemResult]] = [None] * len(items)
+
+        for index, item in enumerate(items):
+            source = sources[index] if sources else None
+            if extraction_errors and index in extraction_errors:
+                results[index] = BatchItemResult(index=index, source=source, error=extraction_errors[index])
+                continue
+            if not item.text.strip():
+                results[index] = BatchItemResult(index=index, source=source, error="Texto não pode estar vazio")
+                continue
+            item_mode = item.mode or mode
+            key = (ClassificationCache.normalize_text(item.text), item_mode.value if item_mode else None)
+            unique.setdefault(key, []).append(index)
+
+        async def run(indexes: List[int]) -> None:
+            item = items[indexes[0]]
+            classification, error = await self._classify_one(semaphore, item.text, item.mode or mode)
+            for index in indexes:
+                results[index] = BatchItemResult(
+                    index=index,
+                    source=sources[index] if sources else None,
+                    classification=classification,
+                    error=error
+                )
+
+        await asyncio.gather(*(run(indexes) for indexes in unique.values()))
+
+        failed = sum(1 for result in results if result.error is not None)
+        return BatchClassificationResponse(
+            total=len(items),
+            succeeded=len(items) - failed,
+            failed=failed,
+            unique_texts=len(unique),
+            results=results
+        )
+
+    async def _classify_one(
+        self,
+        semaphore: asyncio.Semaphore,
+        email_text: str,
+        mode: Optional[ClassificationMode]
+    ) -> Tuple[Optional[EmailClassification], Optional[str]]:
+        async with semaphore:
+            try:
+                classification = await asyncio.wait_for(
+                    self.classification_service.classify_email(email_text, mode),
+                    timeout=settings.batch_item_timeout_seconds
+                )
+                return classification, None
+            except asyncio.TimeoutError:
+                return None, "Tempo limite excedido na classificação"
+            except Exception as e:
+                return None, f"Erro na classificação: {str(e)}"
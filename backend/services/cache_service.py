@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from models.schemas import EmailClassification
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+class ClassificationCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 86400, sqlite_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, EmailClassification]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS classification_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_classification_cache_expires_at "
+                "ON classification_cache (expires_at)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip().lower()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(ClassificationCache.normalize_text(text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def build_key(email_text: str, model: str, temperatures: Tuple[float, ...], prompt_version: str) -> str:
+        normalized = ClassificationCache.normalize_text(email_text)
+        temperature = ",".join(str(value) for value in temperatures)
+        raw = f"{prompt_version}\x1f{model}\x1f{temperature}\x1f{normalized}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[EmailClassification]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.expirations += 1
+
+        if self._db is not None:
+            # Falha no disco vira miss: a classificação segue pelo caminho normal.
+            try:
+                row = await self._run_db(self._db_get, key)
+                if row is not None and row[1] > now:
+                    value = EmailClassification.model_validate_json(row[0])
+                    self._store_in_memory(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            except (sqlite3.Error, ValueError) as e:
+                self.errors += 1
+                logger.warning(f"Erro ao ler cache em disco: {str(e)}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: EmailClassification) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._store_in_memory(key, value, expires_at)
+        if self._db is not None:
+            try:
+                await self._run_db(self._db_set, key, value.model_dump_json(), expires_at)
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning(f"Erro ao gravar cache em disco: {str(e)}")
+
+    def _store_in_memory(self, key: str, value: EmailClassification, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _run_db(self, func, *args):
+        async with self._db_lock:
+            return await asyncio.to_thread(func, *args)
+
+    def _db_get(self, key: str) -> Optional[Tuple[str, float]]:
+        return self._db.execute(
+            "SELECT value, expires_at FROM classification_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _db_set(self, key: str, value: str, expires_at: float) -> None:
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO classification_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._db.execute("DELETE FROM classification_cache WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+        except sqlite3.Error:
+            self._db.rollback()
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "errors": self.errors
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
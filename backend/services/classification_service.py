@@ -1,31 +1,181 @@
-from models.schemas import EmailClassification, EmailFeatures
+import asyncio
+import json
+import os
+import time
+from models.schemas import EmailClassification, EmailFeatures, ClassificationMode
 from services.feature_extraction_service import FeatureExtractionService
 from services.openai_service import OpenAIService
-from typing import List
+from services.cache_service import ClassificationCache
+from services.history_store import HistoryRecord, HistoryStore, encode_feature_flags
+from services.email_preprocessor import EmailPreprocessor, redact_text
+from services.local_classifier_service import LocalClassifier
+from services.model_router import ModelRouter, ModelTier
+from services.near_duplicate_service import NearDuplicateIndex
+from services.rate_limiter import SchedulerSaturatedError
+from services.response_templates import DEFAULT_TEMPLATES_PATH, ResponseTemplateLibrary
+from config import settings
+from utils.logger import setup_logger
+from utils.metrics import CLASSIFICATION_PATHS, FALLBACKS, TEMPLATE_RESPONSES, observe_stage
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+logger = setup_logger()
+
+class ClassificationOutcome(NamedTuple):
+    classification: EmailClassification
+    path: str
+    model: str
 
 class ClassificationService:
-    def __init__(self):
-        self.feature_service = FeatureExtractionService()
+    def __init__(self, feature_service: Optional[FeatureExtractionService] = None):
+        self.feature_service = feature_service or FeatureExtractionService()
         self.openai_service = OpenAIService()
+        self.preprocessor = EmailPreprocessor(settings.prompt_token_budget, settings.strip_quoted_history)
+        self.model_router = ModelRouter.from_settings()
+        self.cache: Optional[ClassificationCache] = None
+        if settings.cache_enabled:
+            self.cache = ClassificationCache(
+                max_entries=settings.cache_max_entries,
+                ttl_seconds=settings.cache_ttl_seconds,
+                sqlite_path=settings.cache_sqlite_path
+            )
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
+        if settings.near_duplicate_enabled:
+            self.near_duplicates = NearDuplicateIndex(
+                threshold=settings.near_duplicate_threshold,
+                max_entries=settings.near_duplicate_max_entries,
+                sqlite_path=settings.near_duplicate_sqlite_path
+            )
+        self.local_classifier: Optional[LocalClassifier] = None
+        if settings.local_model_path and os.path.exists(settings.local_model_path):
+            self.local_classifier = LocalClassifier.load(settings.local_model_path)
+        self.templates: Optional[ResponseTemplateLibrary] = None
+        if settings.response_templates_enabled:
+            self.templates = ResponseTemplateLibrary.load(settings.response_templates_path or DEFAULT_TEMPLATES_PATH)
+        self.history: Optional[HistoryStore] = None
+        if settings.history_enabled:
+            self.history = HistoryStore(
+                settings.history_sqlite_path,
+                batch_size=settings.history_batch_size,
+                flush_interval=settings.history_flush_interval_seconds,
+                max_pending=settings.history_max_pending
+            )
+        self.local_routed = 0
+        self.llm_routed = 0
+        self.local_compared = 0
+        self.local_agreed = 0
+        self._in_flight: Dict[str, "asyncio.Future[ClassificationOutcome]"] = {}
+        self.coalesce_leaders = 0
+        self.coalesced = 0
+        self.template_responses = 0
+        self.generated_responses = 0
+        self.generation_seconds = 0.0
     
-    def classify_email(self, email_text: str) -> EmailClassification:
-        features = self.feature_service.extract_features(email_text)
+    def _cache_key(self, email_text: str, mode: ClassificationMode, tier: ModelTier) -> str:
+        if mode == ClassificationMode.SINGLE_CALL:
+            temperatures = (settings.combined_temperature,)
+        else:
+            temperatures = (settings.classification_temperature, settings.response_generation_temperature)
+        return ClassificationCache.build_key(
+            email_text,
+            f"{tier.model}:{tier.name}" if self.model_router.enabled else tier.model,
+            temperatures,
+            f"{OpenAIService.PROMPT_VERSION}:{mode.value}{':templates' if self.templates is not None else ''}"
+        )
+    
+    async def classify_email(self, email_text: str, mode: Optional[ClassificationMode] = None) -> EmailClassification:
+        start = time.perf_counter()
+        outcome = await self._classify(email_text, ClassificationMode(mode or settings.classification_mode))
+        self._record_history(email_text, outcome, start)
+        return outcome.classification
+    
+    async def _classify(self, email_text: str, mode: ClassificationMode) -> ClassificationOutcome:
+        with observe_stage("extract_features"):
+            features = self.feature_service.extract_features(email_text)
+        
+        tier = self.model_router.route(features)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(email_text, mode, tier)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                CLASSIFICATION_PATHS.inc("cache")
+                return ClassificationOutcome(cached.model_copy(update={"features_detected": features}), "cache", tier.model)
         
+        near_duplicate = self._classify_near_duplicate(email_text, features)
+        if near_duplicate is not None:
+            return ClassificationOutcome(near_duplicate, "near_duplicate", "")
+        
+        local_classification = self._classify_local(email_text, features)
+        if local_classification is not None:
+            return ClassificationOutcome(local_classification, "local", "")
+        
+        if not settings.coalesce_requests:
+            return await self._classify_llm(email_text, mode, features, tier, cache_key)
+        
+        flight_key = cache_key or self._cache_key(email_text, mode, tier)
+        flight = self._in_flight.get(flight_key)
+        if flight is None:
+            self.coalesce_leaders += 1
+            flight = asyncio.ensure_future(self._classify_llm(email_text, mode, features, tier, cache_key))
+            self._in_flight[flight_key] = flight
+            flight.add_done_callback(lambda done: self._end_flight(flight_key, done))
+            return await asyncio.shield(flight)
+        
+        self.coalesced += 1
+        CLASSIFICATION_PATHS.inc("coalesced")
+        outcome = await asyncio.shield(flight)
+        return ClassificationOutcome(
+            outcome.classification.model_copy(update={"features_detected": features}), "coalesced", outcome.model
+        )
+    
+    def _end_flight(self, flight_key: str, flight: "asyncio.Future[ClassificationOutcome]") -> None:
+        if self._in_flight.get(flight_key) is flight:
+            del self._in_flight[flight_key]
+        if not flight.cancelled() and flight.exception() is not None:
+            logger.error(f"Erro na classificação compartilhada: {str(flight.exception())}")
+    
+    async def _classify_llm(
+        self,
+        email_text: str,
+        mode: ClassificationMode,
+        features: EmailFeatures,
+        tier: ModelTier,
+        cache_key: Optional[str]
+    ) -> ClassificationOutcome:
+        self.llm_routed += 1
+        with observe_stage("preprocess"):
+            prompt_text = self.preprocessor.prepare(email_text)
         try:
-            result = self.openai_service.classify_email(email_text, features)
-            category = result.get("category", "Improdutivo")
-            confidence = float(result.get("confidence", 0.8))
-            reasoning = result.get("reasoning", "Classificação baseada no conteúdo do email")
-            is_urgent = result.get("is_urgent", False)
-            suggested_response = self.openai_service.generate_response(
-                email_text, category, is_urgent, features
-            )
+            if mode == ClassificationMode.SINGLE_CALL:
+                result = await self.openai_service.classify_and_respond(prompt_text, features, tier)
+            else:
+                result = await self.openai_service.classify_email(prompt_text, features, tier)
+            category, confidence, reasoning, is_urgent = self._parse_classification_result(result)
+            self._compare_local(email_text, features, category)
+            if mode == ClassificationMode.SINGLE_CALL:
+                suggested_response = str(result.get("suggested_response", "")).strip()
+                if not suggested_response:
+                    suggested_response = self._generate_fallback_response(category, is_urgent, features)
+            else:
+                suggested_response = self._template_response(email_text, category, confidence, is_urgent, features)
+                if suggested_response is None:
+                    generation_start = time.perf_counter()
+                    suggested_response = await self.openai_service.generate_response(
+                        prompt_text, category, is_urgent, features, tier
+                    )
+                    self._record_generation(time.perf_counter() - generation_start)
             
+        except SchedulerSaturatedError:
+            # Sobrecarga local vira 503 para o cliente tentar de novo, não uma classificação heurística.
+            raise
         except Exception as e:
-            print(f"Erro na classificação AI: {str(e)}")
-            return self._classify_fallback(email_text, features)
+            logger.warning(f"Erro na classificação AI: {str(e)}")
+            FALLBACKS.inc("llm_error")
+            return ClassificationOutcome(self._classify_fallback(email_text, features), "fallback", "")
         
-        return EmailClassification(
+        CLASSIFICATION_PATHS.inc("llm")
+        await self._log_decision(email_text, category, confidence, is_urgent, tier.model)
+        classification = EmailClassification(
             category=category,
             confidence=confidence,
             suggested_response=suggested_response,
@@ -33,8 +183,270 @@ class ClassificationService:
             is_urgent=is_urgent,
             features_detected=features
         )
+        
+        if cache_key is not None:
+            await self.cache.set(cache_key, classification)
+        if self.near_duplicates is not None:
+            await self.near_duplicates.add(email_text, classification)
+        
+        return ClassificationOutcome(classification, "llm", tier.model)
+    
+    async def classify_email_stream(self, email_text: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        start = time.perf_counter()
+        with observe_stage("extract_features"):
+            features = self.feature_service.extract_features(email_text)
+        
+        tier = self.model_router.route(features)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(email_text, ClassificationMode.TWO_CALL, tier)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                CLASSIFICATION_PATHS.inc("cache")
+                classification = cached.model_copy(update={"features_detected": features})
+                self._record_history(email_text, ClassificationOutcome(classification, "cache", tier.model), start)
+                yield "classification", classification.model_dump(exclude={"suggested_response"})
+                yield "token", {"delta": classification.suggested_response}
+                yield "done", classification.model_dump()
+                return
+        
+        outcome = None
+        classification = self._classify_near_duplicate(email_text, features)
+        if classification is not None:
+            outcome = ClassificationOutcome(classification, "near_duplicate", "")
+        else:
+            classification = self._classify_local(email_text, features)
+            if classification is not None:
+                outcome = ClassificationOutcome(classification, "local", "")
+        if outcome is not None:
+            self._record_history(email_text, outcome, start)
+            yield "classification", classification.model_dump(exclude={"suggested_response"})
+            yield "token", {"delta": classification.suggested_response}
+            yield "done", classification.model_dump()
+            return
+        
+        self.llm_routed += 1
+        with observe_stage("preprocess"):
+            prompt_text = self.preprocessor.prepare(email_text)
+        try:
+            result = await self.openai_service.classify_email(prompt_text, features, tier)
+            category, confidence, reasoning, is_urgent = self._parse_classification_result(result)
+            self._compare_local(email_text, features, category)
+            await self._log_decision(email_text, category, confidence, is_urgent, tier.model)
+        except Exception as e:
+            logger.warning(f"Erro na classificação AI: {str(e)}")
+            FALLBACKS.inc("llm_error")
+            classification = self._classify_fallback(email_text, features)
+            self._record_history(email_text, ClassificationOutcome(classification, "fallback", ""), start)
+            yield "classification", classification.model_dump(exclude={"suggested_response"})
+            yield "token", {"delta": classification.suggested_response}
+            yield "done", classification.model_dump()
+            return
+        
+        yield "classification", {
+            "category": category,
+            "confidence": confidence,
+            "reasoning": reasoning,
+            "is_urgent": is_urgent,
+            "features_detected": features.model_dump()
+        }
+        
+        chunks: List[str] = []
+        stream_failed = False
+        template_response = self._template_response(email_text, category, confidence, is_urgent, features)
+        if template_response is not None:
+            chunks.append(template_response)
+            yield "token", {"delta": template_response}
+        else:
+            generation_start = time.perf_counter()
+            try:
+                async for delta in self.openai_service.stream_response(prompt_text, category, is_urgent, features, tier):
+                    chunks.append(delta)
+                    yield "token", {"delta": delta}
+                self._record_generation(time.perf_counter() - generation_start)
+            except Exception as e:
+                logger.warning(f"Erro na geração de resposta: {str(e)}")
+                FALLBACKS.inc("stream_error")
+                stream_failed = True
+                if not chunks:
+                    fallback_response = self._generate_fallback_response(category, is_urgent, features)
+                    chunks.append(fallback_response)
+                    yield "token", {"delta": fallback_response}
+        
+        classification = EmailClassification(
+            category=category,
+            confidence=confidence,
+            suggested_response="".join(chunks).strip(),
+            reasoning=reasoning,
+            is_urgent=is_urgent,
+            features_detected=features
+        )
+        
+        CLASSIFICATION_PATHS.inc("llm")
+        if cache_key is not None and not stream_failed:
+            await self.cache.set(cache_key, classification)
+        if self.near_duplicates is not None and not stream_failed:
+            await self.near_duplicates.add(email_text, classification)
+        
+        self._record_history(email_text, ClassificationOutcome(classification, "llm", tier.model), start)
+        yield "done", classification.model_dump()
+    
+    def _classify_near_duplicate(self, email_text: str, features: EmailFeatures) -> Optional[EmailClassification]:
+        if self.near_duplicates is None:
+            return None
+        
+        with observe_stage("near_duplicate_lookup"):
+            match = self.near_duplicates.lookup(email_text)
+        if match is None:
+            return None
+        
+        CLASSIFICATION_PATHS.inc("near_duplicate")
+        previous = match.classification
+        return EmailClassification(
+            category=previous.category,
+            confidence=min(previous.confidence, match.similarity),
+            suggested_response=previous.suggested_response,
+            reasoning=f"{previous.reasoning} (reaproveitado de email semelhante, similaridade {match.similarity:.2f})",
+            is_urgent=previous.is_urgent,
+            features_detected=features
+        )
+    
+    def _classify_local(self, email_text: str, features: EmailFeatures) -> Optional[EmailClassification]:
+        if self.local_classifier is None:
+            return None
+        
+        category, confidence = self.local_classifier.predict(email_text, features)
+        if confidence < settings.local_model_threshold:
+            return None
+        
+        self.local_routed += 1
+        CLASSIFICATION_PATHS.inc("local")
+        is_urgent = features.has_urgency_indicators
+        return EmailClassification(
+            category=category,
+            confidence=confidence,
+            suggested_response=self._generate_fallback_response(category, is_urgent, features),
+            reasoning=f"Email classificado como {category} pelo modelo local (confiança {confidence:.2f})",
+            is_urgent=is_urgent,
+            features_detected=features
+        )
+    
+    def _compare_local(self, email_text: str, features: EmailFeatures, category: str) -> None:
+        # Só chegam aqui emails abaixo do limiar: a concordância medida é a da faixa de baixa confiança.
+        if self.local_classifier is None:
+            return
+        predicted, _ = self.local_classifier.predict(email_text, features)
+        self.local_compared += 1
+        self.local_agreed += predicted == category
+    
+    def _template_response(
+        self, email_text: str, category: str, confidence: float, is_urgent: bool, features: EmailFeatures
+    ) -> Optional[str]:
+        if self.templates is None or is_urgent or confidence < settings.template_min_confidence:
+            return None
+        
+        with observe_stage("template_match"):
+            match = self.templates.match(email_text, category, features)
+        if match is None:
+            return None
+        
+        self.template_responses += 1
+        TEMPLATE_RESPONSES.inc(match.template)
+        return match.response
+    
+    def _record_generation(self, seconds: float) -> None:
+        self.generated_responses += 1
+        self.generation_seconds += seconds
+    
+    def _record_history(self, email_text: str, outcome: ClassificationOutcome, start: float) -> None:
+        if self.history is None:
+            return
+        
+        classification = outcome.classification
+        features = classification.features_detected
+        self.history.record(HistoryRecord(
+            created_at=time.time(),
+            text_hash=ClassificationCache.hash_text(email_text),
+            category=classification.category,
+            confidence=classification.confidence,
+            is_urgent=classification.is_urgent,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            model=outcome.model,
+            path=outcome.path,
+            feature_flags=encode_feature_flags(features),
+            word_count=features.word_count,
+            formality_score=features.formality_score,
+            sentiment_score=features.sentiment_indicators.sentiment_score
+        ))
+    
+    def template_stats(self) -> Dict[str, Any]:
+        total = self.template_responses + self.generated_responses
+        average = self.generation_seconds / self.generated_responses if self.generated_responses else 0.0
+        library_stats = self.templates.stats() if self.templates is not None else {"templates": 0, "used": {}}
+        return {
+            "enabled": self.templates is not None,
+            "min_confidence": settings.template_min_confidence,
+            "templates": library_stats["templates"],
+            "template_responses": self.template_responses,
+            "generated_responses": self.generated_responses,
+            "skip_rate": self.template_responses / total if total else 0.0,
+            "average_generation_seconds": average,
+            "estimated_seconds_saved": self.template_responses * average,
+            "used": library_stats["used"]
+        }
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        total = self.coalesce_leaders + self.coalesced
+        return {
+            "enabled": settings.coalesce_requests,
+            "in_flight": len(self._in_flight),
+            "leaders": self.coalesce_leaders,
+            "coalesced": self.coalesced,
+            "coalesce_rate": self.coalesced / total if total else 0.0
+        }
+    
+    async def _log_decision(
+        self, email_text: str, category: str, confidence: float, is_urgent: bool, model: str
+    ) -> None:
+        if not settings.decision_log_path:
+            return
+        
+        excerpt_chars = settings.decision_log_excerpt_chars
+        record = json.dumps({
+            "timestamp": time.time(),
+            "text_hash": ClassificationCache.hash_text(email_text),
+            "excerpt": redact_text(email_text[:excerpt_chars])[:excerpt_chars],
+            "category": category,
+            "confidence": confidence,
+            "is_urgent": is_urgent,
+            "model": model
+        }, ensure_ascii=False)
+        try:
+            await asyncio.to_thread(self._append_decision, record)
+        except OSError as e:
+            logger.error(f"Erro ao registrar decisão: {str(e)}")
+    
+    def _append_decision(self, record: str) -> None:
+        path = settings.decision_log_path
+        # Guarda no máximo o arquivo atual e um anterior (.1).
+        if os.path.exists(path) and os.path.getsize(path) >= settings.decision_log_max_bytes:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as log_file:
+            log_file.write(record + "\n")
+    
+    def _parse_classification_result(self, result: Dict[str, Any]) -> Tuple[str, float, str, bool]:
+        category = result.get("category", "Improdutivo")
+        confidence = float(result.get("confidence", 0.8))
+        reasoning = result.get("reasoning", "Classificação baseada no conteúdo do email")
+        is_urgent = result.get("is_urgent", False)
+        return category, confidence, reasoning, is_urgent
     
     def _classify_fallback(self, email_text: str, features: EmailFeatures) -> EmailClassification:
+        CLASSIFICATION_PATHS.inc("fallback")
+        with observe_stage("fallback"):
+            return self._score_fallback(features)
+    
+    def _score_fallback(self, features: EmailFeatures) -> EmailClassification:
         score = 0
         reasons = []
     
@@ -0,0 +1,202 @@
+import asyncio
+import os
+import time
+from typing import List, Optional
+from config import settings
+from services.job_queue import JobQueue, create_job_store
+from services.rate_limiter import ClientRateLimiter, create_rate_limit_backend, parse_client_weights
+from utils.file_utils import shutdown_pdf_executor, warm_up_pdf_executor
+from utils.logger import setup_logger
+from utils.metrics import Sample
+
+logger = setup_logger()
+
+WARM_UP_TEXT = "Bom dia, preciso de ajuda urgente com o sistema. Poderiam verificar o erro? Obrigado!"
+
+class ServiceContainer:
+    def __init__(self):
+        # numpy e os serviços que dependem dele só são importados aqui, já no lifespan.
+        from services.batch_service import BatchClassificationService
+        from services.classification_service import ClassificationService
+        from services.feature_extraction_service import FeatureExtractionService
+        self.feature_service = FeatureExtractionService()
+        self.classification_service = ClassificationService(self.feature_service)
+        self.batch_service = BatchClassificationService(self.classification_service)
+        self.job_queue = JobQueue(
+            self.classification_service,
+            create_job_store(),
+            workers=settings.job_workers,
+            max_queue_depth=settings.job_max_queue_depth
+        )
+        self.rate_limiter: Optional[ClientRateLimiter] = None
+        if settings.rate_limit_enabled:
+            self.rate_limiter = ClientRateLimiter(
+                create_rate_limit_backend(),
+                settings.rate_limit_per_minute,
+                settings.rate_limit_burst,
+                weights=parse_client_weights(settings.client_weights)
+            )
+        self.warm_up_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self.job_queue.start()
+
+    async def warm_up(self) -> None:
+        self.classification_service.openai_service.warm_up()
+        await asyncio.to_thread(self._warm_up_sync)
+        await warm_up_pdf_executor()
+
+    def _warm_up_sync(self) -> None:
+        features = self.feature_service.extract_features(WARM_UP_TEXT)
+        self.classification_service.preprocessor.prepare(WARM_UP_TEXT)
+        if self.classification_service.local_classifier is not None:
+            self.classification_service.local_classifier.predict(WARM_UP_TEXT, features)
+
+    async def close(self) -> None:
+        if self.warm_up_task is not None:
+            self.warm_up_task.cancel()
+            await asyncio.gather(self.warm_up_task, return_exceptions=True)
+        await self.job_queue.stop()
+        await self.classification_service.openai_service.close()
+        if self.classification_service.cache is not None:
+            self.classification_service.cache.close()
+        if self.classification_service.near_duplicates is not None:
+            self.classification_service.near_duplicates.close()
+        if self.classification_service.history is not None:
+            await self.classification_service.history.close()
+        if self.rate_limiter is not None:
+            self.rate_limiter.close()
+        shutdown_pdf_executor()
+
+    def collect_metrics(self) -> List[Sample]:
+        service = self.classification_service
+        upstream = service.openai_service.resilience_stats()
+        circuit = upstream["circuit_breaker"]
+        coalescing = service.coalescing_stats()
+        templates = service.template_stats()
+        samples: List[Sample] = [
+            ("sparkmail_upstream_retries_total", "counter", "Novas tentativas na API da OpenAI", upstream["retries"]),
+            ("sparkmail_upstream_timeouts_total", "counter", "Chamadas à OpenAI que estouraram o prazo", upstream["timeouts"]),
+            ("sparkmail_upstream_failures_total", "counter", "Falhas recuperáveis na API da OpenAI", upstream["failures"]),
+            ("sparkmail_upstream_hedges_total", "counter", "Requisições duplicadas por hedging", upstream["hedges"]),
+            ("sparkmail_circuit_open", "gauge", "1 quando o circuito da OpenAI está aberto", float(circuit["state"] != "closed")),
+            ("sparkmail_circuit_opened_total", "counter", "Vezes que o circuito da OpenAI abriu", circuit["times_opened"]),
+            (
+                "sparkmail_circuit_short_circuited_total", "counter", "Chamadas recusadas com o circuito aberto",
+                circuit["short_circuited"]
+            ),
+            ("sparkmail_coalesce_leaders_total", "counter", "Chamadas ao LLM que lideraram uma coalescência", coalescing["leaders"]),
+            ("sparkmail_coalesced_total", "counter", "Requisições atendidas pela chamada de outra idêntica", coalescing["coalesced"]),
+            ("sparkmail_coalesce_in_flight", "gauge", "Chamadas compartilhadas em andamento", coalescing["in_flight"]),
+            ("sparkmail_routing_decisions_total", "counter", "Emails enviados ao modelo local ou ao LLM", service.local_routed, {"route": "local"}),
+            ("sparkmail_routing_decisions_total", "counter", "Emails enviados ao modelo local ou ao LLM", service.llm_routed, {"route": "llm"}),
+            *(
+                ("sparkmail_model_tier_routed_total", "counter", "Emails roteados por faixa de modelo", count, {"tier": tier})
+                for tier, count in service.model_router.routed.items()
+            ),
+            (
+                "sparkmail_generated_responses_total", "counter", "Respostas geradas pelo LLM (sem template)",
+                templates["generated_responses"]
+            ),
+            (
+                "sparkmail_response_generation_seconds_total", "counter", "Tempo gasto gerando respostas no LLM",
+                service.generation_seconds
+            ),
+        ]
+        if service.local_classifier is not None:
+            samples += [
+                ("sparkmail_local_model_threshold", "gauge", "Confiança mínima para responder pelo modelo local", settings.local_model_threshold),
+                (
+                    "sparkmail_local_model_compared_total", "counter",
+                    "Decisões do LLM comparadas com a previsão do modelo local", service.local_compared
+                ),
+                (
+                    "sparkmail_local_model_agreed_total", "counter",
+                    "Decisões do LLM em que o modelo local previu a mesma categoria", service.local_agreed
+                ),
+                (
+                    "sparkmail_local_model_agreement_ratio", "gauge", "Fração de concordância do modelo local com o LLM",
+                    service.local_agreed / service.local_compared if service.local_compared else 0.0
+                ),
+            ]
+        if service.cache is not None:
+            stats = service.cache.stats()
+            lookups = stats["hits"] + stats["misses"]
+            samples += [
+                ("sparkmail_cache_hits_total", "counter", "Acertos no cache de classificações", stats["hits"]),
+                ("sparkmail_cache_misses_total", "counter", "Faltas no cache de classificações", stats["misses"]),
+                ("sparkmail_cache_disk_hits_total", "counter", "Acertos atendidos pelo cache em disco", stats["disk_hits"]),
+                ("sparkmail_cache_evictions_total", "counter", "Entradas removidas pelo limite do cache", stats["evictions"]),
+                ("sparkmail_cache_expirations_total", "counter", "Entradas do cache vencidas pelo TTL", stats["expirations"]),
+                ("sparkmail_cache_entries", "gauge", "Entradas no cache em memória", stats["entries"]),
+                ("sparkmail_cache_errors_total", "counter", "Falhas de leitura ou escrita no cache em disco", stats["errors"]),
+                (
+                    "sparkmail_cache_hit_ratio", "gauge", "Fração de consultas atendidas pelo cache",
+                    stats["hits"] / lookups if lookups else 0.0
+                ),
+            ]
+        if service.near_duplicates is not None:
+            stats = service.near_duplicates.stats()
+            samples += [
+                ("sparkmail_near_duplicate_entries", "gauge", "Emails no índice de quase-duplicatas", stats["entries"]),
+                ("sparkmail_near_duplicate_lookups_total", "counter", "Consultas ao índice de quase-duplicatas", stats["lookups"]),
+                ("sparkmail_near_duplicate_reused_total", "counter", "Classificações reaproveitadas de email semelhante", stats["reused"]),
+                (
+                    "sparkmail_near_duplicate_refused_total", "counter",
+                    "Reaproveitamentos recusados por expor dados do email anterior", stats["refused"]
+                ),
+            ]
+        if self.rate_limiter is not None:
+            samples += [
+                ("sparkmail_rate_limit_allowed_total", "counter", "Requisições aceitas pelo limite por cliente", self.rate_limiter.allowed),
+                ("sparkmail_rate_limit_rejected_total", "counter", "Requisições recusadas pelo limite por cliente", self.rate_limiter.rejected),
+            ]
+        scheduler = service.openai_service.scheduler
+        if scheduler is not None:
+            stats = scheduler.stats()
+            samples += [
+                ("sparkmail_llm_concurrency_limit", "gauge", "Teto atual de chamadas simultâneas ao LLM", stats["limit"]),
+                ("sparkmail_llm_in_flight", "gauge", "Chamadas ao LLM em andamento", stats["in_flight"]),
+                ("sparkmail_llm_waiting", "gauge", "Chamadas aguardando vaga na fila justa", stats["waiting"]),
+                ("sparkmail_llm_granted_total", "counter", "Vagas concedidas pela fila justa", stats["granted"]),
+                ("sparkmail_llm_queued_total", "counter", "Chamadas que esperaram na fila justa", stats["queued"]),
+                ("sparkmail_llm_upstream_limited_total", "counter", "Respostas 429 recebidas da OpenAI", stats["upstream_limited"]),
+                ("sparkmail_llm_saturated_total", "counter", "Chamadas recusadas por falta de vaga no prazo", stats["saturated"]),
+            ]
+        jobs = self.job_queue.stats()
+        samples += [
+            ("sparkmail_job_queue_depth", "gauge", "Jobs aguardando na fila", jobs["queue_depth"]),
+            ("sparkmail_jobs_running", "gauge", "Jobs em execução", jobs["running"]),
+            ("sparkmail_jobs_submitted_total", "counter", "Jobs aceitos na fila", jobs["submitted"]),
+            ("sparkmail_jobs_rejected_total", "counter", "Jobs recusados com a fila cheia", jobs["rejected"]),
+            ("sparkmail_jobs_finished_total", "counter", "Jobs concluídos por status", jobs["succeeded"], {"status": "succeeded"}),
+            ("sparkmail_jobs_finished_total", "counter", "Jobs concluídos por status", jobs["failed"], {"status": "failed"}),
+            ("sparkmail_webhooks_failed_total", "counter", "Webhooks não entregues", jobs["webhooks_failed"]),
+        ]
+        if service.history is not None:
+            stats = service.history.stats()
+            samples += [
+                ("sparkmail_history_written_total", "counter", "Registros gravados no histórico", stats["written"]),
+                ("sparkmail_history_pending", "gauge", "Registros aguardando gravação no histórico", stats["pending"]),
+                ("sparkmail_history_dropped_total", "counter", "Registros descartados pelo histórico", stats["dropped"]),
+                ("sparkmail_history_batches_total", "counter", "Lotes gravados no histórico", stats["batches"]),
+                ("sparkmail_history_write_errors_total", "counter", "Falhas ao gravar lotes no histórico", stats["write_errors"]),
+            ]
+        return samples
+
+async def build_services(warm_up: bool = False) -> ServiceContainer:
+    start = time.perf_counter()
+    services = await asyncio.to_thread(ServiceContainer)
+    await services.start()
+    logger.info(f"Serviços inicializados em {time.perf_counter() - start:.2f}s no processo {os.getpid()}")
+    if warm_up:
+        services.warm_up_task = asyncio.create_task(_warm_up(services))
+    return services
+
+async def _warm_up(services: ServiceContainer) -> None:
+    start = time.perf_counter()
+    try:
+        await services.warm_up()
+        logger.info(f"Aquecimento concluído em {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        logger.warning(f"Falha no aquecimento dos serviços: {str(e)}")
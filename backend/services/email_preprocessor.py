@@ -0,0 +1,125 @@
+import re
+from typing import List, Tuple
+
+QUOTE_HEADER_PATTERNS = [
+    re.compile(r"^\s*(Em|On)\s.{0,200}(escreveu|wrote)\s*:\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*(Mensagem original|Original Message|Mensagem encaminhada|Forwarded message)\s*-{2,}", re.IGNORECASE),
+    re.compile(r"^\s*_{10,}\s*$"),
+]
+# Só é cabeçalho de encaminhamento se o "De:" trouxer um endereço ou vier seguido de uma data de envio.
+HEADER_BLOCK_PATTERN = re.compile(
+    r"^\s*(De|From)\s*:[^\n]*(\S@\S[^\n]*\n\s*(Enviado|Enviada|Sent|Data|Date|Para|To)\s*:"
+    r"|\n\s*(Enviado|Enviada|Sent|Data|Date)\s*:[^\n]*\d)",
+    re.IGNORECASE | re.MULTILINE
+)
+SIGNATURE_PATTERNS = [
+    re.compile(r"^--\s*$"),
+    re.compile(r"^\s*(Enviado|Enviada) (do|de) (meu|minha)\s.{0,40}$", re.IGNORECASE),
+    re.compile(r"^\s*Sent from my\s.{0,40}$", re.IGNORECASE),
+]
+DISCLAIMER_PATTERN = re.compile(
+    r"^\s*(aviso de confidencialidade|confidentiality notice|"
+    r"(esta mensagem|este e-?mail|this (e-?mail|message))\b.*\b(confidencia|confidential|destinat[aá]rio|intended recipient))",
+    re.IGNORECASE
+)
+# Assinaturas e avisos legais ficam no fim: marcadores no meio do texto são conteúdo.
+TRAILING_BLOCK_LINES = 10
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+CHARS_PER_TOKEN = 4
+OMISSION_MARKER = "[...]"
+# Endereços e números (telefones, documentos, pedidos) não saem do processo em registros de decisão.
+ADDRESS_PATTERN = re.compile(r"\S+@\S+|https?://\S+", re.IGNORECASE)
+DIGITS_PATTERN = re.compile(r"\d+")
+REDACTED_ADDRESS = "_endereco_"
+
+def redact_text(text: str) -> str:
+    return DIGITS_PATTERN.sub("0", ADDRESS_PATTERN.sub(REDACTED_ADDRESS, text))
+
+class EmailPreprocessor:
+    def __init__(self, token_budget: int = 1500, strip_history: bool = True):
+        self.token_budget = token_budget
+        self.strip_history = strip_history
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        return sum(
+            -(-len(piece) // CHARS_PER_TOKEN) if piece[0].isalnum() or piece[0] == "_" else 1
+            for piece in TOKEN_PIECE_PATTERN.findall(text)
+        )
+
+    def prepare(self, email_text: str) -> str:
+        text = email_text.replace("\r\n", "\n")
+        if self.strip_history:
+            text = self.strip_signature(self.strip_quoted_history(text))
+        if not text.strip():
+            text = email_text
+        if 0 < self.token_budget < len(text) and self.estimate_tokens(text) > self.token_budget:
+            text = self.truncate(text, self.token_budget)
+        return text.strip()
+
+    @staticmethod
+    def strip_quoted_history(text: str) -> str:
+        header_block = HEADER_BLOCK_PATTERN.search(text)
+        if header_block is not None and text[:header_block.start()].strip():
+            text = text[:header_block.start()]
+
+        kept: List[str] = []
+        for line in text.split("\n"):
+            if any(pattern.match(line) for pattern in QUOTE_HEADER_PATTERNS) and "".join(kept).strip():
+                break
+            if line.lstrip().startswith(">"):
+                continue
+            kept.append(line)
+        return "\n".join(kept)
+
+    @staticmethod
+    def strip_signature(text: str) -> str:
+        lines = text.rstrip().split("\n")
+        for index in range(max(1, len(lines) - TRAILING_BLOCK_LINES), len(lines)):
+            line = lines[index]
+            if any(pattern.match(line) for pattern in SIGNATURE_PATTERNS) or DISCLAIMER_PATTERN.match(line):
+                if "\n".join(lines[:index]).strip():
+                    return "\n".join(lines[:index])
+        return text
+
+    def truncate(self, text: str, budget: int) -> str:
+        paragraphs = [paragraph.strip() for paragraph in re.split(r"\n\s*\n", text) if paragraph.strip()]
+        costs = [self.estimate_tokens(paragraph) for paragraph in paragraphs]
+        marker_cost = self.estimate_tokens(OMISSION_MARKER)
+
+        order: List[int] = [0]
+        if len(paragraphs) > 1:
+            order.append(len(paragraphs) - 1)
+        order += [index for index in range(1, len(paragraphs) - 1) if "?" in paragraphs[index]]
+        order += [index for index in range(1, len(paragraphs) - 1) if "?" not in paragraphs[index]]
+
+        selected: List[Tuple[int, str]] = []
+        remaining = budget
+        for index in order:
+            if costs[index] + marker_cost <= remaining:
+                selected.append((index, paragraphs[index]))
+                remaining -= costs[index] + marker_cost
+            elif not selected or remaining > budget // 4:
+                selected.append((index, self._cut_to_budget(paragraphs[index], remaining - marker_cost)))
+                break
+
+        selected.sort()
+        parts: List[str] = []
+        previous = -1
+        for index, paragraph in selected:
+            if index != previous + 1:
+                parts.append(OMISSION_MARKER)
+            parts.append(paragraph)
+            previous = index
+        if previous != len(paragraphs) - 1:
+            parts.append(OMISSION_MARKER)
+        return "\n\n".join(parts)
+
+    def _cut_to_budget(self, paragraph: str, budget: int) -> str:
+        used = 0
+        for match in TOKEN_PIECE_PATTERN.finditer(paragraph):
+            piece = match.group()
+            used += -(-len(piece) // CHARS_PER_TOKEN) if piece[0].isalnum() or piece[0] == "_" else 1
+            if used > budget:
+                return paragraph[:match.start()].rstrip() + " " + OMISSION_MARKER
+        return paragraph
@@ -1,6 +1,41 @@
-import re
-from typing import Dict, Any
+from itertools import repeat
+from typing import Dict, Any, Iterator, List, Sequence
+import numpy as np
 from models.schemas import EmailFeatures, SentimentIndicators
+from services.keyword_matcher import KeywordMatcher
+
+class EmailFeaturesBatch:
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+    
+    def __len__(self) -> int:
+        return len(self.columns['char_count'])
+    
+    def __getitem__(self, index: int) -> EmailFeatures:
+        columns = self.columns
+        return EmailFeatures(
+            has_questions=bool(columns['has_questions'][index]),
+            has_urgency_indicators=bool(columns['has_urgency_indicators'][index]),
+            has_request_indicators=bool(columns['has_request_indicators'][index]),
+            has_problem_indicators=bool(columns['has_problem_indicators'][index]),
+            has_technical_indicators=bool(columns['has_technical_indicators'][index]),
+            has_social_indicators=bool(columns['has_social_indicators'][index]),
+            formality_score=float(columns['formality_score'][index]),
+            sentiment_indicators=SentimentIndicators(
+                has_negative=bool(columns['has_negative'][index]),
+                has_positive=bool(columns['has_positive'][index]),
+                sentiment_score=float(columns['sentiment_score'][index])
+            ),
+            word_count=int(columns['word_count'][index]),
+            char_count=int(columns['char_count'][index])
+        )
+    
+    def __iter__(self) -> Iterator[EmailFeatures]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def to_list(self) -> List[EmailFeatures]:
+        return list(self)
 
 class FeatureExtractionService:
     def __init__(self):
@@ -34,44 +69,80 @@ class FeatureExtractionService:
         
         self.negative_words = ['ruim', 'péssimo', 'terrível', 'insatisfeito', 'reclamação', 'problema']
         self.positive_words = ['ótimo', 'excelente', 'perfeito', 'satisfeito', 'obrigado', 'parabéns']
+        self.question_words = ['como', 'quando', 'onde', 'por que', 'porque', 'qual']
+        
+        self.matcher = KeywordMatcher({
+            'question': self.question_words,
+            'urgency': self.urgency_keywords,
+            'request': self.request_keywords,
+            'problem': self.problem_keywords,
+            'technical': self.technical_keywords,
+            'social': self.social_keywords,
+            'formal': self.formal_indicators,
+            'informal': self.informal_indicators,
+            'negative': self.negative_words,
+            'positive': self.positive_words
+        })
+    
+    def extract_keyword_counts(self, text: str) -> Dict[str, int]:
+        return self.matcher.count(text)
     
     def extract_features(self, text: str) -> EmailFeatures:
-        text_lower = text.lower()
-        question_patterns = [r'\?', r'como\s+', r'quando\s+', r'onde\s+', r'por\s*que', r'qual\s+']
-        has_questions = any(re.search(pattern, text_lower) for pattern in question_patterns)
-        has_urgency_indicators = any(keyword in text_lower for keyword in self.urgency_keywords)
-        has_request_indicators = any(keyword in text_lower for keyword in self.request_keywords)
-        has_problem_indicators = any(keyword in text_lower for keyword in self.problem_keywords)
-        has_technical_indicators = any(keyword in text_lower for keyword in self.technical_keywords)
-        has_social_indicators = any(keyword in text_lower for keyword in self.social_keywords)
-        formality_score = self._calculate_formality_score(text_lower)
-        sentiment_indicators = self._analyze_sentiment(text_lower)
+        counts, word_count = self.matcher.scan(text)
         
         return EmailFeatures(
-            has_questions=has_questions,
-            has_urgency_indicators=has_urgency_indicators,
-            has_request_indicators=has_request_indicators,
-            has_problem_indicators=has_problem_indicators,
-            has_technical_indicators=has_technical_indicators,
-            has_social_indicators=has_social_indicators,
-            formality_score=formality_score,
-            sentiment_indicators=sentiment_indicators,
-            word_count=len(text.split()),
+            has_questions='?' in text or counts['question'] > 0,
+            has_urgency_indicators=counts['urgency'] > 0,
+            has_request_indicators=counts['request'] > 0,
+            has_problem_indicators=counts['problem'] > 0,
+            has_technical_indicators=counts['technical'] > 0,
+            has_social_indicators=counts['social'] > 0,
+            formality_score=self._calculate_formality_score(counts),
+            sentiment_indicators=self._analyze_sentiment(counts),
+            word_count=word_count,
             char_count=len(text)
         )
     
-    def _calculate_formality_score(self, text_lower: str) -> float:
-        formal_count = sum(1 for indicator in self.formal_indicators if indicator in text_lower)
-        informal_count = sum(1 for indicator in self.informal_indicators if indicator in text_lower)
+    def extract_features_batch(self, texts: Sequence[str]) -> EmailFeaturesBatch:
+        counts, word_counts = self.matcher.scan_batch(texts)
+        column = {category: counts[:, index] for index, category in enumerate(self.matcher.categories)}
+        
+        formal_informal = column['formal'] + column['informal']
+        formality_score = np.full(len(texts), 0.5)
+        np.divide(column['formal'], formal_informal, out=formality_score, where=formal_informal > 0)
+        
+        positive_negative = column['positive'] + column['negative']
+        sentiment_score = (column['positive'] - column['negative']) / np.maximum(positive_negative, 1)
+        
+        has_question_mark = np.fromiter(map(str.__contains__, texts, repeat('?')), bool, len(texts))
+        
+        return EmailFeaturesBatch({
+            'has_questions': has_question_mark | (column['question'] > 0),
+            'has_urgency_indicators': column['urgency'] > 0,
+            'has_request_indicators': column['request'] > 0,
+            'has_problem_indicators': column['problem'] > 0,
+            'has_technical_indicators': column['technical'] > 0,
+            'has_social_indicators': column['social'] > 0,
+            'formality_score': formality_score,
+            'has_negative': column['negative'] > 0,
+            'has_positive': column['positive'] > 0,
+            'sentiment_score': sentiment_score,
+            'word_count': word_counts,
+            'char_count': np.fromiter(map(len, texts), np.int64, len(texts))
+        })
+    
+    def _calculate_formality_score(self, counts: Dict[str, int]) -> float:
+        formal_count = counts['formal']
+        informal_count = counts['informal']
         
         if formal_count + informal_count == 0:
             return 0.5
         else:
             return formal_count / (formal_count + informal_count)
     
-    def _analyze_sentiment(self, text_lower: str) -> SentimentIndicators:
-        negative_count = sum(1 for word in self.negative_words if word in text_lower)
-        positive_count = sum(1 for word in self.positive_words if word in text_lower)
+    def _analyze_sentiment(self, counts: Dict[str, int]) -> SentimentIndicators:
+        negative_count = counts['negative']
+        positive_count = counts['positive']
         
         sentiment_score = (positive_count - negative_count) / max(positive_count + negative_count, 1)
         
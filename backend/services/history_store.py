@@ -0,0 +1,255 @@
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from models.schemas import EmailFeatures
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+FEATURE_FLAGS = (
+    "has_questions", "has_urgency_indicators", "has_request_indicators",
+    "has_problem_indicators", "has_technical_indicators", "has_social_indicators"
+)
+COUNTER_BUCKET_SECONDS = 3600
+GRANULARITY_SECONDS = {"hour": 3600, "day": 86400}
+
+class HistoryRecord(NamedTuple):
+    created_at: float
+    text_hash: str
+    category: str
+    confidence: float
+    is_urgent: bool
+    latency_ms: float
+    model: str
+    path: str
+    feature_flags: int
+    word_count: int
+    formality_score: float
+    sentiment_score: float
+
+def encode_feature_flags(features: EmailFeatures) -> int:
+    flags = 0
+    for bit, name in enumerate(FEATURE_FLAGS):
+        if getattr(features, name):
+            flags |= 1 << bit
+    return flags
+
+def decode_feature_flags(flags: int) -> Dict[str, bool]:
+    return {name: bool(flags & (1 << bit)) for bit, name in enumerate(FEATURE_FLAGS)}
+
+class HistoryStore:
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.path = path
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._writer_db = self._connect()
+        self._writer_db.executescript(
+            "CREATE TABLE IF NOT EXISTS classification_history ("
+            " id INTEGER PRIMARY KEY, created_at REAL NOT NULL, text_hash TEXT NOT NULL, category TEXT NOT NULL,"
+            " confidence REAL NOT NULL, is_urgent INTEGER NOT NULL, latency_ms REAL NOT NULL, model TEXT NOT NULL,"
+            " path TEXT NOT NULL, feature_flags INTEGER NOT NULL, word_count INTEGER NOT NULL,"
+            " formality_score REAL NOT NULL, sentiment_score REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_history_created ON classification_history (created_at);"
+            "CREATE INDEX IF NOT EXISTS idx_history_category ON classification_history (category, created_at);"
+            "CREATE INDEX IF NOT EXISTS idx_history_urgent ON classification_history (is_urgent, created_at);"
+            "CREATE TABLE IF NOT EXISTS history_counters ("
+            " bucket INTEGER NOT NULL, category TEXT NOT NULL, path TEXT NOT NULL, is_urgent INTEGER NOT NULL,"
+            " count INTEGER NOT NULL, latency_ms_total REAL NOT NULL,"
+            " PRIMARY KEY (bucket, category, path, is_urgent)) WITHOUT ROWID;"
+        )
+        self._reader_db = self._connect()
+        self._reader_lock = threading.Lock()
+        self._pending: List[HistoryRecord] = []
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=5, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def record(self, record: HistoryRecord) -> None:
+        if self._closed:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(record)
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _write_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+            if self._closed:
+                return
+
+    async def _flush(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self.written += len(batch)
+                self.batches += 1
+            except sqlite3.Error as e:
+                self.write_errors += 1
+                self.dropped += len(batch)
+                logger.error(f"Erro ao gravar histórico: {str(e)}")
+
+    def _write_batch(self, batch: List[HistoryRecord]) -> None:
+        counters: Dict[Tuple[int, str, str, int], List[float]] = {}
+        for record in batch:
+            key = (int(record.created_at // COUNTER_BUCKET_SECONDS * COUNTER_BUCKET_SECONDS),
+                   record.category, record.path, int(record.is_urgent))
+            counter = counters.setdefault(key, [0, 0.0])
+            counter[0] += 1
+            counter[1] += record.latency_ms
+
+        self._writer_db.execute("BEGIN IMMEDIATE")
+        try:
+            self._writer_db.executemany(
+                "INSERT INTO classification_history (created_at, text_hash, category, confidence, is_urgent, latency_ms,"
+                " model, path, feature_flags, word_count, formality_score, sentiment_score)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch
+            )
+            self._writer_db.executemany(
+                "INSERT INTO history_counters (bucket, category, path, is_urgent, count, latency_ms_total)"
+                " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (bucket, category, path, is_urgent) DO UPDATE SET"
+                " count = count + excluded.count, latency_ms_total = latency_ms_total + excluded.latency_ms_total",
+                [(*key, count, latency) for key, (count, latency) in counters.items()]
+            )
+            self._writer_db.execute("COMMIT")
+        except Exception:
+            self._writer_db.execute("ROLLBACK")
+            raise
+
+    async def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        category: Optional[str] = None,
+        is_urgent: Optional[bool] = None,
+        path: Optional[str] = None,
+        before_id: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        clauses, params = self._filters(start, end, category, is_urgent, path, "created_at")
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = await asyncio.to_thread(
+            self._read,
+            "SELECT id, created_at, text_hash, category, confidence, is_urgent, latency_ms, model, path,"
+            f" feature_flags, word_count, formality_score, sentiment_score FROM classification_history {where}"
+            " ORDER BY id DESC LIMIT ?",
+            (*params, limit)
+        )
+        return [
+            {
+                "id": row[0], "created_at": row[1], "text_hash": row[2], "category": row[3], "confidence": row[4],
+                "is_urgent": bool(row[5]), "latency_ms": row[6], "model": row[7], "path": row[8],
+                "features": decode_feature_flags(row[9]), "word_count": row[10],
+                "formality_score": row[11], "sentiment_score": row[12]
+            }
+            for row in rows
+        ]
+
+    async def counters(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        category: Optional[str] = None,
+        is_urgent: Optional[bool] = None,
+        path: Optional[str] = None,
+        granularity: str = "hour"
+    ) -> List[Dict[str, Any]]:
+        step = GRANULARITY_SECONDS[granularity]
+        clauses, params = self._filters(start, end, category, is_urgent, path, "bucket")
+        if start is not None:
+            # Os baldes são horários: o que começou antes do início ainda pode conter registros do intervalo.
+            params[0] = start // COUNTER_BUCKET_SECONDS * COUNTER_BUCKET_SECONDS
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = await asyncio.to_thread(
+            self._read,
+            f"SELECT bucket / {step} * {step} AS period, category, path, is_urgent, SUM(count), SUM(latency_ms_total)"
+            f" FROM history_counters {where} GROUP BY period, category, path, is_urgent ORDER BY period",
+            tuple(params)
+        )
+        return [
+            {
+                "period_start": row[0], "category": row[1], "path": row[2], "is_urgent": bool(row[3]),
+                "count": row[4], "average_latency_ms": row[5] / row[4] if row[4] else 0.0
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _filters(
+        start: Optional[float],
+        end: Optional[float],
+        category: Optional[str],
+        is_urgent: Optional[bool],
+        path: Optional[str],
+        time_column: str
+    ) -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if start is not None:
+            clauses.append(f"{time_column} >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{time_column} < ?")
+            params.append(end)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if is_urgent is not None:
+            clauses.append("is_urgent = ?")
+            params.append(int(is_urgent))
+        if path is not None:
+            clauses.append("path = ?")
+            params.append(path)
+        return clauses, params
+
+    def _read(self, sql: str, params: Tuple[Any, ...]) -> List[Tuple[Any, ...]]:
+        with self._reader_lock:
+            return self._reader_db.execute(sql, params).fetchall()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "written": self.written,
+            "pending": len(self._pending),
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors
+        }
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._writer is not None:
+            # Acorda o writer para o último flush em vez de cancelá-lo no meio do to_thread:
+            # a conexão só fecha depois que a thread terminou de usá-la.
+            self._wakeup.set()
+            await asyncio.wait([self._writer])
+            self._writer = None
+        await self._flush()
+        self._writer_db.close()
+        self._reader_db.close()
@@ -0,0 +1,400 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from config import settings
+from models.schemas import ClassificationMode, JobPayload, JobResponse, JobStatus
+from services.rate_limiter import ANONYMOUS_CLIENT, current_client
+from utils.file_utils import FileProcessor
+from utils.logger import setup_logger
+from utils.webhooks import WebhookURLError, create_webhook_session, validate_webhook_url
+
+if TYPE_CHECKING:
+    import aiohttp
+    from services.classification_service import ClassificationService
+
+logger = setup_logger()
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+JOB_POLL_INTERVAL = 1.0
+JOB_LEASE_GRACE_SECONDS = 30.0
+
+class JobQueueFullError(Exception):
+    pass
+
+class JobStore:
+    name = "base"
+
+    async def create(self, job: JobResponse, payload: JobPayload) -> None:
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[JobResponse]:
+        raise NotImplementedError
+
+    async def get_payload(self, job_id: str) -> Optional[JobPayload]:
+        raise NotImplementedError
+
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[JobResponse]:
+        raise NotImplementedError
+
+    async def finish(self, job: JobResponse, owner: str) -> bool:
+        raise NotImplementedError
+
+    async def recoverable(self, now: float) -> List[JobResponse]:
+        raise NotImplementedError
+
+    async def prune(self, finished_before: float) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class InMemoryJobStore(JobStore):
+    name = "memory"
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Tuple[JobResponse, JobPayload]]" = OrderedDict()
+
+    async def create(self, job: JobResponse, payload: JobPayload) -> None:
+        self._jobs[job.job_id] = (job, payload)
+
+    async def get(self, job_id: str) -> Optional[JobResponse]:
+        entry = self._jobs.get(job_id)
+        return entry[0] if entry else None
+
+    async def get_payload(self, job_id: str) -> Optional[JobPayload]:
+        entry = self._jobs.get(job_id)
+        return entry[1] if entry else None
+
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[JobResponse]:
+        entry = self._jobs.get(job_id)
+        if entry is None or entry[0].status != JobStatus.QUEUED:
+            return None
+        job = entry[0].model_copy(update={"status": JobStatus.RUNNING, "started_at": time.time()})
+        self._jobs[job_id] = (job, entry[1])
+        return job.model_copy()
+
+    async def finish(self, job: JobResponse, owner: str) -> bool:
+        entry = self._jobs.get(job.job_id)
+        if entry is None or entry[0].status != JobStatus.RUNNING:
+            return False
+        self._jobs[job.job_id] = (job, entry[1])
+        return True
+
+    async def recoverable(self, now: float) -> List[JobResponse]:
+        return [job for job, _ in self._jobs.values() if job.status == JobStatus.QUEUED]
+
+    async def prune(self, finished_before: float) -> None:
+        expired = [
+            job_id for job_id, (job, _) in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < finished_before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+class SQLiteJobStore(JobStore):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs "
+            "(job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, "
+            "finished_at REAL, payload TEXT NOT NULL, record TEXT NOT NULL, owner TEXT, lease_expires_at REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at)")
+        self._db.commit()
+        self._db_lock = asyncio.Lock()
+
+    async def _run_db(self, func, *args):
+        async with self._db_lock:
+            return await asyncio.to_thread(func, *args)
+
+    async def create(self, job: JobResponse, payload: JobPayload) -> None:
+        await self._run_db(self._db_create, job, payload)
+
+    def _db_create(self, job: JobResponse, payload: JobPayload) -> None:
+        self._db.execute(
+            "INSERT INTO jobs (job_id, status, created_at, finished_at, payload, record) VALUES (?, ?, ?, ?, ?, ?)",
+            (job.job_id, job.status.value, job.created_at, job.finished_at, payload.model_dump_json(), job.model_dump_json())
+        )
+        self._db.commit()
+
+    async def get(self, job_id: str) -> Optional[JobResponse]:
+        row = await self._run_db(self._db_select, "record", job_id)
+        return JobResponse.model_validate_json(row[0]) if row else None
+
+    async def get_payload(self, job_id: str) -> Optional[JobPayload]:
+        row = await self._run_db(self._db_select, "payload", job_id)
+        return JobPayload.model_validate_json(row[0]) if row else None
+
+    def _db_select(self, column: str, job_id: str) -> Optional[Tuple[str]]:
+        return self._db.execute(f"SELECT {column} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[JobResponse]:
+        row = await self._run_db(self._db_claim, job_id, owner, lease_seconds)
+        return JobResponse.model_validate_json(row[0]) if row else None
+
+    def _db_claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[Tuple[str]]:
+        # O UPDATE condicional é a reivindicação: entre vários workers lendo o mesmo banco, só um vence.
+        now = time.time()
+        cursor = self._db.execute(
+            "UPDATE jobs SET status = ?, owner = ?, lease_expires_at = ?, "
+            "record = json_set(record, '$.status', ?, '$.started_at', ?) "
+            "WHERE job_id = ? AND (status = ? OR (status = ? AND lease_expires_at < ?))",
+            (
+                JobStatus.RUNNING.value, owner, now + lease_seconds, JobStatus.RUNNING.value, now,
+                job_id, JobStatus.QUEUED.value, JobStatus.RUNNING.value, now
+            )
+        )
+        self._db.commit()
+        if cursor.rowcount == 0:
+            return None
+        return self._db_select("record", job_id)
+
+    async def finish(self, job: JobResponse, owner: str) -> bool:
+        return await self._run_db(self._db_finish, job, owner)
+
+    def _db_finish(self, job: JobResponse, owner: str) -> bool:
+        cursor = self._db.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, record = ?, lease_expires_at = NULL "
+            "WHERE job_id = ? AND owner = ? AND status = ?",
+            (job.status.value, job.finished_at, job.model_dump_json(), job.job_id, owner, JobStatus.RUNNING.value)
+        )
+        self._db.commit()
+        return cursor.rowcount > 0
+
+    async def recoverable(self, now: float) -> List[JobResponse]:
+        rows = await self._run_db(self._db_recoverable, now)
+        return [JobResponse.model_validate_json(row[0]) for row in rows]
+
+    def _db_recoverable(self, now: float) -> List[Tuple[str]]:
+        return self._db.execute(
+            "SELECT record FROM jobs WHERE status = ? OR (status = ? AND lease_expires_at < ?) ORDER BY created_at",
+            (JobStatus.QUEUED.value, JobStatus.RUNNING.value, now)
+        ).fetchall()
+
+    async def prune(self, finished_before: float) -> None:
+        await self._run_db(self._db_prune, finished_before)
+
+    def _db_prune(self, finished_before: float) -> None:
+        self._db.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (finished_before,))
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+def create_job_store() -> JobStore:
+    if settings.job_store == "sqlite":
+        return SQLiteJobStore(settings.job_sqlite_path)
+    return InMemoryJobStore()
+
+class JobQueue:
+    def __init__(
+        self,
+        classification_service: "ClassificationService",
+        store: JobStore,
+        workers: int = 4,
+        max_queue_depth: int = 100
+    ):
+        self.classification_service = classification_service
+        self.store = store
+        self.workers = max(workers, 1)
+        self.max_queue_depth = max(max_queue_depth, 1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._events: Dict[str, asyncio.Event] = {}
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = settings.job_timeout_seconds + JOB_LEASE_GRACE_SECONDS
+        self.running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.webhooks_failed = 0
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+        # Jobs na fila e jobs em execução com a concessão vencida (worker que caiu); quem
+        # de fato executa cada um é decidido por store.claim em _run.
+        for job in await self.store.recoverable(time.time()):
+            if not self._queue.full():
+                self._queue.put_nowait(job.job_id)
+                continue
+            claimed = await self.store.claim(job.job_id, self.owner, self.lease_seconds)
+            if claimed is not None:
+                await self._finish(claimed, error="Job descartado: fila cheia ao reiniciar o serviço")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self.store.close()
+
+    async def submit(
+        self,
+        payload: JobPayload,
+        source: Optional[str] = None
+    ) -> JobResponse:
+        await self.start()
+        if self._queue.full():
+            self.rejected += 1
+            raise JobQueueFullError("Fila de processamento cheia, tente novamente em instantes")
+
+        job = JobResponse(job_id=uuid.uuid4().hex, status=JobStatus.QUEUED, source=source, created_at=time.time())
+        await self.store.create(job, payload)
+        self._queue.put_nowait(job.job_id)
+        self.submitted += 1
+        if self.submitted % 100 == 0:
+            await self.store.prune(time.time() - settings.job_result_ttl_seconds)
+        return job
+
+    async def get(self, job_id: str) -> Optional[JobResponse]:
+        return await self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float, until_finished: bool = True) -> Optional[JobResponse]:
+        deadline = time.monotonic() + timeout
+        job = await self.store.get(job_id)
+        while job is not None and job.status not in FINISHED_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            previous_status = job.status
+            event = self._events.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, JOB_POLL_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
+            job = await self.store.get(job_id)
+            if not until_finished and job is not None and job.status != previous_status:
+                break
+        return job
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self.store.name,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "running": self.running,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "webhooks_failed": self.webhooks_failed
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self.running += 1
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro inesperado no job {job_id}: {str(e)}")
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        payload = await self.store.get_payload(job_id)
+        if payload is None:
+            return
+        job = await self.store.claim(job_id, self.owner, self.lease_seconds)
+        if job is None:
+            return
+        self._notify(job_id)
+
+        try:
+            classification = await asyncio.wait_for(
+                self._classify(payload), timeout=settings.job_timeout_seconds
+            )
+            finished = await self._finish(job, classification=classification)
+        except asyncio.TimeoutError:
+            finished = await self._finish(job, error="Tempo limite excedido na classificação")
+        except Exception as e:
+            finished = await self._finish(job, error=getattr(e, "detail", None) or f"Erro na classificação: {str(e)}")
+        finally:
+            if payload.file_path and os.path.exists(payload.file_path):
+                os.unlink(payload.file_path)
+
+        if finished and payload.webhook_url:
+            await self._deliver_webhook(payload.webhook_url, job)
+
+    async def _classify(self, payload: JobPayload):
+        current_client.set(payload.client_id or ANONYMOUS_CLIENT)
+        email_text = payload.text
+        if payload.file_path:
+            email_text = await FileProcessor.extract_text_from_pdf_file(payload.file_path)
+        if not email_text or not email_text.strip():
+            raise ValueError("Arquivo vazio ou não foi possível extrair texto")
+        mode = ClassificationMode(payload.mode) if payload.mode else None
+        return await self.classification_service.classify_email(email_text, mode)
+
+    async def _finish(self, job: JobResponse, classification=None, error: Optional[str] = None) -> bool:
+        job.status = JobStatus.FAILED if error else JobStatus.SUCCEEDED
+        job.classification = classification
+        job.error = error
+        job.finished_at = time.time()
+        if not await self.store.finish(job, self.owner):
+            logger.warning(f"Job {job.job_id} foi reassumido por outro worker; resultado descartado")
+            return False
+        if error:
+            self.failed += 1
+        else:
+            self.succeeded += 1
+        self._notify(job.job_id)
+        return True
+
+    def _notify(self, job_id: str) -> None:
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _deliver_webhook(self, url: str, job: JobResponse) -> None:
+        import aiohttp
+        try:
+            await validate_webhook_url(url)
+        except WebhookURLError as e:
+            self.webhooks_failed += 1
+            logger.warning(f"Webhook do job {job.job_id} recusado: {str(e)}")
+            return
+        if self._session is None or self._session.closed:
+            self._session = create_webhook_session(settings.webhook_timeout_seconds)
+        body = job.model_dump_json()
+        for attempt in range(settings.webhook_max_retries + 1):
+            try:
+                async with self._session.post(
+                    url, data=body, headers={"Content-Type": "application/json"}, allow_redirects=False
+                ) as response:
+                    # Redirecionamento levaria o payload a um destino que não passou pela validação.
+                    if 300 <= response.status < 400:
+                        break
+                    if response.status < 500:
+                        return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            if attempt < settings.webhook_max_retries:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        self.webhooks_failed += 1
+        logger.warning(f"Falha ao entregar webhook do job {job.job_id} para {url}")
@@ -0,0 +1,192 @@
+import re
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+import numpy as np
+
+ACCENT_FOLDING = str.maketrans(
+    "áàâãäéèêëíìîïóòôõöúùûüçñ",
+    "aaaaaeeeeiiiiooooouuuucn"
+)
+ACCENT_VARIANTS = {
+    "a": "aáàâãä", "e": "eéèêë", "i": "iíìîï", "o": "oóòôõö", "u": "uúùûü", "c": "cç", "n": "nñ"
+}
+WORD_PATTERN = re.compile(r"\w+")
+TOKEN_CACHE_LIMIT = 200_000
+BATCH_SEPARATOR = "\n_\x00_\n"
+
+def fold_text(text: str) -> str:
+    return text.lower().translate(ACCENT_FOLDING)
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class KeywordScan(NamedTuple):
+    counts: Dict[str, int]
+    word_count: int
+
+class KeywordBatchScan(NamedTuple):
+    counts: np.ndarray
+    word_counts: np.ndarray
+
+class KeywordMatcher:
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = list(categories)
+        self._word_categories: Dict[str, List[str]] = {}
+        self._phrases: List[Tuple[Tuple[str, ...], re.Pattern, List[str]]] = []
+        self._token_cache: Dict[str, Tuple[str, ...]] = {}
+
+        phrase_categories: Dict[Tuple[str, ...], List[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                words = tuple(WORD_PATTERN.findall(fold_text(keyword)))
+                if len(words) == 1:
+                    self._word_categories.setdefault(words[0], []).append(category)
+                else:
+                    phrase_categories.setdefault(words, []).append(category)
+
+        for words, phrase_category_list in phrase_categories.items():
+            self._phrases.append((words, self._compile_phrase(words), phrase_category_list))
+
+        self._vocabulary = set(self._word_categories)
+        for words, _, _ in self._phrases:
+            self._vocabulary.update(words)
+
+    @staticmethod
+    def _compile_phrase(words: Tuple[str, ...]) -> re.Pattern:
+        parts = []
+        for word in words:
+            parts.append("".join(
+                f"[{ACCENT_VARIANTS[char]}]" if char in ACCENT_VARIANTS else re.escape(char)
+                for char in word
+            ))
+        # Sem lookbehind no início para o re usar a busca rápida por prefixo;
+        # a fronteira à esquerda é conferida em count().
+        return re.compile(r"\W+".join(parts) + r"(?!\w)")
+
+    def _normalize_token(self, token: str) -> Tuple[str, ...]:
+        words = self._token_cache.get(token)
+        if words is None:
+            words = tuple(
+                word for word in WORD_PATTERN.findall(token.translate(ACCENT_FOLDING))
+                if word in self._vocabulary
+            )
+            if len(self._token_cache) >= TOKEN_CACHE_LIMIT:
+                self._token_cache.clear()
+            self._token_cache[token] = words
+        return words
+
+    def count(self, text: str) -> Dict[str, int]:
+        return self.scan(text).counts
+
+    def scan(self, text: str) -> KeywordScan:
+        # Cada palavra-chave conta no máximo uma vez por texto: a contagem da categoria
+        # é o número de palavras-chave distintas presentes, não de ocorrências.
+        counts = dict.fromkeys(self.categories, 0)
+        normalize_token = self._normalize_token
+        text_lower = text.lower()
+        tokens = text_lower.split()
+        words_found = set()
+        for token in set(tokens):
+            words_found.update(normalize_token(token))
+
+        word_categories = self._word_categories
+        for word in words_found:
+            for category in word_categories.get(word, ()):
+                counts[category] += 1
+
+        for words, pattern, phrase_category_list in self._phrases:
+            if all(word in words_found for word in words) and any(
+                match.start() == 0 or not _is_word_char(text_lower[match.start() - 1])
+                for match in pattern.finditer(text_lower)
+            ):
+                for category in phrase_category_list:
+                    counts[category] += 1
+
+        return KeywordScan(counts, len(tokens))
+
+    def scan_batch(self, texts: Sequence[str]) -> KeywordBatchScan:
+        category_index = {category: index for index, category in enumerate(self.categories)}
+        counts = np.zeros((len(texts), len(self.categories)), dtype=np.int64)
+        if not texts:
+            return KeywordBatchScan(counts, np.zeros(0, dtype=np.int64))
+
+        lowered = list(map(str.lower, texts))
+        joined = BATCH_SEPARATOR.join(lowered)
+        if joined.count("\x00") != len(texts) - 1:
+            scans = list(map(self.scan, texts))
+            for category, column in category_index.items():
+                counts[:, column] = np.fromiter((scan.counts[category] for scan in scans), np.int64, len(scans))
+            return KeywordBatchScan(counts, np.fromiter((scan.word_count for scan in scans), np.int64, len(scans)))
+
+        tokens = joined.split()
+        vocabulary = list(dict.fromkeys(tokens))
+        token_index = dict(zip(vocabulary, range(len(vocabulary))))
+        token_ids = np.fromiter(map(token_index.__getitem__, tokens), np.int64, len(tokens))
+
+        separator_id = token_index.get(BATCH_SEPARATOR.strip(), -1)
+        is_separator = token_ids == separator_id
+        document_ids = np.cumsum(is_separator)
+        word_counts = np.bincount(document_ids[~is_separator], minlength=len(texts))
+
+        word_ids = {word: index for index, word in enumerate(self._word_categories)}
+        word_category_matrix = np.zeros((len(word_ids), len(self.categories)), dtype=np.int64)
+        for word, index in word_ids.items():
+            for category in self._word_categories[word]:
+                word_category_matrix[index, category_index[category]] += 1
+
+        pair_tokens: List[int] = []
+        pair_words: List[int] = []
+        word_token_ids: Dict[str, List[int]] = {word: [] for words, _, _ in self._phrases for word in words}
+        for token_id, token in enumerate(vocabulary):
+            for word in self._normalize_token(token):
+                if word in word_ids:
+                    pair_tokens.append(token_id)
+                    pair_words.append(word_ids[word])
+                if word in word_token_ids:
+                    word_token_ids[word].append(token_id)
+
+        if pair_tokens:
+            # Matriz de presença (documento x palavra-chave): repetições no mesmo texto contam uma vez.
+            words_per_token = np.bincount(pair_tokens, minlength=len(vocabulary))
+            first_pair = np.concatenate(([0], np.cumsum(words_per_token)[:-1]))
+            relevant = np.flatnonzero(words_per_token[token_ids] > 0)
+            repeats = words_per_token[token_ids[relevant]]
+            pair_offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+            pair_index = np.repeat(first_pair[token_ids[relevant]], repeats) + pair_offsets
+            present = np.zeros((len(texts) + 1, len(word_ids)), dtype=bool)
+            present[np.repeat(document_ids[relevant], repeats), np.asarray(pair_words)[pair_index]] = True
+            counts += present[:len(texts)].astype(np.int64) @ word_category_matrix
+
+        word_documents: Dict[str, np.ndarray] = {}
+        for word, ids in word_token_ids.items():
+            in_vocabulary = np.zeros(len(vocabulary), dtype=bool)
+            in_vocabulary[ids] = True
+            present = np.zeros(len(texts) + 1, dtype=bool)
+            present[document_ids[in_vocabulary[token_ids]]] = True
+            word_documents[word] = present[:len(texts)]
+
+        for words, pattern, phrase_category_list in self._phrases:
+            candidates = np.flatnonzero(np.logical_and.reduce([word_documents[word] for word in words]))
+            if not len(candidates):
+                continue
+
+            phrase_counts = self._count_phrase_batch(pattern, list(map(lowered.__getitem__, candidates.tolist())))
+            for category in phrase_category_list:
+                counts[candidates, category_index[category]] += np.minimum(phrase_counts, 1)
+
+        return KeywordBatchScan(counts, word_counts)
+
+    @staticmethod
+    def _count_phrase_batch(pattern: re.Pattern, lowered: List[str]) -> np.ndarray:
+        joined = BATCH_SEPARATOR.join(lowered)
+        starts = [
+            match.start() for match in pattern.finditer(joined)
+            if match.start() == 0 or not _is_word_char(joined[match.start() - 1])
+        ]
+        if not starts:
+            return np.zeros(len(lowered), dtype=np.int64)
+
+        lengths = np.fromiter(map(len, lowered), np.int64, len(lowered))
+        document_starts = np.zeros(len(lowered), dtype=np.int64)
+        document_starts[1:] = np.cumsum(lengths[:-1] + len(BATCH_SEPARATOR))
+        documents = np.searchsorted(document_starts, np.asarray(starts, dtype=np.int64), side="right") - 1
+        return np.bincount(documents, minlength=len(lowered))
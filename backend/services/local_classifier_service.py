@@ -0,0 +1,104 @@
+import zlib
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from models.schemas import EmailCategory, EmailFeatures
+from services.email_preprocessor import redact_text
+from services.keyword_matcher import WORD_PATTERN, fold_text
+
+HASH_DIMENSIONS = 2 ** 18
+CLASSES = [EmailCategory.PRODUCTIVE.value, EmailCategory.UNPRODUCTIVE.value]
+
+class LocalClassifier:
+    def __init__(self, class_log_prior: np.ndarray, feature_log_prob: np.ndarray):
+        self.class_log_prior = class_log_prior
+        self.feature_log_prob = feature_log_prob
+
+    @staticmethod
+    def featurize(email_text: str, features: EmailFeatures) -> Dict[int, int]:
+        # Mesma redação do registro de decisões, de onde vêm os exemplos de treino.
+        words = WORD_PATTERN.findall(fold_text(redact_text(email_text)))
+        tokens = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+        tokens += [
+            f"__questions_{features.has_questions}",
+            f"__urgency_{features.has_urgency_indicators}",
+            f"__request_{features.has_request_indicators}",
+            f"__problem_{features.has_problem_indicators}",
+            f"__technical_{features.has_technical_indicators}",
+            f"__social_{features.has_social_indicators}",
+            f"__negative_{features.sentiment_indicators.has_negative}",
+            f"__positive_{features.sentiment_indicators.has_positive}",
+            f"__formality_{round(features.formality_score, 1)}",
+            f"__length_{min(features.word_count.bit_length(), 12)}",
+        ]
+
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            index = zlib.crc32(token.encode("utf-8")) % HASH_DIMENSIONS
+            counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    def predict(self, email_text: str, features: EmailFeatures) -> Tuple[str, float]:
+        counts = self.featurize(email_text, features)
+        indexes = np.fromiter(counts.keys(), np.int64, len(counts))
+        values = np.fromiter(counts.values(), np.float64, len(counts))
+        scores = self.class_log_prior + self.feature_log_prob[:, indexes] @ values
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = int(np.argmax(probabilities))
+        return CLASSES[best], float(probabilities[best])
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, EmailFeatures, str]], alpha: float = 1.0) -> "LocalClassifier":
+        feature_counts = np.zeros((len(CLASSES), HASH_DIMENSIONS), dtype=np.float64)
+        class_counts = np.zeros(len(CLASSES), dtype=np.float64)
+        for email_text, features, category in samples:
+            label = CLASSES.index(category)
+            class_counts[label] += 1
+            for index, count in cls.featurize(email_text, features).items():
+                feature_counts[label, index] += count
+
+        if not class_counts.all():
+            raise ValueError("O treino precisa de exemplos das duas categorias")
+
+        smoothed = feature_counts + alpha
+        feature_log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        class_log_prior = np.log(class_counts) - np.log(class_counts.sum())
+        return cls(class_log_prior, feature_log_prob.astype(np.float32))
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as model_file:
+            np.savez_compressed(
+                model_file,
+                class_log_prior=self.class_log_prior,
+                feature_log_prob=self.feature_log_prob,
+                classes=np.array(CLASSES),
+                dimensions=np.array(HASH_DIMENSIONS)
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalClassifier":
+        with np.load(path) as data:
+            if int(data["dimensions"]) != HASH_DIMENSIONS or list(data["classes"]) != CLASSES:
+                raise ValueError("Modelo local incompatível com esta versão")
+            return cls(data["class_log_prior"], data["feature_log_prob"])
+
+    def evaluate(
+        self,
+        samples: List[Tuple[str, EmailFeatures, str]],
+        threshold: float
+    ) -> Dict[str, float]:
+        agreed = routed = routed_agreed = 0
+        for email_text, features, category in samples:
+            predicted, confidence = self.predict(email_text, features)
+            agreed += predicted == category
+            if confidence >= threshold:
+                routed += 1
+                routed_agreed += predicted == category
+
+        total = max(len(samples), 1)
+        return {
+            "samples": len(samples),
+            "agreement": agreed / total,
+            "routed_fraction": routed / total,
+            "routed_agreement": routed_agreed / routed if routed else 0.0
+        }
@@ -0,0 +1,106 @@
+from typing import Dict, NamedTuple
+from config import settings
+from models.schemas import EmailFeatures
+
+class ModelTier(NamedTuple):
+    name: str
+    model: str
+    classification_max_tokens: int
+    response_max_tokens: int
+    cost_per_1k_tokens: float
+
+class ModelRouter:
+    def __init__(
+        self,
+        simple: ModelTier,
+        standard: ModelTier,
+        complex: ModelTier,
+        enabled: bool = True,
+        simple_max_words: int = 60,
+        complex_min_words: int = 300
+    ):
+        self.tiers: Dict[str, ModelTier] = {tier.name: tier for tier in (simple, standard, complex)}
+        self.simple = simple
+        self.standard = standard
+        self.complex = complex
+        self.enabled = enabled
+        self.simple_max_words = simple_max_words
+        self.complex_min_words = complex_min_words
+        self.routed: Dict[str, int] = {tier.name: 0 for tier in (simple, standard, complex)}
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        return cls(
+            simple=ModelTier(
+                "simple",
+                settings.simple_model or settings.openai_model,
+                settings.simple_classification_max_tokens,
+                settings.simple_response_max_tokens,
+                settings.simple_cost_per_1k_tokens if settings.simple_model else settings.standard_cost_per_1k_tokens
+            ),
+            standard=ModelTier(
+                "standard",
+                settings.openai_model,
+                settings.classification_max_tokens,
+                settings.response_max_tokens,
+                settings.standard_cost_per_1k_tokens
+            ),
+            complex=ModelTier(
+                "complex",
+                settings.complex_model or settings.openai_model,
+                settings.complex_classification_max_tokens,
+                settings.complex_response_max_tokens,
+                settings.complex_cost_per_1k_tokens if settings.complex_model else settings.standard_cost_per_1k_tokens
+            ),
+            enabled=settings.model_routing_enabled,
+            simple_max_words=settings.simple_max_words,
+            complex_min_words=settings.complex_min_words
+        )
+
+    def route(self, features: EmailFeatures) -> ModelTier:
+        tier = self.select(features)
+        self.routed[tier.name] += 1
+        return tier
+
+    def select(self, features: EmailFeatures) -> ModelTier:
+        if not self.enabled:
+            return self.standard
+        if self._is_complex(features):
+            return self.complex
+        if self._is_simple(features):
+            return self.simple
+        return self.standard
+
+    def _is_complex(self, features: EmailFeatures) -> bool:
+        if features.word_count >= self.complex_min_words:
+            return True
+        if features.has_technical_indicators and features.has_problem_indicators:
+            return True
+        return features.has_urgency_indicators and (features.has_problem_indicators or features.has_technical_indicators)
+
+    def _is_simple(self, features: EmailFeatures) -> bool:
+        if features.word_count > self.simple_max_words:
+            return False
+        return not (
+            features.has_questions
+            or features.has_request_indicators
+            or features.has_problem_indicators
+            or features.has_technical_indicators
+            or features.has_urgency_indicators
+        )
+
+    def stats(self) -> Dict[str, object]:
+        total = sum(self.routed.values())
+        return {
+            "enabled": self.enabled,
+            "tiers": {
+                name: {
+                    "model": tier.model,
+                    "classification_max_tokens": tier.classification_max_tokens,
+                    "response_max_tokens": tier.response_max_tokens,
+                    "routed": self.routed[name],
+                    "fraction": self.routed[name] / total if total else 0.0
+                }
+                for name, tier in self.tiers.items()
+            }
+        }
@@ -0,0 +1,169 @@
+import asyncio
+import re
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from models.schemas import EmailClassification
+from services.keyword_matcher import WORD_PATTERN, fold_text
+
+MERSENNE_PRIME = np.uint64(4294967291)
+MAX_SHINGLES = 4000
+NUMBER_PATTERN = re.compile(r"\d+")
+ADDRESS_PATTERN = re.compile(r"\S+@\S+|https?://\S+")
+
+class NearDuplicateMatch(NamedTuple):
+    similarity: float
+    email_text: str
+    classification: EmailClassification
+
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 2,
+        max_entries: int = 50000,
+        sqlite_path: str = "",
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm precisa ser múltiplo de bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(MERSENNE_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(MERSENNE_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, str, EmailClassification]]" = OrderedDict()
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._next_id = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = asyncio.Lock()
+        self.lookups = 0
+        self.reused = 0
+        self.refused = 0
+
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS near_duplicates "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, email_text TEXT NOT NULL, "
+                "classification TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT email_text, classification FROM near_duplicates ORDER BY id DESC LIMIT ?", (max_entries,)
+            ).fetchall()
+            for email_text, classification in reversed(rows):
+                self._insert(email_text, EmailClassification.model_validate_json(classification))
+
+    @staticmethod
+    def normalize(text: str) -> List[str]:
+        text = ADDRESS_PATTERN.sub(" _endereco_ ", fold_text(text))
+        return WORD_PATTERN.findall(NUMBER_PATTERN.sub("0", text))
+
+    def signature(self, text: str) -> np.ndarray:
+        words = self.normalize(text)
+        if len(words) >= self.shingle_size:
+            shingles = {
+                " ".join(words[index:index + self.shingle_size])
+                for index in range(min(len(words) - self.shingle_size + 1, MAX_SHINGLES))
+            }
+        else:
+            shingles = {" ".join(words)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), np.uint64, len(shingles)
+        )
+        return ((self._a * hashes + self._b) % MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def lookup(self, email_text: str) -> Optional[NearDuplicateMatch]:
+        self.lookups += 1
+        if not self._entries:
+            return None
+
+        signature = self.signature(email_text)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best: Optional[Tuple[float, int]] = None
+        for entry_id in candidates:
+            similarity = float(np.mean(self._entries[entry_id][0] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[0]):
+                best = (similarity, entry_id)
+
+        if best is None:
+            return None
+        _, stored_text, classification = self._entries[best[1]]
+        if self.leaks_previous_email(classification.suggested_response, stored_text, email_text):
+            self.refused += 1
+            return None
+        self._entries.move_to_end(best[1])
+        self.reused += 1
+        return NearDuplicateMatch(best[0], stored_text, classification)
+
+    async def add(self, email_text: str, classification: EmailClassification) -> None:
+        self._insert(email_text, classification)
+        if self._db is not None:
+            async with self._db_lock:
+                await asyncio.to_thread(self._db_add, email_text, classification.model_dump_json())
+
+    def _insert(self, email_text: str, classification: EmailClassification) -> None:
+        signature = self.signature(email_text)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (signature, email_text, classification)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            evicted_id, (evicted_signature, _, _) = self._entries.popitem(last=False)
+            for band, key in enumerate(self._band_keys(evicted_signature)):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.remove(evicted_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def _db_add(self, email_text: str, classification: str) -> None:
+        self._db.execute(
+            "INSERT INTO near_duplicates (email_text, classification, created_at) VALUES (?, ?, ?)",
+            (email_text, classification, time.time())
+        )
+        self._db.execute(
+            "DELETE FROM near_duplicates WHERE id <= (SELECT MAX(id) FROM near_duplicates) - ?", (self.max_entries,)
+        )
+        self._db.commit()
+
+    @staticmethod
+    def leaks_previous_email(response: str, previous_text: str, email_text: str) -> bool:
+        # Palavras que só existiam no email anterior (nome, chamado, data) não podem ir para outro remetente.
+        # Conjuntos e não diff de sequência: é linear no tamanho dos emails e roda no event loop.
+        previous_only = set(WORD_PATTERN.findall(fold_text(previous_text)))
+        previous_only.difference_update(WORD_PATTERN.findall(fold_text(email_text)))
+        return not previous_only.isdisjoint(WORD_PATTERN.findall(fold_text(response)))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._entries),
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "reused": self.reused,
+            "refused": self.refused,
+            "reuse_rate": self.reused / self.lookups if self.lookups else 0.0
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,56 +1,303 @@
-import openai
 import json
-from typing import Dict, Any
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, List, Optional
 from config import settings
 from models.schemas import EmailFeatures
+from services.model_router import ModelTier
+from services.rate_limiter import (
+    FairLLMScheduler, SchedulerSaturatedError, SlotStream, current_client, parse_client_weights
+)
+from services.resilience import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, hedged, is_retryable, is_upstream_fault, retry_after
+)
+from utils.metrics import (
+    LLM_TOKENS, MODEL_TIER_CALLS, MODEL_TIER_COST, MODEL_TIER_DURATION, MODEL_TIER_TOKENS, observe_stage
+)
+
+if TYPE_CHECKING:
+    import aiohttp
 
 class OpenAIService:
+    PROMPT_VERSION = "1"
+    
     def __init__(self):
-        openai.api_key = settings.openai_api_key
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.circuit_failure_threshold,
+            recovery_timeout=settings.circuit_recovery_seconds
+        )
+        self.retry_policy = RetryPolicy(
+            max_retries=settings.openai_max_retries,
+            base_delay=settings.openai_retry_base_delay,
+            max_delay=settings.openai_retry_max_delay
+        )
+        self.scheduler: Optional[FairLLMScheduler] = None
+        if settings.llm_max_concurrency > 0:
+            self.scheduler = FairLLMScheduler(
+                settings.llm_max_concurrency,
+                min_concurrency=settings.llm_min_concurrency,
+                weights=parse_client_weights(settings.client_weights)
+            )
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.hedges = 0
+    
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            import aiohttp
+            connector = aiohttp.TCPConnector(
+                limit=settings.openai_pool_size,
+                keepalive_timeout=30
+            )
+            trace_configs = []
+            if self.scheduler is not None:
+                trace_config = aiohttp.TraceConfig()
+                trace_config.on_request_end.append(self._observe_rate_limit_headers)
+                trace_configs.append(trace_config)
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+        return self._session
+    
+    async def _observe_rate_limit_headers(self, session, context, params) -> None:
+        self.scheduler.observe_headers(params.response.headers)
+    
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def default_tier(self) -> ModelTier:
+        return ModelTier(
+            "standard",
+            settings.openai_model,
+            settings.classification_max_tokens,
+            settings.response_max_tokens,
+            settings.standard_cost_per_1k_tokens
+        )
+    
+    async def _create_completion(self, messages: List[Dict[str, str]], tier: ModelTier, **params) -> Any:
+        MODEL_TIER_CALLS.inc(tier.name, tier.model)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError("Circuito aberto: serviço de IA indisponível no momento")
+            
+            try:
+                if settings.openai_hedge_delay_seconds > 0 and not params.get("stream"):
+                    response = await hedged(
+                        lambda: self._call_with_deadline(messages, tier.model, **params),
+                        settings.openai_hedge_delay_seconds,
+                        self._count_hedge
+                    )
+                else:
+                    response = await self._call_with_deadline(messages, tier.model, **params)
+            except SchedulerSaturatedError:
+                # A fila local estourou o prazo: não diz nada sobre a OpenAI, então nem nova tentativa nem falha no circuito.
+                self.circuit_breaker.record_ignored()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    if is_upstream_fault(e):
+                        self.failures += 1
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_ignored()
+                    raise
+                self.failures += 1
+                if self.scheduler is not None and getattr(e, "http_status", None) == 429:
+                    self.scheduler.record_rate_limited(retry_after(e))
+                else:
+                    self.circuit_breaker.record_failure()
+                if attempt > self.retry_policy.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.retry_policy.delay(attempt, e))
+                continue
+            
+            self.circuit_breaker.record_success()
+            if self.scheduler is not None:
+                self.scheduler.record_success()
+            MODEL_TIER_DURATION.observe(time.perf_counter() - start, tier.name)
+            usage = None if params.get("stream") else response.get("usage")
+            if usage:
+                prompt_tokens = usage.get("prompt_tokens", 0)
+                completion_tokens = usage.get("completion_tokens", 0)
+                LLM_TOKENS.inc("prompt", amount=prompt_tokens)
+                LLM_TOKENS.inc("completion", amount=completion_tokens)
+                MODEL_TIER_TOKENS.inc(tier.name, "prompt", amount=prompt_tokens)
+                MODEL_TIER_TOKENS.inc(tier.name, "completion", amount=completion_tokens)
+                MODEL_TIER_COST.inc(tier.name, amount=(prompt_tokens + completion_tokens) / 1000 * tier.cost_per_1k_tokens)
+            return response
+    
+    def warm_up(self) -> None:
+        import openai
+        self._get_session()
+
+    async def _call_with_deadline(self, messages: List[Dict[str, str]], model: str, **params) -> Any:
+        if self.scheduler is None:
+            return await self._send(messages, model, **params)
+        await self.scheduler.acquire(current_client.get(), timeout=settings.openai_timeout_seconds)
+        try:
+            response = await self._send(messages, model, **params)
+        except BaseException:
+            self.scheduler.release()
+            raise
+        if params.get("stream"):
+            # A vaga só é devolvida quando o corpo do stream termina, não quando o gerador é criado.
+            return SlotStream(response, self.scheduler.release)
+        self.scheduler.release()
+        return response
+
+    async def _send(self, messages: List[Dict[str, str]], model: str, **params) -> Any:
+        import openai
+        token = openai.aiosession.set(self._get_session())
+        try:
+            return await asyncio.wait_for(
+                openai.ChatCompletion.acreate(
+                    model=model,
+                    messages=messages,
+                    api_key=settings.openai_api_key,
+                    api_base=settings.openai_api_base,
+                    request_timeout=settings.openai_timeout_seconds,
+                    **params
+                ),
+                timeout=settings.openai_timeout_seconds
+            )
+        except (asyncio.TimeoutError, openai.error.Timeout):
+            self.timeouts += 1
+            raise
+        finally:
+            openai.aiosession.reset(token)
+    
+    def _count_hedge(self) -> None:
+        self.hedges += 1
     
-    def classify_email(self, email_text: str, features: EmailFeatures) -> Dict[str, Any]:
+    def resilience_stats(self) -> Dict[str, Any]:
+        return {
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "hedges": self.hedges
+        }
+    
+    async def classify_email(
+        self, email_text: str, features: EmailFeatures, tier: Optional[ModelTier] = None
+    ) -> Dict[str, Any]:
+        tier = tier or self.default_tier()
         system_prompt = self._get_classification_system_prompt()
         user_prompt = self._build_classification_user_prompt(email_text, features)
         
         try:
-            response = openai.ChatCompletion.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=settings.classification_temperature,
-                max_tokens=settings.classification_max_tokens,
-                top_p=0.9,
-                frequency_penalty=0.0,
-                presence_penalty=0.0
-            )
+            with observe_stage("llm_classification"):
+                response = await self._create_completion(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    tier=tier,
+                    temperature=settings.classification_temperature,
+                    max_tokens=tier.classification_max_tokens,
+                    top_p=0.9,
+                    frequency_penalty=0.0,
+                    presence_penalty=0.0
+                )
             
             return json.loads(response.choices[0].message.content)
             
+        except SchedulerSaturatedError:
+            raise
         except Exception as e:
             raise Exception(f"Erro na classificação AI: {str(e)}")
     
-    def generate_response(self, email_text: str, category: str, is_urgent: bool, features: EmailFeatures) -> str:
+    async def generate_response(
+        self, email_text: str, category: str, is_urgent: bool, features: EmailFeatures, tier: Optional[ModelTier] = None
+    ) -> str:
+        tier = tier or self.default_tier()
         system_prompt = self._get_response_system_prompt(category)
         user_prompt = self._build_response_user_prompt(email_text, category, is_urgent, features)
         
         try:
-            response = openai.ChatCompletion.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=settings.response_generation_temperature,
-                max_tokens=settings.response_max_tokens
-            )
+            with observe_stage("llm_response"):
+                response = await self._create_completion(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    tier=tier,
+                    temperature=settings.response_generation_temperature,
+                    max_tokens=tier.response_max_tokens
+                )
             
             return response.choices[0].message.content.strip()
             
+        except SchedulerSaturatedError:
+            raise
         except Exception as e:
             raise Exception(f"Erro na geração de resposta: {str(e)}")
     
+    async def stream_response(
+        self, email_text: str, category: str, is_urgent: bool, features: EmailFeatures, tier: Optional[ModelTier] = None
+    ) -> AsyncIterator[str]:
+        tier = tier or self.default_tier()
+        system_prompt = self._get_response_system_prompt(category)
+        user_prompt = self._build_response_user_prompt(email_text, category, is_urgent, features)
+        
+        stream = None
+        try:
+            with observe_stage("llm_response_stream"):
+                stream = await self._create_completion(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    tier=tier,
+                    temperature=settings.response_generation_temperature,
+                    max_tokens=tier.response_max_tokens,
+                    stream=True
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+                    
+        except SchedulerSaturatedError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro na geração de resposta: {str(e)}")
+        finally:
+            if stream is not None and hasattr(stream, "aclose"):
+                await stream.aclose()
+    
+    async def classify_and_respond(
+        self, email_text: str, features: EmailFeatures, tier: Optional[ModelTier] = None
+    ) -> Dict[str, Any]:
+        tier = tier or self.default_tier()
+        system_prompt = self._get_combined_system_prompt()
+        user_prompt = self._build_combined_user_prompt(email_text, features)
+        
+        try:
+            with observe_stage("llm_combined"):
+                response = await self._create_completion(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    tier=tier,
+                    temperature=settings.combined_temperature,
+                    max_tokens=tier.classification_max_tokens + tier.response_max_tokens
+                )
+            
+            return json.loads(response.choices[0].message.content)
+            
+        except SchedulerSaturatedError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro na classificação AI: {str(e)}")
+    
     def _get_classification_system_prompt(self) -> str:
         return """
         Você é um assistente especializado em classificar emails corporativos com alta precisão.
@@ -149,6 +396,52 @@ class OpenAIService:
             - Ano Novo: "Agradeço os votos de Ano Novo! Que este novo ciclo traga muitas realizações para todos nós."
             """
     
+    def _get_combined_system_prompt(self) -> str:
+        return """
+        Você é um assistente especializado em classificar emails corporativos e redigir a resposta sugerida em uma única etapa.
+        
+        1. Classifique o email em uma das categorias:
+           - Produtivo: requer ação, resposta específica ou acompanhamento (suporte técnico, dúvidas, pedidos de informação, relatos de problemas, perguntas factuais como números de emergência, decisões)
+           - Improdutivo: não necessita ação imediata (felicitações, datas comemorativas, agradecimentos gerais, comunicações sociais, newsletters, confirmações simples)
+        
+        2. Avalie a URGÊNCIA, o CONTEXTO e o IMPACTO de ignorar o email.
+        
+        3. Redija a resposta sugerida conforme a categoria:
+           - Produtivo: profissional e cordial, responda diretamente perguntas factuais (190 Polícia, 192 SAMU, 193 Bombeiros), confirme o recebimento, indique próximos passos e prazos, máximo 3 parágrafos, português formal. Para emails urgentes, reconheça a urgência e indique escalação.
+           - Improdutivo: breve e calorosa, agradeça felicitações de forma genuína e adequada à ocasião, sem criar compromissos, máximo 2 parágrafos.
+           - Nunca use placeholders como [Nome] ou [Data].
+        
+        Responda APENAS em formato JSON válido com esta estrutura exata:
+        {
+            "category": "Produtivo" ou "Improdutivo",
+            "confidence": valor entre 0.0 e 1.0,
+            "reasoning": "explicação detalhada da classificação em português",
+            "is_urgent": true ou false,
+            "suggested_response": "texto completo da resposta sugerida"
+        }
+        """
+    
+    def _build_combined_user_prompt(self, email_text: str, features: EmailFeatures) -> str:
+        return f"""
+        Classifique e responda o seguinte email:
+        
+        === TEXTO DO EMAIL ===
+        {email_text}
+        
+        === INDICADORES DETECTADOS AUTOMATICAMENTE ===
+        - Contém perguntas: {features.has_questions}
+        - Indicadores de urgência: {features.has_urgency_indicators}
+        - Indicadores de solicitação: {features.has_request_indicators}
+        - Indicadores de problema: {features.has_problem_indicators}
+        - Indicadores técnicos: {features.has_technical_indicators}
+        - Indicadores sociais: {features.has_social_indicators}
+        - Score de formalidade: {features.formality_score:.2f} (0=informal, 1=formal)
+        - Sentimento: {features.sentiment_indicators.sentiment_score:.2f} (-1=negativo, +1=positivo)
+        - Tamanho: {features.word_count} palavras
+        
+        Responda agora em JSON:
+        """
+    
     def _build_classification_user_prompt(self, email_text: str, features: EmailFeatures) -> str:
         return f"""
         Analise o seguinte email e classifique com base no conteúdo e indicadores detectados:
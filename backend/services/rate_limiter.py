@@ -0,0 +1,319 @@
+import asyncio
+import heapq
+import itertools
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple
+from config import settings
+
+ANONYMOUS_CLIENT = "anonymous"
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+current_client: ContextVar[str] = ContextVar("current_client", default=ANONYMOUS_CLIENT)
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+def parse_client_weights(raw: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for item in raw.split(","):
+        client, _, weight = item.partition("=")
+        if client.strip() and weight.strip():
+            weights[client.strip()] = float(weight)
+    return weights
+
+@lru_cache(maxsize=8)
+def known_api_keys(api_keys: str, client_weights: str) -> FrozenSet[str]:
+    keys = {key.strip() for key in api_keys.split(",") if key.strip()}
+    return frozenset(keys | parse_client_weights(client_weights).keys())
+
+def parse_reset_duration(raw: Optional[str]) -> Optional[float]:
+    if not raw:
+        return None
+    parts = DURATION_PATTERN.findall(raw)
+    if not parts:
+        try:
+            return float(raw)
+        except ValueError:
+            return None
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in parts)
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + (now - updated) * rate)
+
+class TokenBucketBackend:
+    name = "base"
+
+    async def consume(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class InMemoryTokenBucketBackend(TokenBucketBackend):
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = _refill(tokens, updated, now, rate, burst)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+class SQLiteTokenBucketBackend(TokenBucketBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db_lock = asyncio.Lock()
+
+    async def consume(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        async with self._db_lock:
+            return await asyncio.to_thread(self._db_consume, key, rate, burst, cost)
+
+    def _db_consume(self, key: str, rate: float, burst: float, cost: float) -> Tuple[bool, float]:
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = _refill(row[0], row[1], now, rate, burst) if row else burst
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._db.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return allowed, tokens
+
+    def close(self) -> None:
+        self._db.close()
+
+def create_rate_limit_backend() -> TokenBucketBackend:
+    if settings.rate_limit_backend == "sqlite":
+        return SQLiteTokenBucketBackend(settings.rate_limit_sqlite_path)
+    return InMemoryTokenBucketBackend()
+
+class ClientRateLimiter:
+    def __init__(
+        self,
+        backend: TokenBucketBackend,
+        requests_per_minute: float,
+        burst: int,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        self.backend = backend
+        self.requests_per_minute = requests_per_minute
+        self.burst = max(burst, 1)
+        self.weights = weights or {}
+        self.allowed = 0
+        self.rejected = 0
+
+    async def check(self, client_id: str, cost: float = 1.0) -> RateLimitDecision:
+        weight = self.weights.get(client_id, 1.0)
+        rate = self.requests_per_minute * weight / 60
+        burst = self.burst * weight
+        allowed, tokens = await self.backend.consume(client_id, rate, burst, cost)
+        if allowed:
+            self.allowed += 1
+            return RateLimitDecision(True, int(burst), int(tokens), 0.0)
+        self.rejected += 1
+        return RateLimitDecision(False, int(burst), 0, (cost - tokens) / rate if rate > 0 else 60.0)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self.backend.name,
+            "requests_per_minute": self.requests_per_minute,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "rejected": self.rejected
+        }
+
+    def close(self) -> None:
+        self.backend.close()
+
+class SlotStream:
+    def __init__(self, stream: AsyncIterator[Any], release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    def __aiter__(self) -> "SlotStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self._stream.__anext__()
+        except BaseException:
+            self._release_once()
+            raise
+
+    async def aclose(self) -> None:
+        self._release_once()
+        close = getattr(self._stream, "aclose", None)
+        if close is not None:
+            await close()
+
+    def _release_once(self) -> None:
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+class SchedulerSaturatedError(Exception):
+    pass
+
+class FairLLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.min_concurrency = max(min(min_concurrency, self.max_concurrency), 1)
+        self.limit = float(self.max_concurrency)
+        self.weights = weights or {}
+        self.in_flight = 0
+        self._waiters: List[Tuple[float, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._paused_until = 0.0
+        self._resume_handle: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+        self.queued = 0
+        self.upstream_limited = 0
+        self.saturated = 0
+        self.upstream_remaining: Optional[int] = None
+
+    def _tags(self, client_id: str) -> Tuple[float, float]:
+        start = max(self._virtual_time, self._last_finish.get(client_id, 0.0))
+        finish = start + 1.0 / self.weights.get(client_id, 1.0)
+        self._last_finish[client_id] = finish
+        if len(self._last_finish) > 10000:
+            self._last_finish = {
+                client: tag for client, tag in self._last_finish.items() if tag > self._virtual_time
+            }
+        return start, finish
+
+    async def acquire(self, client_id: str, timeout: Optional[float] = None) -> None:
+        start, finish = self._tags(client_id)
+        if not self._waiters and self.in_flight < int(self.limit) and not self._paused():
+            self._grant(start)
+            return
+
+        self.queued += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (finish, next(self._sequence), start, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.saturated += 1
+            raise SchedulerSaturatedError(f"Nenhuma vaga para o LLM em {timeout:g}s: fila local saturada") from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, client_id: Optional[str] = None) -> AsyncIterator[None]:
+        await self.acquire(client_id or current_client.get())
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _grant(self, start: float) -> None:
+        self.in_flight += 1
+        self.granted += 1
+        self._virtual_time = max(self._virtual_time, start)
+
+    def _paused(self) -> bool:
+        return time.monotonic() < self._paused_until
+
+    def _pause(self, seconds: float) -> None:
+        resume_at = time.monotonic() + seconds
+        if resume_at <= self._paused_until:
+            return
+        self._paused_until = resume_at
+        if self._resume_handle is not None:
+            self._resume_handle.cancel()
+        self._resume_handle = asyncio.get_running_loop().call_later(seconds, self._wake)
+
+    def _wake(self) -> None:
+        if self._paused():
+            return
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, start, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._grant(start)
+            future.set_result(None)
+
+    def record_success(self) -> None:
+        if self.limit < self.max_concurrency:
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._wake()
+
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        self.upstream_limited += 1
+        self.limit = max(float(self.min_concurrency), self.limit / 2)
+        if retry_after:
+            self._pause(retry_after)
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        try:
+            remaining = int(headers.get("x-ratelimit-remaining-requests"))
+        except (TypeError, ValueError):
+            return
+        self.upstream_remaining = remaining
+        if remaining < self.limit:
+            self.limit = float(max(self.min_concurrency, remaining))
+        if remaining == 0:
+            reset = parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                self._pause(reset)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": sum(1 for *_, future in self._waiters if not future.done()),
+            "granted": self.granted,
+            "queued": self.queued,
+            "upstream_limited": self.upstream_limited,
+            "saturated": self.saturated,
+            "upstream_remaining": self.upstream_remaining
+        }
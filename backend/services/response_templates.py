@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import string
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from models.schemas import EmailFeatures
+from services.keyword_matcher import KeywordMatcher
+
+DEFAULT_TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "responses.json")
+TEMPLATE_VARIABLES = ("greeting", "sender_name", "first_name", "holiday", "date")
+TEMPLATE_ENTITIES = ("sender_name", "holiday", "date")
+FEATURE_FLAGS = (
+    "has_questions", "has_urgency_indicators", "has_request_indicators", "has_problem_indicators",
+    "has_technical_indicators", "has_social_indicators", "has_positive", "has_negative"
+)
+MONTHS = "janeiro|fevereiro|março|marco|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro"
+DATE_PATTERN = re.compile(
+    rf"\b(\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?|\d{{1,2}} de (?:{MONTHS})(?: de \d{{4}})?)\b", re.IGNORECASE
+)
+SIGN_OFF_PATTERN = re.compile(
+    r"^(?:atenciosamente|att\.?|abraços?|um abraço|abs\.?|cordialmente|saudações|obrigad[oa]|grat[oa]|beijos?|bjs)"
+    r"[\s,.!-]*(.*)$",
+    re.IGNORECASE
+)
+NAME_WORD = r"[A-ZÁÉÍÓÚÂÊÔÃÕÇ][a-záéíóúâêôãõç]+"
+NAME_PATTERN = re.compile(rf"^({NAME_WORD}(?: (?:d[aeo]s? )?{NAME_WORD}){{0,3}})[\s,.!]*$")
+SIGNATURE_LINES = 8
+
+class EmailEntities(NamedTuple):
+    sender_name: Optional[str]
+    holiday: Optional[str]
+    date: Optional[str]
+
+class TemplateMatch(NamedTuple):
+    template: str
+    response: str
+
+class ResponseTemplate(NamedTuple):
+    name: str
+    category: str
+    max_words: int
+    min_keyword_hits: int
+    required_features: Tuple[str, ...]
+    forbidden_features: Tuple[str, ...]
+    required_entities: Tuple[str, ...]
+    parts: Tuple[Tuple[str, Optional[str]], ...]
+
+    def render(self, values: Dict[str, str]) -> str:
+        return "".join(literal + values[field] if field else literal for literal, field in self.parts)
+
+def _compile_text(name: str, text: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(text):
+        if field is not None and (field not in TEMPLATE_VARIABLES or format_spec or conversion):
+            raise ValueError(f"Template '{name}' usa variável desconhecida: {{{field}}}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+def _names(name: str, values: List[str], allowed: Tuple[str, ...], kind: str) -> Tuple[str, ...]:
+    unknown = [value for value in values if value not in allowed]
+    if unknown:
+        raise ValueError(f"Template '{name}' usa {kind} desconhecido: {', '.join(unknown)}")
+    return tuple(values)
+
+def _feature_flag(features: EmailFeatures, name: str) -> bool:
+    if name in ("has_positive", "has_negative"):
+        return getattr(features.sentiment_indicators, name)
+    return getattr(features, name)
+
+def extract_sender_name(email_text: str) -> Optional[str]:
+    lines = [line.strip() for line in email_text.strip().splitlines()[-SIGNATURE_LINES:] if line.strip()]
+    for index, line in enumerate(lines):
+        sign_off = SIGN_OFF_PATTERN.match(line)
+        if sign_off is None:
+            continue
+        candidate = sign_off.group(1) or (lines[index + 1] if index + 1 < len(lines) else "")
+        name = NAME_PATTERN.match(candidate)
+        if name is not None:
+            return name.group(1)
+    return None
+
+class ResponseTemplateLibrary:
+    def __init__(
+        self,
+        templates: List[ResponseTemplate],
+        keywords: Dict[str, List[str]],
+        holidays: Dict[str, List[str]]
+    ):
+        self.templates = templates
+        self._keyword_matcher = KeywordMatcher(keywords)
+        self._holiday_matcher = KeywordMatcher(holidays)
+        self.used: Dict[str, int] = {template.name: 0 for template in templates}
+
+    @classmethod
+    def load(cls, path: str) -> "ResponseTemplateLibrary":
+        with open(path, encoding="utf-8") as templates_file:
+            data = json.load(templates_file)
+
+        templates: List[ResponseTemplate] = []
+        keywords: Dict[str, List[str]] = {}
+        for entry in data.get("templates", []):
+            name = entry["name"]
+            if name in keywords:
+                raise ValueError(f"Template duplicado: {name}")
+            keywords[name] = entry.get("keywords", [])
+            templates.append(ResponseTemplate(
+                name=name,
+                category=entry["category"],
+                max_words=int(entry.get("max_words", 200)),
+                min_keyword_hits=int(entry.get("min_keyword_hits", 1 if keywords[name] else 0)),
+                required_features=_names(name, entry.get("required_features", []), FEATURE_FLAGS, "indicador"),
+                forbidden_features=_names(name, entry.get("forbidden_features", []), FEATURE_FLAGS, "indicador"),
+                required_entities=_names(name, entry.get("required_entities", []), TEMPLATE_ENTITIES, "entidade"),
+                parts=_compile_text(name, entry["text"])
+            ))
+        return cls(templates, keywords, data.get("holidays", {}))
+
+    def extract_entities(self, email_text: str) -> EmailEntities:
+        holidays = [label for label, count in self._holiday_matcher.count(email_text).items() if count]
+        date = DATE_PATTERN.search(email_text)
+        return EmailEntities(
+            sender_name=extract_sender_name(email_text),
+            holiday=" e ".join(holidays) or None,
+            date=date.group(1) if date else None
+        )
+
+    def match(self, email_text: str, category: str, features: EmailFeatures) -> Optional[TemplateMatch]:
+        hits: Optional[Dict[str, int]] = None
+        entities: Optional[EmailEntities] = None
+        for template in self.templates:
+            if template.category != category or features.word_count > template.max_words:
+                continue
+            if any(not _feature_flag(features, name) for name in template.required_features):
+                continue
+            if any(_feature_flag(features, name) for name in template.forbidden_features):
+                continue
+            if hits is None:
+                hits = self._keyword_matcher.count(email_text)
+            if hits[template.name] < template.min_keyword_hits:
+                continue
+            if entities is None:
+                entities = self.extract_entities(email_text)
+            if any(getattr(entities, name) is None for name in template.required_entities):
+                continue
+
+            self.used[template.name] += 1
+            return TemplateMatch(template.name, template.render(self._values(entities)))
+        return None
+
+    @staticmethod
+    def _values(entities: EmailEntities) -> Dict[str, str]:
+        first_name = entities.sender_name.split()[0] if entities.sender_name else ""
+        return {
+            "greeting": f"Olá, {first_name}!" if first_name else "Olá!",
+            "sender_name": entities.sender_name or "",
+            "first_name": first_name,
+            "holiday": entities.holiday or "",
+            "date": entities.date or ""
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"templates": len(self.templates), "used": dict(self.used)}
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config import settings
+
+@pytest.fixture
+def isolated_settings(monkeypatch):
+    # Desliga tudo que tocaria disco ou rede para o serviço de classificação rodar só em memória.
+    for name, value in {
+        "cache_enabled": False,
+        "near_duplicate_enabled": False,
+        "local_model_path": "",
+        "response_templates_enabled": False,
+        "history_enabled": False,
+        "decision_log_path": "",
+        "model_routing_enabled": False,
+        "coalesce_requests": True
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    return settings
@@ -0,0 +1,31 @@
+import io
+import zipfile
+import pytest
+from fastapi import HTTPException
+from utils.file_utils import FileProcessor
+
+def _zip(entries) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def test_entries_within_the_total_cap_are_extracted(monkeypatch):
+    monkeypatch.setattr("config.settings.max_archive_total_bytes", 1000)
+    content = _zip([(f"email{index}.txt", "Olá, preciso de ajuda. " * 10) for index in range(3)])
+
+    items = FileProcessor.extract_batch_items("lote.zip", content, 10)
+
+    assert [error for _, _, error in items] == [None, None, None]
+
+def test_decompressed_total_over_the_cap_is_rejected(monkeypatch):
+    monkeypatch.setattr("config.settings.max_archive_total_bytes", 1000)
+    # Comprime para poucos bytes, mas descompactado passa do teto somando as entradas.
+    content = _zip([(f"email{index}.txt", "a" * 400) for index in range(3)])
+    assert len(content) < 1000
+
+    with pytest.raises(HTTPException) as error:
+        FileProcessor.extract_batch_items("lote.zip", content, 10)
+
+    assert error.value.status_code == 413
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Any, Dict
+from models.schemas import ClassificationMode
+from services.classification_service import ClassificationService
+
+EMAIL = "Urgente: o sistema parou de funcionar e não consigo acessar a plataforma."
+COPIES = 20
+
+class StubOpenAIService:
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def classify_and_respond(self, email_text: str, features: Any, tier: Any) -> Dict[str, Any]:
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return {
+            "category": "Produtivo",
+            "confidence": 0.93,
+            "reasoning": "Resposta do stub",
+            "is_urgent": True,
+            "suggested_response": "Recebemos seu chamado."
+        }
+
+def _service(stub: StubOpenAIService) -> ClassificationService:
+    service = ClassificationService()
+    service.openai_service = stub
+    return service
+
+def _classify(service: ClassificationService, text: str = EMAIL) -> "asyncio.Task":
+    return asyncio.create_task(service.classify_email(text, ClassificationMode.SINGLE_CALL))
+
+def test_identical_concurrent_requests_share_one_upstream_call(isolated_settings):
+    async def scenario():
+        stub = StubOpenAIService()
+        service = _service(stub)
+        tasks = [_classify(service) for _ in range(COPIES)]
+        await asyncio.sleep(0)
+        stub.release.set()
+        return stub, service, await asyncio.gather(*tasks)
+
+    stub, service, results = asyncio.run(scenario())
+
+    assert stub.calls == 1
+    assert {result.reasoning for result in results} == {"Resposta do stub"}
+    assert all(result.category == "Produtivo" for result in results)
+    stats = service.coalescing_stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (1, COPIES - 1, 0)
+
+def test_different_texts_are_not_coalesced(isolated_settings):
+    async def scenario():
+        stub = StubOpenAIService()
+        service = _service(stub)
+        tasks = [_classify(service, f"{EMAIL} Chamado {index}") for index in range(3)]
+        await asyncio.sleep(0)
+        stub.release.set()
+        await asyncio.gather(*tasks)
+        return stub
+
+    assert asyncio.run(scenario()).calls == 3
+
+def test_cancelling_the_leader_keeps_the_shared_call_for_followers(isolated_settings):
+    async def scenario():
+        stub = StubOpenAIService()
+        service = _service(stub)
+        leader = _classify(service)
+        await asyncio.sleep(0)
+        followers = [_classify(service) for _ in range(COPIES - 1)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        stub.release.set()
+        results = await asyncio.gather(*followers)
+        return stub, service, leader, results
+
+    stub, service, leader, results = asyncio.run(scenario())
+
+    assert leader.cancelled()
+    assert stub.calls == 1
+    assert len(results) == COPIES - 1
+    assert all(result.reasoning == "Resposta do stub" for result in results)
+    assert service.coalescing_stats()["in_flight"] == 0
+
+def test_upstream_failure_is_shared_and_releases_the_key(isolated_settings):
+    async def scenario():
+        stub = StubOpenAIService(error=RuntimeError("upstream fora do ar"))
+        service = _service(stub)
+        tasks = [_classify(service) for _ in range(COPIES)]
+        await asyncio.sleep(0)
+        stub.release.set()
+        results = await asyncio.gather(*tasks)
+
+        # Depois da falha a chave foi liberada: a próxima requisição tenta o upstream de novo.
+        stub.error = None
+        retry = await service.classify_email(EMAIL, ClassificationMode.SINGLE_CALL)
+        return stub, service, results, retry
+
+    stub, service, results, retry = asyncio.run(scenario())
+
+    assert stub.calls == 2
+    assert len({result.reasoning for result in results}) == 1
+    assert results[0].reasoning != "Resposta do stub"
+    assert retry.reasoning == "Resposta do stub"
+    assert service.coalescing_stats()["in_flight"] == 0
+
+def test_coalescing_disabled_calls_upstream_per_request(isolated_settings, monkeypatch):
+    monkeypatch.setattr(isolated_settings, "coalesce_requests", False)
+
+    async def scenario():
+        stub = StubOpenAIService()
+        service = _service(stub)
+        tasks = [_classify(service) for _ in range(5)]
+        await asyncio.sleep(0)
+        stub.release.set()
+        await asyncio.gather(*tasks)
+        return stub
+
+    assert asyncio.run(scenario()).calls == 5
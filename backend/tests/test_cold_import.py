@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_importing_the_app_does_not_load_numpy():
+    # numpy e os serviços que dependem dele ficam para o lifespan, fora do caminho até o /health.
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print(sorted(name for name in ('numpy', 'PyPDF2', 'openai') if name in sys.modules))"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, env=dict(os.environ, LOG_DIR="")
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,37 @@
+import pytest
+from services.email_preprocessor import EmailPreprocessor
+
+CONTENT_KEPT = [
+    "Bom dia,\nEsta mensagem é para avisar que o servidor caiu às 3h e o painel ainda não voltou.",
+    "Olá equipe,\nEste email é urgente: o faturamento de março saiu duplicado para 40 clientes.",
+    "Oi,\nSegue meu pedido:\nDe: São Paulo\nPara: Rio de Janeiro\nData de embarque: amanhã\nQuantidade: 12 caixas",
+    "Relato do incidente:\n--\nO backup falhou.\n" + "\n".join(f"Passo {step} executado" for step in range(15)),
+]
+
+@pytest.fixture
+def preprocessor() -> EmailPreprocessor:
+    return EmailPreprocessor(token_budget=0)
+
+@pytest.mark.parametrize("email_text", CONTENT_KEPT)
+def test_body_content_is_not_mistaken_for_history_or_signature(preprocessor, email_text):
+    assert preprocessor.prepare(email_text) == email_text
+
+def test_forwarded_header_block_with_address_is_stripped(preprocessor):
+    email_text = (
+        "Pode verificar o pedido abaixo?\n\n"
+        "De: Maria Souza <maria@cliente.com.br>\nEnviado: segunda-feira, 3 de junho de 2024 10:12\n"
+        "Para: suporte@empresa.com\nAssunto: Pedido 8812\n\nO pedido não chegou."
+    )
+    assert preprocessor.prepare(email_text) == "Pode verificar o pedido abaixo?"
+
+def test_outlook_header_block_with_send_date_is_stripped(preprocessor):
+    email_text = "Segue o histórico.\n\nDe: Maria Souza\nEnviado: 03/06/2024 10:12\nPara: Suporte\n\nTexto antigo."
+    assert preprocessor.prepare(email_text) == "Segue o histórico."
+
+def test_trailing_disclaimer_and_signature_are_stripped(preprocessor):
+    email_text = (
+        "Olá,\nPreciso da segunda via do boleto.\n\nAtenciosamente,\nJoão\n"
+        "Esta mensagem pode conter informação confidencial e é destinada apenas ao destinatário."
+    )
+    assert preprocessor.prepare(email_text) == "Olá,\nPreciso da segunda via do boleto.\n\nAtenciosamente,\nJoão"
+    assert preprocessor.prepare("Pode confirmar a reunião?\n\nEnviado do meu iPhone") == "Pode confirmar a reunião?"
@@ -0,0 +1,83 @@
+import random
+from typing import List
+import pytest
+from services.feature_extraction_service import FeatureExtractionService
+
+FILLER = [
+    "o", "cliente", "relatou", "que", "ontem", "equipe", "pedido", "nota", "fiscal", "reunião",
+    "segue", "anexo", "Olá", "bom", "dia", "x", "-", "—", "...", "ção", "ÁGUA", "12/05"
+]
+PUNCTUATION = ["", "", "", ",", ".", "!", "?", ";", ":", "/", ")"]
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "\n\t",
+    "?",
+    "Obrigado obrigado obrigado, foi ruim",
+    "Prezado, prezado senhor, oi",
+    "URGENTE urgente Urgente urgente!!!",
+    "não consigo, NÃO CONSIGO, nao consigo, naoconsigo",
+    "banco de dados banco\nde\tdados banco-de-dados bancode dados",
+    "ano novo ano novo ano novo",
+    "emergência emergencia EMERGÊNCIA",
+    "péssimo pessimo PÉSSIMO ótimo otimo",
+    "sistema/servidor; ajuda,ajuda,ajuda",
+    "Olá 😀 parabéns!! obrigado",
+    "İstanbul, oi, tchau",
+    "texto com \x00 separador interno e erro no sistema",
+]
+
+@pytest.fixture(scope="module")
+def service() -> FeatureExtractionService:
+    return FeatureExtractionService()
+
+def _vocabulary(service: FeatureExtractionService) -> List[str]:
+    keywords = (
+        service.urgency_keywords + service.request_keywords + service.problem_keywords
+        + service.technical_keywords + service.social_keywords + service.formal_indicators
+        + service.informal_indicators + service.negative_words + service.positive_words + service.question_words
+    )
+    return keywords + [keyword.upper() for keyword in keywords] + [keyword.capitalize() for keyword in keywords]
+
+def _corpus(service: FeatureExtractionService, size: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(service)
+    texts = []
+    for _ in range(size):
+        words = [
+            (rng.choice(vocabulary) if rng.random() < 0.3 else rng.choice(FILLER)) + rng.choice(PUNCTUATION)
+            for _ in range(rng.randint(0, 60))
+        ]
+        texts.append(rng.choice([" ", "  ", "\n"]).join(words))
+    return texts
+
+def _assert_parity(service: FeatureExtractionService, texts: List[str]) -> None:
+    batch = service.extract_features_batch(texts)
+    assert len(batch) == len(texts)
+    for index, text in enumerate(texts):
+        assert batch[index] == service.extract_features(text), f"divergência no texto {index}: {text!r}"
+
+def test_seeded_corpus_matches_scalar_extraction(service):
+    _assert_parity(service, _corpus(service, 2000))
+
+def test_edge_cases_match_scalar_extraction(service):
+    _assert_parity(service, EDGE_CASES)
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_single_text_batch_matches_scalar_extraction(service, text):
+    _assert_parity(service, [text])
+
+def test_edge_cases_mixed_into_corpus(service):
+    texts = _corpus(service, 300, seed=13)
+    for index, text in enumerate(EDGE_CASES):
+        texts.insert(index * 17, text)
+    _assert_parity(service, texts)
+
+def test_empty_batch(service):
+    assert service.extract_features_batch([]).to_list() == []
+
+def test_repeated_keywords_count_once(service):
+    batch = service.extract_features_batch(EDGE_CASES[4:6])
+    assert batch[0].sentiment_indicators.sentiment_score == 0.0
+    assert batch[1].formality_score == pytest.approx(2 / 3)
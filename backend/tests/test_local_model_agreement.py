@@ -0,0 +1,64 @@
+import asyncio
+import json
+from models.schemas import ClassificationMode
+from services.classification_service import ClassificationService
+from services.local_classifier_service import LocalClassifier
+
+PRODUCTIVE = "Preciso de ajuda urgente, o sistema parou e não consigo acessar a plataforma."
+UNPRODUCTIVE = "Feliz natal a toda a equipe, obrigado pelo ano e boas festas!"
+
+class StubOpenAIService:
+    def __init__(self, category: str):
+        self.category = category
+
+    async def classify_and_respond(self, email_text, features, tier):
+        return {"category": self.category, "confidence": 0.9, "is_urgent": False, "suggested_response": "Ok."}
+
+def _service(category: str) -> ClassificationService:
+    service = ClassificationService()
+    samples = [
+        (text, service.feature_service.extract_features(text), label)
+        for text, label in ((PRODUCTIVE, "Produtivo"), (UNPRODUCTIVE, "Improdutivo"))
+    ]
+    service.local_classifier = LocalClassifier.train(samples * 3)
+    service.openai_service = StubOpenAIService(category)
+    return service
+
+def test_llm_decisions_below_threshold_are_compared_with_the_local_model(isolated_settings, monkeypatch):
+    monkeypatch.setattr(isolated_settings, "local_model_threshold", 1.01)
+
+    agreeing = _service("Produtivo")
+    asyncio.run(agreeing.classify_email(PRODUCTIVE, ClassificationMode.SINGLE_CALL))
+    disagreeing = _service("Improdutivo")
+    asyncio.run(disagreeing.classify_email(PRODUCTIVE, ClassificationMode.SINGLE_CALL))
+
+    assert (agreeing.llm_routed, agreeing.local_compared, agreeing.local_agreed) == (1, 1, 1)
+    assert (disagreeing.local_compared, disagreeing.local_agreed) == (1, 0)
+
+def test_confident_local_predictions_skip_the_comparison(isolated_settings, monkeypatch):
+    monkeypatch.setattr(isolated_settings, "local_model_threshold", 0.5)
+    service = _service("Produtivo")
+
+    result = asyncio.run(service.classify_email(PRODUCTIVE, ClassificationMode.SINGLE_CALL))
+
+    assert result.category == "Produtivo"
+    assert (service.local_routed, service.llm_routed, service.local_compared) == (1, 0, 0)
+
+def test_decision_log_keeps_a_redacted_excerpt_and_rotates(isolated_settings, monkeypatch, tmp_path):
+    log_path = str(tmp_path / "decisoes.jsonl")
+    monkeypatch.setattr(isolated_settings, "decision_log_path", log_path)
+    monkeypatch.setattr(isolated_settings, "decision_log_excerpt_chars", 80)
+    monkeypatch.setattr(isolated_settings, "decision_log_max_bytes", 1)
+    service = _service("Produtivo")
+    email_text = "Falar com joao.silva@example.com ou 11 98765-4321 sobre o pedido 8812. " + "Detalhes. " * 50
+
+    asyncio.run(service._log_decision(email_text, "Produtivo", 0.9, False, "modelo"))
+    asyncio.run(service._log_decision(email_text, "Produtivo", 0.9, False, "modelo"))
+
+    with open(log_path + ".1", encoding="utf-8") as rotated, open(log_path, encoding="utf-8") as current:
+        lines = rotated.readlines() + current.readlines()
+    record = json.loads(lines[-1])
+    assert len(lines) == 2
+    assert "text" not in record and len(record["text_hash"]) == 64
+    assert len(record["excerpt"]) <= 80
+    assert "joao" not in record["excerpt"] and "8812" not in record["excerpt"] and "4321" not in record["excerpt"]
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from models.schemas import EmailClassification
+from services.feature_extraction_service import FeatureExtractionService
+from services.near_duplicate_service import NearDuplicateIndex
+
+TEMPLATE = "Olá, meu nome é {name} e o pedido {order} não chegou. Podem verificar a entrega? Obrigado."
+
+def _classification(response: str) -> EmailClassification:
+    return EmailClassification(
+        category="Produtivo",
+        confidence=0.9,
+        suggested_response=response,
+        reasoning="teste",
+        is_urgent=False,
+        features_detected=FeatureExtractionService().extract_features("")
+    )
+
+def _index_with(previous: str, response: str) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(threshold=0.5)
+    asyncio.run(index.add(previous, _classification(response)))
+    return index
+
+def test_generic_response_is_reused():
+    index = _index_with(TEMPLATE.format(name="Mariana", order="8812"), "Vamos verificar a entrega do seu pedido.")
+
+    assert index.lookup(TEMPLATE.format(name="Roberto", order="8812")) is not None
+    assert (index.reused, index.refused) == (1, 0)
+
+def test_response_naming_the_previous_sender_is_refused():
+    index = _index_with(TEMPLATE.format(name="Mariana", order="8812"), "Mariana, vamos verificar a entrega.")
+
+    assert index.lookup(TEMPLATE.format(name="Roberto", order="8812")) is None
+    assert (index.reused, index.refused) == (0, 1)
+
+def test_leak_check_is_linear_on_long_bodies():
+    body = " ".join(f"linha{number % 7919} do relatório" for number in range(20000))
+    previous = f"Mariana escreveu: {body}"
+    current = f"Roberto escreveu: {body} fim"
+
+    start = time.perf_counter()
+    leaked = NearDuplicateIndex.leaks_previous_email("Obrigado, Mariana.", previous, current)
+    elapsed = time.perf_counter() - start
+
+    assert leaked
+    assert not NearDuplicateIndex.leaks_previous_email("Obrigado pelo relatório.", previous, current)
+    assert elapsed < 0.5
@@ -0,0 +1,21 @@
+from benchmarks.bench_pdf_extraction import build_pdf
+from utils.file_utils import extract_pdf_pages
+
+def test_path_and_bytes_sources_extract_the_same_text(tmp_path):
+    content = build_pdf(5, reference="Pedido 8812")
+    path = tmp_path / "email.pdf"
+    path.write_bytes(content)
+
+    from_path = extract_pdf_pages(str(path), 0, 0)
+
+    assert from_path == extract_pdf_pages(content, 0, 0)
+    assert "8812" in from_path
+
+def test_page_and_char_caps_stop_early(tmp_path):
+    path = tmp_path / "email.pdf"
+    path.write_bytes(build_pdf(50))
+
+    first_pages = extract_pdf_pages(str(path), 2, 0)
+
+    assert first_pages == extract_pdf_pages(build_pdf(2), 0, 0)
+    assert len(extract_pdf_pages(str(path), 0, 100)) == 100
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from models.schemas import ClassificationMode
+from services.classification_service import ClassificationService
+from services.openai_service import OpenAIService
+from services.rate_limiter import SchedulerSaturatedError
+
+CALLS = 12
+MESSAGES = [{"role": "user", "content": "Oi"}]
+
+@pytest.fixture
+def saturated_settings(isolated_settings, monkeypatch):
+    for name, value in {
+        "llm_max_concurrency": 1,
+        "openai_timeout_seconds": 0.25,
+        "openai_hedge_delay_seconds": 0.0,
+        "openai_max_retries": 2,
+        "circuit_failure_threshold": 3
+    }.items():
+        monkeypatch.setattr(isolated_settings, name, value)
+    return isolated_settings
+
+def _slow_upstream(service: OpenAIService) -> OpenAIService:
+    async def send(messages, model, **params):
+        await asyncio.sleep(0.1)
+        return {"choices": [{"message": {"content": "{}"}}]}
+
+    service._send = send
+    return service
+
+def test_saturated_scheduler_is_not_an_upstream_failure(saturated_settings):
+    service = _slow_upstream(OpenAIService())
+
+    async def scenario():
+        return await asyncio.gather(
+            *(service._create_completion(MESSAGES, service.default_tier()) for _ in range(CALLS)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    saturated = [result for result in results if isinstance(result, SchedulerSaturatedError)]
+
+    assert saturated and len(saturated) < CALLS
+    assert all(isinstance(result, (dict, SchedulerSaturatedError)) for result in results)
+    assert (service.failures, service.retries, service.timeouts) == (0, 0, 0)
+    assert service.circuit_breaker.state == "closed"
+    assert service.scheduler.stats()["saturated"] == len(saturated)
+
+def test_saturation_propagates_instead_of_falling_back(saturated_settings):
+    classification_service = ClassificationService()
+    _slow_upstream(classification_service.openai_service)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(
+                classification_service.classify_email(f"Preciso de ajuda com o pedido {index}", ClassificationMode.SINGLE_CALL)
+                for index in range(CALLS)
+            ),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert any(isinstance(result, SchedulerSaturatedError) for result in results)
+    assert classification_service.openai_service.circuit_breaker.state == "closed"
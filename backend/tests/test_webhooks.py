@@ -0,0 +1,58 @@
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from models.schemas import JobResponse, JobStatus
+from services.job_queue import InMemoryJobStore, JobQueue
+from utils.webhooks import WebhookURLError, validate_webhook_url
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://10.0.0.5:8080/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "http://[fe80::1%25eth0]/hook",
+])
+def test_internal_ip_literals_are_rejected_even_with_an_allowlist(url, monkeypatch):
+    # Hosts da lista casam por sufixo, mas IP literal só vale se listado por inteiro.
+    monkeypatch.setattr("config.settings.webhook_allowed_hosts", "hooks.example.com,0.0.1,0.5,254")
+    with pytest.raises(WebhookURLError):
+        asyncio.run(validate_webhook_url(url))
+
+def test_explicitly_allowed_ip_literal_is_accepted(monkeypatch):
+    monkeypatch.setattr("config.settings.webhook_allowed_hosts", "127.0.0.1")
+    asyncio.run(validate_webhook_url("http://127.0.0.1:9000/hook"))
+
+def test_redirect_is_a_failed_delivery(monkeypatch):
+    monkeypatch.setattr("config.settings.webhook_allowed_hosts", "127.0.0.1")
+    monkeypatch.setattr("config.settings.webhook_max_retries", 0)
+    hits = []
+
+    async def record(request):
+        hits.append(request.path)
+        if request.path == "/hook":
+            raise web.HTTPFound("/internal")
+        return web.Response()
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_route("*", "/hook", record)
+        app.router.add_route("*", "/internal", record)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        queue = JobQueue(classification_service=None, store=InMemoryJobStore())
+        job = JobResponse(job_id="job-1", status=JobStatus.SUCCEEDED, created_at=time.time())
+        try:
+            await queue._deliver_webhook(f"http://127.0.0.1:{port}/hook", job)
+        finally:
+            await queue.stop()
+            await runner.cleanup()
+        return queue
+
+    queue = asyncio.run(scenario())
+
+    assert hits == ["/hook"]
+    assert queue.webhooks_failed == 1
@@ -1,19 +1,131 @@
-import PyPDF2
+import asyncio
 import io
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
 from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from utils.metrics import observe_stage
+
+MAX_ARCHIVE_ENTRY_BYTES = 5 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+def extract_pdf_pages(source: Union[str, bytes, BinaryIO], max_pages: int, max_chars: int) -> str:
+    import PyPDF2
+    if isinstance(source, str):
+        # PdfReader(caminho) copiaria o arquivo inteiro para a memória; com o handle as páginas são lidas sob demanda.
+        with open(source, "rb") as pdf_file:
+            return extract_pdf_pages(pdf_file, max_pages, max_chars)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    pdf_reader = PyPDF2.PdfReader(source)
+    parts: List[str] = []
+    collected = 0
+    for index, page in enumerate(pdf_reader.pages):
+        if max_pages and index >= max_pages:
+            break
+        page_text = page.extract_text() or ""
+        parts.append(page_text)
+        collected += len(page_text)
+        if max_chars and collected >= max_chars:
+            break
+    
+    text = "".join(parts)
+    return text[:max_chars] if max_chars else text
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    # Também é chamado de threads do lote (.zip/.mbox), não só do event loop.
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=settings.pdf_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_executor
+
+def _load_pdf_reader() -> None:
+    import PyPDF2
+
+async def warm_up_pdf_executor() -> None:
+    if settings.pdf_workers > 0:
+        await asyncio.get_running_loop().run_in_executor(_get_pdf_executor(), _load_pdf_reader)
+    else:
+        await run_in_threadpool(_load_pdf_reader)
+
+def shutdown_pdf_executor() -> None:
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False, cancel_futures=True)
+        _pdf_executor = None
 
 class FileProcessor:
     @staticmethod
     def extract_text_from_pdf(file_content: bytes) -> str:
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            if settings.pdf_workers > 0:
+                return _get_pdf_executor().submit(
+                    extract_pdf_pages, file_content, settings.pdf_max_pages, settings.pdf_max_chars
+                ).result()
+            return extract_pdf_pages(file_content, settings.pdf_max_pages, settings.pdf_max_chars)
+        except BrokenProcessPool:
+            shutdown_pdf_executor()
+            raise HTTPException(status_code=503, detail="Processamento de PDF indisponível, tente novamente")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Erro ao processar PDF: {str(e)}")
+    
+    @staticmethod
+    async def extract_text_from_pdf_file(path: str) -> str:
+        try:
+            if settings.pdf_workers > 0:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    _get_pdf_executor(), extract_pdf_pages, path, settings.pdf_max_pages, settings.pdf_max_chars
+                )
+            return await run_in_threadpool(extract_pdf_pages, path, settings.pdf_max_pages, settings.pdf_max_chars)
+        except BrokenProcessPool:
+            shutdown_pdf_executor()
+            raise HTTPException(status_code=503, detail="Processamento de PDF indisponível, tente novamente")
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Erro ao processar PDF: {str(e)}")
     
+    @staticmethod
+    def _spool_to_disk(source: BinaryIO, max_bytes: int) -> str:
+        source.seek(0)
+        written = 0
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spool:
+            try:
+                while True:
+                    chunk = source.read(UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise HTTPException(status_code=413, detail="Arquivo excede o tamanho máximo permitido")
+                    spool.write(chunk)
+            except BaseException:
+                spool.close()
+                os.unlink(spool.name)
+                raise
+        return spool.name
+    
+    @staticmethod
+    async def save_upload_to_disk(file: UploadFile) -> str:
+        with observe_stage("upload_read"):
+            return await run_in_threadpool(FileProcessor._spool_to_disk, file.file, settings.max_upload_bytes)
+    
     @staticmethod
     async def process_upload_file(file: UploadFile) -> str:
         if not file.filename:
@@ -23,11 +135,18 @@ class FileProcessor:
             raise HTTPException(status_code=400, detail="Apenas arquivos .txt e .pdf são aceitos")
         
         try:
-            content = await file.read()
-            
             if file.filename.lower().endswith('.pdf'):
-                email_text = FileProcessor.extract_text_from_pdf(content)
+                path = await FileProcessor.save_upload_to_disk(file)
+                try:
+                    with observe_stage("pdf_parse"):
+                        email_text = await FileProcessor.extract_text_from_pdf_file(path)
+                finally:
+                    os.unlink(path)
             else:
+                with observe_stage("upload_read"):
+                    content = await file.read(settings.max_upload_bytes + 1)
+                if len(content) > settings.max_upload_bytes:
+                    raise HTTPException(status_code=413, detail="Arquivo excede o tamanho máximo permitido")
                 email_text = content.decode('utf-8')
             
             if not email_text.strip():
@@ -35,7 +154,166 @@ class FileProcessor:
             
             return email_text
             
+        except HTTPException:
+            raise
         except UnicodeDecodeError:
             raise HTTPException(status_code=400, detail="Erro na codificação do arquivo. Certifique-se que é UTF-8")
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+    
+    @staticmethod
+    async def read_batch_upload(file: UploadFile) -> bytes:
+        with observe_stage("upload_read"):
+            content = await file.read(settings.max_upload_bytes + 1)
+        if len(content) > settings.max_upload_bytes:
+            raise HTTPException(status_code=413, detail="Arquivo excede o tamanho máximo permitido")
+        return content
+    
+    @staticmethod
+    def extract_text_from_email_message(message: EmailMessage) -> str:
+        subject = str(message.get("Subject", "") or "").strip()
+        parts = []
+        body = message.get_body(preferencelist=("plain", "html"))
+        if body is not None:
+            content = body.get_content()
+            if body.get_content_subtype() == "html":
+                content = re.sub(r"<[^>]+>", " ", content)
+            parts.append(content.strip())
+        
+        for attachment in message.iter_attachments():
+            if attachment.get_content_type() == "application/pdf":
+                parts.append(FileProcessor.extract_text_from_pdf(attachment.get_payload(decode=True) or b""))
+        
+        text = "\n\n".join(part for part in parts if part)
+        return f"Assunto: {subject}\n\n{text}" if subject else text
+    
+    @staticmethod
+    def iter_mbox_messages(content: bytes) -> Iterator[bytes]:
+        current: List[bytes] = []
+        for line in io.BytesIO(content):
+            if line.startswith(b"From "):
+                if current:
+                    yield b"".join(current)
+                    current = []
+                continue
+            current.append(line[1:] if line.startswith(b">From ") else line)
+        if current:
+            yield b"".join(current)
+    
+    @staticmethod
+    def iter_mbox_file(path: str, start_offset: int = 0, max_bytes: int = 0) -> Iterator[Tuple[int, Optional[bytes]]]:
+        # Gera (offset do fim da mensagem, bytes) lendo linha a linha; mensagens acima de
+        # max_bytes saem como None para não acumular anexos gigantes em memória.
+        with open(path, "rb") as mbox_file:
+            mbox_file.seek(start_offset)
+            offset = start_offset
+            current: List[bytes] = []
+            size = 0
+            oversized = False
+            started = False
+            for line in mbox_file:
+                if line.startswith(b"From "):
+                    if started:
+                        yield offset, None if oversized else b"".join(current)
+                    current, size, oversized, started = [], 0, False, True
+                    offset += len(line)
+                    continue
+                offset += len(line)
+                started = True
+                if oversized:
+                    continue
+                size += len(line)
+                if max_bytes and size > max_bytes:
+                    current, oversized = [], True
+                    continue
+                current.append(line[1:] if line.startswith(b">From ") else line)
+            if started:
+                yield offset, None if oversized else b"".join(current)
+    
+    @staticmethod
+    def iter_maildir(path: str, skip: int = 0, max_bytes: int = 0) -> Iterator[Tuple[str, Optional[bytes]]]:
+        names = sorted(
+            os.path.join(folder, name)
+            for folder in ("cur", "new")
+            if os.path.isdir(os.path.join(path, folder))
+            for name in os.listdir(os.path.join(path, folder))
+            if not name.startswith(".")
+        )
+        for name in names[skip:]:
+            full_path = os.path.join(path, name)
+            if max_bytes and os.path.getsize(full_path) > max_bytes:
+                yield name, None
+                continue
+            with open(full_path, "rb") as message_file:
+                yield name, message_file.read()
+    
+    @staticmethod
+    def extract_batch_items(filename: str, content: bytes, max_items: int) -> List[Tuple[str, str, Optional[str]]]:
+        items: List[Tuple[str, str, Optional[str]]] = []
+        name = filename.lower()
+        
+        if name.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(content))
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail="Arquivo .zip inválido")
+            # Conta os bytes realmente descompactados: o file_size do diretório do .zip pode mentir.
+            remaining = settings.max_archive_total_bytes
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if len(items) >= max_items:
+                    break
+                entry_name = info.filename.lower()
+                if not entry_name.endswith((".txt", ".pdf", ".eml")):
+                    continue
+                if info.file_size > MAX_ARCHIVE_ENTRY_BYTES:
+                    items.append((info.filename, "", "Arquivo excede o tamanho máximo permitido"))
+                    continue
+                try:
+                    with archive.open(info) as entry:
+                        data = entry.read(min(MAX_ARCHIVE_ENTRY_BYTES, remaining) + 1)
+                except Exception as e:
+                    items.append((info.filename, "", f"Erro ao processar arquivo: {str(e)}"))
+                    continue
+                remaining -= len(data)
+                if remaining < 0:
+                    raise HTTPException(status_code=413, detail="Conteúdo descompactado do .zip excede o tamanho máximo permitido")
+                if len(data) > MAX_ARCHIVE_ENTRY_BYTES:
+                    items.append((info.filename, "", "Arquivo excede o tamanho máximo permitido"))
+                    continue
+                try:
+                    if entry_name.endswith(".pdf"):
+                        text = FileProcessor.extract_text_from_pdf(data)
+                    elif entry_name.endswith(".eml"):
+                        text = FileProcessor.extract_text_from_email_message(
+                            message_from_bytes(data, policy=policy.default)
+                        )
+                    else:
+                        text = data.decode("utf-8")
+                    items.append((info.filename, text, None))
+                except UnicodeDecodeError:
+                    items.append((info.filename, "", "Erro na codificação do arquivo. Certifique-se que é UTF-8"))
+                except HTTPException as e:
+                    items.append((info.filename, "", e.detail))
+                except Exception as e:
+                    items.append((info.filename, "", f"Erro ao processar arquivo: {str(e)}"))
+        elif name.endswith(".mbox"):
+            for index, raw_message in enumerate(FileProcessor.iter_mbox_messages(content)):
+                if len(items) >= max_items:
+                    break
+                source = f"mensagem {index + 1}"
+                try:
+                    message = message_from_bytes(raw_message, policy=policy.default)
+                    items.append((source, FileProcessor.extract_text_from_email_message(message), None))
+                except HTTPException as e:
+                    items.append((source, "", e.detail))
+                except Exception as e:
+                    items.append((source, "", f"Erro ao processar mensagem: {str(e)}"))
+        else:
+            raise HTTPException(status_code=400, detail="Apenas arquivos .zip e .mbox são aceitos")
+        
+        if not items:
+            raise HTTPException(status_code=400, detail="Nenhum email encontrado no arquivo")
+        
+        return items
\ No newline at end of file
@@ -1,6 +1,8 @@
 import logging
+import os
 import sys
 from datetime import datetime
+from config import settings
 
 def setup_logger(name: str = "sparkmail_classifier") -> logging.Logger:
     logger = logging.getLogger(name)
@@ -11,17 +13,20 @@ def setup_logger(name: str = "sparkmail_classifier") -> logging.Logger:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
         
-        file_handler = logging.FileHandler(f"logs/app_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler.setLevel(logging.INFO)
-        
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         
         console_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
-        
         logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+        
+        if settings.log_dir:
+            os.makedirs(settings.log_dir, exist_ok=True)
+            file_handler = logging.FileHandler(
+                os.path.join(settings.log_dir, f"app_{datetime.now().strftime('%Y%m%d')}.log")
+            )
+            file_handler.setLevel(logging.INFO)
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
     
     return logger
\ No newline at end of file
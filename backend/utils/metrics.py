@@ -0,0 +1,193 @@
+import bisect
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# (nome, tipo, ajuda, valor) ou (nome, tipo, ajuda, valor, rótulos); séries do mesmo nome vêm em sequência.
+Sample = Tuple[Any, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value:g}")
+        return lines
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def summary(self, *label_values: str) -> Tuple[int, float]:
+        series = self._series.get(label_values)
+        return (series[2], series[1]) if series else (0, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (bucket_counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _format_labels(self.label_names, label_values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], List[Sample]]] = []
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], List[Sample]]) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            previous = None
+            for name, kind, help_text, value, *labels in collector():
+                if name != previous:
+                    lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"])
+                    previous = name
+                label_text = _format_labels(tuple(labels[0]), tuple(labels[0].values())) if labels else ""
+                lines.append(f"{name}{label_text} {value:g}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+REQUEST_DURATION = registry.histogram(
+    "sparkmail_http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route", "status")
+)
+STAGE_DURATION = registry.histogram(
+    "sparkmail_stage_duration_seconds", "Tempo gasto em cada etapa do processamento", ("stage",)
+)
+LLM_TOKENS = registry.counter("sparkmail_llm_tokens_total", "Tokens consumidos na API da OpenAI", ("kind",))
+CLASSIFICATION_PATHS = registry.counter(
+    "sparkmail_classifications_total", "Classificações por caminho de decisão", ("path",)
+)
+FALLBACKS = registry.counter("sparkmail_fallbacks_total", "Usos do fallback por motivo", ("reason",))
+MODEL_TIER_CALLS = registry.counter(
+    "sparkmail_model_tier_calls_total", "Chamadas ao LLM por faixa de roteamento", ("tier", "model")
+)
+MODEL_TIER_DURATION = registry.histogram(
+    "sparkmail_model_tier_duration_seconds", "Latência das chamadas ao LLM por faixa de roteamento", ("tier",)
+)
+MODEL_TIER_TOKENS = registry.counter(
+    "sparkmail_model_tier_tokens_total", "Tokens consumidos por faixa de roteamento", ("tier", "kind")
+)
+MODEL_TIER_COST = registry.counter(
+    "sparkmail_model_tier_cost_usd_total", "Custo estimado em dólares por faixa de roteamento", ("tier",)
+)
+TEMPLATE_RESPONSES = registry.counter(
+    "sparkmail_template_responses_total", "Respostas geradas por template no lugar do LLM", ("template",)
+)
+
+class StageTimer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        STAGE_DURATION.observe(time.perf_counter() - self.start, self.stage)
+
+def observe_stage(stage: str) -> StageTimer:
+    return StageTimer(stage)
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict[Any, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, scope["method"], self._route_path(scope), str(status)
+            )
+
+    def _route_path(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            path = next(
+                (route.path for route in scope["app"].routes if getattr(route, "endpoint", None) is endpoint),
+                "unmatched"
+            )
+            self._route_paths[endpoint] = path
+        return path
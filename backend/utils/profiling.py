@@ -0,0 +1,173 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+PROFILE_HEADER = b"x-profile-token"
+SAMPLING_ENDPOINT = "/admin/profile"
+MAX_STACK_DEPTH = 64
+SUMMARY_LINES = 40
+IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("thread.py", "_worker"), ("queue.py", "get")}
+
+def token_matches(candidate: Optional[str]) -> bool:
+    return bool(settings.profiling_admin_token) and candidate is not None and hmac.compare_digest(
+        candidate.encode("utf-8"), settings.profiling_admin_token.encode("utf-8")
+    )
+
+def _profile_name(method: str, path: str) -> str:
+    route = path.strip("/").replace("/", "_") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{method.lower()}-{route}"
+
+def save_request_profile(profile: cProfile.Profile, name: str, directory: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, name)
+    profile.dump_stats(f"{base}.prof")
+    summary = io.StringIO()
+    stats = pstats.Stats(profile, stream=summary)
+    stats.sort_stats("cumulative").print_stats(SUMMARY_LINES)
+    stats.print_callees(SUMMARY_LINES)
+    with open(f"{base}.txt", "w", encoding="utf-8") as summary_file:
+        summary_file.write(summary.getvalue())
+    return base
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+        self.profiled = 0
+        self.skipped_busy = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self._active:
+            # cProfile acompanha a thread inteira; dois perfis ao mesmo tempo se misturariam.
+            self.skipped_busy += 1
+            await self.app(scope, receive, send)
+            return
+
+        name = _profile_name(scope["method"], scope["path"])
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", name.encode())]}
+            await send(message)
+
+        self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.disable()
+            self._active = False
+            self.profiled += 1
+        try:
+            await asyncio.to_thread(save_request_profile, profile, name, settings.profiling_dir)
+        except OSError as e:
+            logger.error(f"Erro ao salvar perfil {name}: {str(e)}")
+
+    def _should_profile(self, scope) -> bool:
+        if scope["path"] == SAMPLING_ENDPOINT:
+            return False
+        if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            return True
+        if not settings.profiling_admin_token:
+            return False
+        for header, value in scope["headers"]:
+            if header == PROFILE_HEADER:
+                return token_matches(value.decode("latin-1"))
+        return False
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+def _collapse(frame) -> Tuple[str, str]:
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels)), labels[0] if labels else ""
+
+class SampledProfile(NamedTuple):
+    stacks: Counter
+    leaves: Counter
+    samples: int
+    seconds: float
+    interval: float
+
+    def summary(self, top: int) -> Dict[str, Any]:
+        def entries(counter: Counter) -> List[Dict[str, Any]]:
+            return [
+                {"stack": stack, "count": count, "fraction": count / self.samples if self.samples else 0.0}
+                for stack, count in counter.most_common(top)
+            ]
+        return {
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "samples": self.samples,
+            "stacks": entries(self.stacks),
+            "functions": entries(self.leaves)
+        }
+
+    def save_folded(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{_profile_name('sample', 'worker')}-{os.getpid()}.folded")
+        with open(path, "w", encoding="utf-8") as folded_file:
+            for stack, count in self.stacks.most_common():
+                folded_file.write(f"{stack} {count}\n")
+        return path
+
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = max(interval, 0.001)
+        self._lock = threading.Lock()
+
+    def run(self, seconds: float) -> SampledProfile:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Já existe um perfil em andamento")
+        try:
+            return self._sample(seconds)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float) -> SampledProfile:
+        own_thread = threading.get_ident()
+        main_thread = threading.main_thread().ident
+        stacks: Counter = Counter()
+        leaves: Counter = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                # Threads auxiliares paradas em fila/select só poluem o resultado; o loop
+                # principal parado no select continua aparecendo como tempo ocioso.
+                if thread_id == own_thread or (thread_id != main_thread and _is_idle(frame)):
+                    continue
+                stack, leaf = _collapse(frame)
+                thread_name = names.get(thread_id, str(thread_id))
+                stacks[f"{thread_name};{stack}"] += 1
+                leaves[f"{thread_name};{leaf}"] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return SampledProfile(stacks, leaves, samples, time.perf_counter() - started, self.interval)
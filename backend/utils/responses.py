@@ -0,0 +1,14 @@
+from typing import Any, Optional
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+class ModelResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, content: BaseModel, exclude: Optional[Any] = None, **kwargs):
+        self.exclude = exclude
+        super().__init__(content, **kwargs)
+
+    def render(self, content: BaseModel) -> bytes:
+        return to_json(content, exclude=self.exclude)
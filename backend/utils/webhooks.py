@@ -0,0 +1,77 @@
+import asyncio
+import ipaddress
+import socket
+from functools import lru_cache
+from typing import TYPE_CHECKING, FrozenSet
+from urllib.parse import urlsplit
+from config import settings
+
+if TYPE_CHECKING:
+    import aiohttp
+
+class WebhookURLError(ValueError):
+    pass
+
+@lru_cache(maxsize=8)
+def parse_allowed_hosts(raw: str) -> FrozenSet[str]:
+    return frozenset(host.strip().lower().rstrip(".") for host in raw.split(",") if host.strip())
+
+def is_allowed_host(host: str) -> bool:
+    allowed = parse_allowed_hosts(settings.webhook_allowed_hosts)
+    host = host.lower().rstrip(".")
+    if is_ip_literal(host):
+        return host in allowed
+    return any(host == entry or host.endswith(f".{entry}") for entry in allowed)
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+def is_ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.split("%", 1)[0])
+    except ValueError:
+        return False
+    return True
+
+async def validate_webhook_url(url: str) -> None:
+    parts = urlsplit(url)
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise WebhookURLError("webhook_url com porta inválida")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookURLError("webhook_url deve começar com http:// ou https://")
+    # IP literal não passa pelo resolvedor do aiohttp: a checagem tem de acontecer aqui.
+    if is_ip_literal(parts.hostname) and not is_public_address(parts.hostname) and not is_allowed_host(parts.hostname):
+        raise WebhookURLError("webhook_url aponta para um endereço interno")
+    if parse_allowed_hosts(settings.webhook_allowed_hosts):
+        if not is_allowed_host(parts.hostname):
+            raise WebhookURLError("Host do webhook não está em WEBHOOK_ALLOWED_HOSTS")
+        return
+
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise WebhookURLError("Não foi possível resolver o host do webhook")
+    if not all(is_public_address(info[4][0]) for info in infos):
+        raise WebhookURLError("webhook_url aponta para um endereço interno")
+
+def create_webhook_session(timeout_seconds: float) -> "aiohttp.ClientSession":
+    import aiohttp
+    from aiohttp.resolver import DefaultResolver
+
+    class PublicAddressResolver(DefaultResolver):
+        # Revalida no momento da conexão: o DNS pode mudar depois da checagem na submissão do job.
+        async def resolve(self, host, port=0, family=socket.AF_INET):
+            hosts = await super().resolve(host, port, family)
+            if not is_allowed_host(host) and not all(is_public_address(item["host"]) for item in hosts):
+                raise OSError(f"Webhook para endereço interno bloqueado: {host}")
+            return hosts
+
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(resolver=PublicAddressResolver()),
+        timeout=aiohttp.ClientTimeout(total=timeout_seconds)
+    )